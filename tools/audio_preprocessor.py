@@ -19,10 +19,21 @@ Best Practices:
 """
 
 from pathlib import Path
-from typing import Optional, List, Callable, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, List, Callable, Dict, Any, Iterable, Iterator
+from dataclasses import dataclass, field
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from collections import deque
+import hashlib
 import json
+import os
+import re
+import shutil
+import struct
+import sys
 import time
+import wave
+import math
 import logging
 
 # Опциональный импорт ffmpeg-python
@@ -36,6 +47,45 @@ except ImportError:
         "Install with: pip install ffmpeg-python"
     )
 
+# Опциональный импорт NumPy (бэкенд для коротких клипов, без него — только ffmpeg)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Расширения, которые подхватывает пакетный режим при обходе директорий
+# (совпадают с форматами, которые раскладывает tools/ingest_fixation.py)
+MEDIA_EXTENSIONS = {
+    '.mp3', '.wav', '.ogg', '.oga', '.opus', '.m4a', '.aac', '.flac',
+    '.mp4', '.mov', '.avi', '.m4v'
+}
+
+
+# Выходные форматы для распознавания: speechkit_format — значение audio_format
+# для YandexSpeechKit.transcribe_from_uri. Все форматы кроме mp3 пишутся
+# 16 kHz mono: SpeechKit всё равно распознаёт моно и декодирует вход заново,
+# поэтому OGG_OPUS и несжатый PCM экономят время кодирования MP3.
+OUTPUT_FORMATS = {
+    'mp3': {
+        'codec': 'libmp3lame', 'container': 'mp3', 'suffix': '.mp3',
+        'bitrate': '128k', 'mono': False, 'speechkit_format': 'MP3'
+    },
+    'ogg_opus': {
+        'codec': 'libopus', 'container': 'ogg', 'suffix': '.ogg',
+        'bitrate': '32k', 'mono': True, 'speechkit_format': 'OGG_OPUS'
+    },
+    'wav': {
+        'codec': 'pcm_s16le', 'container': 'wav', 'suffix': '.wav',
+        'bitrate': None, 'mono': True, 'speechkit_format': 'WAV'
+    },
+    'linear16': {
+        'codec': 'pcm_s16le', 'container': 's16le', 'suffix': '.pcm',
+        'bitrate': None, 'mono': True, 'speechkit_format': 'LINEAR16_PCM'
+    }
+}
+
 
 # ============================================================================
 # DATA CLASSES
@@ -70,19 +120,89 @@ class PreprocessingResult:
     processing_time_sec: float
     success: bool
     error_message: Optional[str] = None
+    cache_status: Optional[str] = None  # 'hit' / 'miss' / None (кэш выключен)
+    artifacts: List[Path] = field(default_factory=list)  # Побочные файлы фильтров
+    profile: Optional[str] = None  # Профиль (для 'auto' — выбранный по анализу)
+    backend: Optional[str] = None  # 'ffmpeg' / 'numpy'
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             'output_file': str(self.output_file),
-            'original_metrics': self.original_metrics.to_dict(),
-            'processed_metrics': self.processed_metrics.to_dict(),
+            'backend': self.backend,
+            'original_metrics': self.original_metrics.to_dict() if self.original_metrics else None,
+            'processed_metrics': self.processed_metrics.to_dict() if self.processed_metrics else None,
+            'profile': self.profile,
             'filters_applied': self.filters_applied,
             'processing_time_sec': round(self.processing_time_sec, 3),
             'success': self.success,
-            'error_message': self.error_message
+            'error_message': self.error_message,
+            'cache': self.cache_status,
+            'artifacts': [str(p) for p in self.artifacts]
+        }
+
+
+@dataclass
+class AudioChunk:
+    """Фрагмент длинной записи, обработанный в потоковом режиме"""
+    index: int
+    start_sec: float  # Начало фрагмента в исходной записи (с учётом перекрытия)
+    duration_sec: float  # Длительность фрагмента вместе с перекрытием
+    overlap_sec: float  # Перекрытие с предыдущим фрагментом (в начале фрагмента)
+    result: PreprocessingResult
+    overlap_end_sec: float = 0.0  # Перекрытие со следующим фрагментом (в конце, split_at_silence)
+    
+    @property
+    def output_file(self) -> Path:
+        return self.result.output_file
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'index': self.index,
+            'start_sec': round(self.start_sec, 3),
+            'duration_sec': round(self.duration_sec, 3),
+            'overlap_sec': round(self.overlap_sec, 3),
+            'overlap_end_sec': round(self.overlap_end_sec, 3),
+            **self.result.to_dict()
         }
 
 
+@dataclass
+class AudioAnalysis:
+    """Результат быстрого анализа фрагмента записи (для профиля 'auto')"""
+    sample_sec: float
+    channels: int
+    rms_level_db: float
+    peak_level_db: float
+    noise_floor_db: float
+    spectral_rolloff_hz: Optional[float] = None
+    
+    @property
+    def snr_db(self) -> float:
+        """Оценка SNR: средний уровень относительно самого тихого окна"""
+        return self.rms_level_db - self.noise_floor_db
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sample_sec': self.sample_sec,
+            'channels': self.channels,
+            'rms_level_db': self.rms_level_db,
+            'peak_level_db': self.peak_level_db,
+            'noise_floor_db': self.noise_floor_db,
+            'snr_db': self.snr_db,
+            'spectral_rolloff_hz': self.spectral_rolloff_hz
+        }
+
+
+@dataclass
+class QualityTarget:
+    """Пороги, по которым профиль 'auto' выбирает самый дешёвый достаточный профиль"""
+    clean_snr_db: float = 35.0  # Выше — шумоподавление не нужно
+    min_snr_db: float = 15.0  # Ниже — нужна агрессивная обработка
+    min_rms_db: float = -28.0  # Диапазон громкости, при котором
+    max_rms_db: float = -12.0  # loudnorm можно пропустить
+    max_rolloff_hz: float = 7000.0  # Выше (при шуме) — ВЧ шипение, нужен lowpass
+
+
 # ============================================================================
 # AUDIO FILTERS (Modular Design)
 # ============================================================================
@@ -106,6 +226,74 @@ class AudioFilter:
         """
         raise NotImplementedError
     
+    def prepare(self, input_file: Path, upstream: List['AudioFilter']) -> None:
+        """
+        Подготовка к обработке конкретного файла (до построения графа)
+        
+        Вызывается препроцессором перед apply(). По умолчанию ничего не делает;
+        фильтры, которым нужен анализ входа (например, двухпроходный loudnorm),
+        переопределяют этот метод.
+        
+        Args:
+            input_file: Входной файл
+            upstream: Фильтры, стоящие в цепочке перед этим
+        """
+        return None
+    
+    def on_complete(
+        self,
+        output_file: Path,
+        stderr: str,
+        start_sec: float = 0.0,
+        duration_sec: Optional[float] = None
+    ) -> List[Path]:
+        """
+        Обработка вывода ffmpeg после успешного прогона
+        
+        Фильтры-анализаторы (например, silencedetect) пишут результаты
+        в stderr; здесь они могут сохранить их рядом с output_file.
+        
+        Args:
+            output_file: Обработанный файл
+            stderr: Захваченный stderr ffmpeg
+            start_sec: Начало обработанного фрагмента во входном файле
+                (время в stderr отсчитывается от него)
+            duration_sec: Длина фрагмента (None — обрабатывался весь файл)
+        
+        Returns:
+            Список созданных побочных файлов
+        """
+        return []
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        """
+        Применяет фильтр к декодированному сигналу (NumPy-бэкенд)
+        
+        Args:
+            samples: float32 массив формы (frames, channels) в диапазоне [-1, 1]
+            sample_rate: Частота дискретизации
+            
+        Returns:
+            Обработанный массив той же формы (число кадров и каналов может измениться)
+        """
+        raise NotImplementedError
+    
+    def supports_array(self) -> bool:
+        """Есть ли у фильтра реализация для NumPy-бэкенда"""
+        return type(self).apply_array is not AudioFilter.apply_array
+    
+    def cache_params(self) -> Dict[str, Any]:
+        """
+        Параметры фильтра, влияющие на результат (для ключа кэша)
+        
+        Returns:
+            Словарь публичных атрибутов фильтра (кроме name и logger)
+        """
+        return {
+            key: value for key, value in vars(self).items()
+            if key not in ('name', 'logger') and not key.startswith('_')
+        }
+    
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name='{self.name}')"
 
@@ -129,35 +317,208 @@ class NoiseReductionFilter(AudioFilter):
 
 
 class LoudnessNormalizationFilter(AudioFilter):
-    """Фильтр нормализации громкости (EBU R128 standard)"""
+    """
+    Фильтр нормализации громкости (EBU R128 standard)
+    
+    В двухпроходном режиме первый проход измеряет integrated loudness,
+    LRA, true peak и порог, а второй применяет loudnorm в линейном режиме
+    с measured_* значениями — без буферизации динамического режима.
+    Измерения сохраняются рядом с входным файлом (<file>.loudnorm.json)
+    и переиспользуются при любых фильтрах после loudnorm.
+    """
     
-    def __init__(self, integrated: int = -16, true_peak: float = -1.5, lra: int = 11):
+    MEASUREMENT_SUFFIX = '.loudnorm.json'
+    
+    def __init__(
+        self,
+        integrated: int = -16,
+        true_peak: float = -1.5,
+        lra: int = 11,
+        two_pass: bool = False
+    ):
         """
         Args:
             integrated: Integrated loudness target (LUFS, default: -16)
             true_peak: True peak target (dBTP, default: -1.5)
             lra: Loudness range target (LU, default: 11)
+            two_pass: Двухпроходный линейный режим (default: False)
         """
         super().__init__("loudness_normalization")
         self.integrated = integrated
         self.true_peak = true_peak
         self.lra = lra
+        self.two_pass = two_pass
+        self._measurement: Optional[Dict[str, float]] = None
+    
+    def prepare(self, input_file: Path, upstream: List[AudioFilter]) -> None:
+        self._measurement = None
+        if self.two_pass:
+            self._measurement = self.measure(input_file, upstream)
+    
+    def measure(self, input_file: Path, upstream: List[AudioFilter]) -> Optional[Dict[str, float]]:
+        """
+        Первый проход loudnorm (с кэшированием измерений рядом с файлом)
+        
+        Args:
+            input_file: Входной файл
+            upstream: Фильтры перед loudnorm (влияют на измеряемый сигнал)
+            
+        Returns:
+            Словарь input_i / input_tp / input_lra / input_thresh / target_offset
+            или None, если измерение не удалось
+        """
+        input_file = Path(input_file)
+        store_file = input_file.with_name(input_file.name + self.MEASUREMENT_SUFFIX)
+        stat = input_file.stat()
+        measurement_key = json.dumps(
+            {
+                'upstream': [[type(f).__name__, f.cache_params()] for f in upstream],
+                'I': self.integrated,
+                'TP': self.true_peak,
+                'LRA': self.lra
+            },
+            sort_keys=True,
+            default=str
+        )
+        
+        store: Dict[str, Any] = {}
+        if store_file.exists():
+            try:
+                with open(store_file, 'r', encoding='utf-8') as f:
+                    store = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                store = {}
+            # Файл изменился — старые измерения недействительны
+            if store.get('size') != stat.st_size or store.get('mtime_ns') != stat.st_mtime_ns:
+                store = {}
+        
+        measurements = store.get('measurements', {})
+        if measurement_key in measurements:
+            self.logger.info(f"Using stored loudnorm measurement: {store_file.name}")
+            return measurements[measurement_key]
+        
+        self.logger.info(f"Measuring loudness (pass 1): {input_file.name}")
+        stream = ffmpeg.input(str(input_file))
+        for filter_instance in upstream:
+            stream = filter_instance.apply(stream)
+        stream = stream.filter(
+            'loudnorm',
+            I=self.integrated,
+            TP=self.true_peak,
+            LRA=self.lra,
+            print_format='json'
+        ).output('-', format='null')
+        
+        try:
+            _, stderr = stream.run(quiet=True, capture_stderr=True)
+            measurement = parse_loudnorm_measurement(stderr.decode('utf-8', errors='replace'))
+        except Exception as e:
+            self.logger.warning(f"Loudness measurement failed, falling back to single pass: {e}")
+            return None
+        
+        if measurement is None:
+            self.logger.warning("Loudness measurement not found in ffmpeg output, falling back to single pass")
+            return None
+        
+        measurements[measurement_key] = measurement
+        try:
+            with open(store_file, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'measurements': measurements},
+                    f,
+                    indent=2
+                )
+        except OSError as e:
+            self.logger.warning(f"Could not store loudnorm measurement: {e}")
+        
+        return measurement
     
     def apply(self, stream) -> Any:
+        if self._measurement is not None:
+            m = self._measurement
+            self.logger.info(
+                f"Applying linear loudness normalization: I={self.integrated} LUFS, "
+                f"measured I={m['input_i']} LUFS"
+            )
+            return stream.filter(
+                'loudnorm',
+                I=self.integrated,
+                TP=self.true_peak,
+                LRA=self.lra,
+                measured_I=m['input_i'],
+                measured_TP=m['input_tp'],
+                measured_LRA=m['input_lra'],
+                measured_thresh=m['input_thresh'],
+                offset=m['target_offset'],
+                linear='true'
+            )
+        
         self.logger.info(f"Applying loudness normalization: I={self.integrated} LUFS, TP={self.true_peak} dBTP")
         return stream.filter('loudnorm', I=self.integrated, TP=self.true_peak, LRA=self.lra)
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        # Линейное усиление до целевого уровня: громкость — RMS по блокам 400 мс
+        # с абсолютным гейтом -70 dB (упрощённый BS.1770 без K-взвешивания),
+        # усиление ограничено так, чтобы пик не превысил true_peak
+        mono = samples.mean(axis=1)
+        block = max(1, int(sample_rate * 0.4))
+        frames = len(mono) // block
+        if frames == 0:
+            return samples
+        power = np.square(mono[:frames * block].reshape(frames, block)).mean(axis=1)
+        gated = power[power > 10 ** (-70 / 10)]
+        if gated.size == 0:
+            return samples
+        loudness_db = 10 * np.log10(gated.mean())
+        gain_db = self.integrated - loudness_db
+        peak = float(np.abs(samples).max())
+        if peak > 0:
+            gain_db = min(gain_db, self.true_peak - 20 * np.log10(peak))
+        self.logger.info(f"Applying loudness normalization (linear): gain={gain_db:+.1f} dB")
+        return (samples * np.float32(10 ** (gain_db / 20))).astype(np.float32)
+
+
+def parse_loudnorm_measurement(stderr: str) -> Optional[Dict[str, float]]:
+    """
+    Извлекает JSON-блок измерений loudnorm (print_format=json) из stderr
+    
+    Args:
+        stderr: Захваченный stderr первого прохода
+        
+    Returns:
+        Словарь измерений или None
+    """
+    start = stderr.rfind('{')
+    end = stderr.rfind('}')
+    if start == -1 or end < start:
+        return None
+    
+    try:
+        data = json.loads(stderr[start:end + 1])
+        return {
+            key: float(data[key])
+            for key in ('input_i', 'input_tp', 'input_lra', 'input_thresh', 'target_offset')
+        }
+    except (json.JSONDecodeError, KeyError, ValueError):
+        # ValueError: loudnorm печатает "-inf" для полной тишины
+        return None
 
 
 class MonoConversionFilter(AudioFilter):
-    """Фильтр конвертации в моно"""
+    """Фильтр конвертации в моно (вход с любым числом каналов, в том числе уже моно)"""
     
     def __init__(self):
         super().__init__("mono_conversion")
     
     def apply(self, stream) -> Any:
         self.logger.info("Converting to mono (1 channel)")
-        # Смешиваем каналы с равными весами
-        return stream.filter('pan', 'mono|c0=0.5*c0+0.5*c1')
+        # Микширование каналов с равными весами; rematrix_maxval=1 нормирует
+        # матрицу (стерео — 0.5/0.5), моно проходит без изменений
+        return stream.filter('aresample', ochl='mono', rematrix_maxval=1)
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        self.logger.info("Converting to mono (1 channel)")
+        return samples.mean(axis=1, keepdims=True, dtype=np.float32)
 
 
 class SilenceRemovalFilter(AudioFilter):
@@ -184,6 +545,69 @@ class SilenceRemovalFilter(AudioFilter):
             stop_threshold=self.threshold,
             stop_duration=self.duration
         )
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        # Как silenceremove с start/stop_periods=1: обрезаем тишину в начале и в конце,
+        # если она длиннее duration (уровень — RMS по окнам 20 мс)
+        self.logger.info(f"Removing silence: threshold={self.threshold}, duration={self.duration}s")
+        window = max(1, int(sample_rate * 0.02))
+        frames = len(samples) // window
+        if frames == 0:
+            return samples
+        power = np.square(samples[:frames * window]).reshape(frames, -1).mean(axis=1)
+        loud = np.flatnonzero(power > parse_level(self.threshold) ** 2)
+        if loud.size == 0:
+            return samples[:0]
+        min_frames = int(self.duration * sample_rate / window)
+        start = loud[0] * window if loud[0] >= min_frames else 0
+        tail = frames - 1 - loud[-1]
+        end = (loud[-1] + 1) * window if tail >= min_frames else len(samples)
+        return samples[start:end]
+
+
+class SilenceDetectionFilter(AudioFilter):
+    """
+    Анализ пауз (silencedetect): индекс речевых сегментов рядом с результатом
+    
+    Звук не меняется. После обработки рядом с выходным файлом сохраняется
+    <output>.segments.npy — массив (N, 2) uint32 с началом/концом речевых
+    сегментов в мс. Время отсчитывается в той точке цепочки, где стоит фильтр:
+    первым в цепочке он даёт индекс во времени исходной записи (для точек
+    разреза при параллельном распознавании и привязки к видео). У фрагментов
+    process_chunks индекс тоже во времени всей записи: сдвинут на start_sec.
+    """
+    
+    INDEX_SUFFIX = '.segments.npy'
+    
+    def __init__(self, threshold: str = '-50dB', duration: float = 0.5):
+        """
+        Args:
+            threshold: Порог тишины (default: -50dB, как у SilenceRemovalFilter)
+            duration: Минимальная длительность паузы (сек, default: 0.5)
+        """
+        super().__init__("silence_detection")
+        self.threshold = threshold
+        self.duration = duration
+    
+    def apply(self, stream) -> Any:
+        self.logger.info(f"Detecting silence: threshold={self.threshold}, duration={self.duration}s")
+        return stream.filter('silencedetect', noise=self.threshold, d=self.duration)
+    
+    def on_complete(
+        self,
+        output_file: Path,
+        stderr: str,
+        start_sec: float = 0.0,
+        duration_sec: Optional[float] = None
+    ) -> List[Path]:
+        # Duration в stderr — длина всего входа; у фрагмента конец — его собственная длина
+        segments = parse_silencedetect(stderr, total_duration_sec=duration_sec)
+        offset_ms = round(start_sec * 1000)
+        segments = [(start + offset_ms, end + offset_ms) for start, end in segments]
+        index_file = output_file.with_suffix(self.INDEX_SUFFIX)
+        write_segment_index(index_file, segments)
+        self.logger.info(f"Speech segments: {len(segments)} -> {index_file.name}")
+        return [index_file]
 
 
 class HighPassFilter(AudioFilter):
@@ -200,6 +624,10 @@ class HighPassFilter(AudioFilter):
     def apply(self, stream) -> Any:
         self.logger.info(f"Applying highpass filter: f={self.frequency} Hz")
         return stream.filter('highpass', f=self.frequency, poles=2)
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        self.logger.info(f"Applying highpass filter: f={self.frequency} Hz")
+        return apply_biquad(samples, *biquad_coefficients('highpass', self.frequency, sample_rate))
 
 
 class LowPassFilter(AudioFilter):
@@ -216,6 +644,292 @@ class LowPassFilter(AudioFilter):
     def apply(self, stream) -> Any:
         self.logger.info(f"Applying lowpass filter: f={self.frequency} Hz")
         return stream.filter('lowpass', f=self.frequency, poles=2)
+    
+    def apply_array(self, samples: Any, sample_rate: int) -> Any:
+        self.logger.info(f"Applying lowpass filter: f={self.frequency} Hz")
+        return apply_biquad(samples, *biquad_coefficients('lowpass', self.frequency, sample_rate))
+
+
+# ============================================================================
+# NUMPY BACKEND HELPERS
+# ============================================================================
+
+def biquad_coefficients(kind: str, frequency: float, sample_rate: int) -> tuple[List[float], List[float]]:
+    """
+    Коэффициенты двухполюсного фильтра (RBJ Audio EQ Cookbook, Q=0.707 — как у ffmpeg)
+    
+    Args:
+        kind: 'highpass' или 'lowpass'
+        frequency: Частота среза (Hz)
+        sample_rate: Частота дискретизации
+        
+    Returns:
+        (b, a) — нормированные коэффициенты числителя и знаменателя
+    """
+    w0 = 2 * math.pi * min(frequency, sample_rate / 2 * 0.99) / sample_rate
+    alpha = math.sin(w0) / (2 * 0.707)
+    cos_w0 = math.cos(w0)
+    if kind == 'highpass':
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    elif kind == 'lowpass':
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+    else:
+        raise ValueError(f"Unknown biquad type: {kind}")
+    a0 = 1 + alpha
+    a = [1.0, -2 * cos_w0 / a0, (1 - alpha) / a0]
+    return [x / a0 for x in b], a
+
+
+def apply_biquad(samples: Any, b: List[float], a: List[float]) -> Any:
+    """
+    Применяет биквад через частотную характеристику в FFT-домене
+    
+    Рекурсия IIR по отсчётам в чистом Python слишком медленная, поэтому
+    сигнал умножается на H(e^jw) = B/A в частотной области. Сигнал дополняется
+    нулями на 0.1 с, чтобы хвост импульсной характеристики не заворачивался
+    в начало; для коротких клипов это совпадает с ffmpeg в пределах округления.
+    
+    Args:
+        samples: float32 массив (frames, channels)
+        b, a: Коэффициенты из biquad_coefficients
+        
+    Returns:
+        Отфильтрованный массив той же формы
+    """
+    length = samples.shape[0]
+    if length == 0:
+        return samples
+    n_fft = 1 << int(length + 4800 - 1).bit_length()
+    z = np.exp(-1j * np.pi * np.arange(n_fft // 2 + 1) / (n_fft // 2))
+    response = (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+    spectrum = np.fft.rfft(samples, n=n_fft, axis=0) * response[:, None]
+    return np.fft.irfft(spectrum, n=n_fft, axis=0)[:length].astype(np.float32)
+
+
+def parse_level(threshold: str) -> float:
+    """Переводит порог ffmpeg ('-50dB' или '0.003') в линейную амплитуду"""
+    value = threshold.strip()
+    if value.lower().endswith('db'):
+        return 10 ** (float(value[:-2]) / 20)
+    return float(value)
+
+
+# Нижняя граница битрейта сжатой речи (AMR-NB 12.2 kbps): оценка по размеру — сверху
+MIN_SPEECH_BITRATE_BPS = 12000
+# Ogg-страница не длиннее 65 307 байт: последняя целиком лежит в хвосте такого размера
+_OGG_TAIL_BYTES = 65536
+
+
+def estimate_duration_sec(input_file: Path) -> Optional[float]:
+    """
+    Быстрая оценка длительности без ffprobe (для выбора бэкенда)
+    
+    WAV — точно по заголовку; Ogg (Opus/Vorbis, в том числе голосовые
+    Telegram на 16–24 kbps) — точно по granule position последней страницы;
+    остальное — по размеру файла при MIN_SPEECH_BITRATE_BPS (оценка сверху:
+    сжатая речь битрейтом ниже не пишется).
+    
+    Returns:
+        Длительность в секундах или None, если файл не прочитать
+    """
+    try:
+        if input_file.suffix.lower() == '.wav':
+            with wave.open(str(input_file), 'rb') as wav:
+                return wav.getnframes() / wav.getframerate()
+        duration = _ogg_duration_sec(input_file)
+        if duration is not None:
+            return duration
+        return input_file.stat().st_size * 8 / MIN_SPEECH_BITRATE_BPS
+    except (OSError, wave.Error, EOFError, ZeroDivisionError, struct.error):
+        return None
+
+
+def _ogg_duration_sec(input_file: Path) -> Optional[float]:
+    """Длительность Ogg Opus/Vorbis по заголовкам (None — не Ogg или кодек не распознан)"""
+    with open(input_file, 'rb') as f:
+        head = f.read(4096)
+        if not head.startswith(b'OggS'):
+            return None
+        if b'OpusHead' in head:
+            # Opus: granule в отсчётах 48 kHz, первые pre_skip отсчётов не воспроизводятся
+            pre_skip = struct.unpack_from('<H', head, head.index(b'OpusHead') + 10)[0]
+            sample_rate = 48000
+        elif b'\x01vorbis' in head:
+            pre_skip = 0
+            sample_rate = struct.unpack_from('<I', head, head.index(b'\x01vorbis') + 12)[0]
+        else:
+            return None
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - _OGG_TAIL_BYTES))
+        tail = f.read()
+    
+    # Последняя страница: захват 'OggS' + версия 0, granule — int64 LE со смещения 6
+    last = tail.rfind(b'OggS\x00')
+    if last < 0 or last + 14 > len(tail) or not sample_rate:
+        return None
+    granule = struct.unpack_from('<q', tail, last + 6)[0]
+    if granule < 0:
+        return None
+    return max(0, granule - pre_skip) / sample_rate
+
+
+# ============================================================================
+# PREPROCESSING CACHE
+# ============================================================================
+
+class PreprocessingCache:
+    """
+    Content-addressed кэш результатов предобработки на диске
+    
+    Каждая запись — обработанный файл <key><suffix> и метаданные <key>.json
+    в поддиректории по первым двум символам ключа. Время последнего
+    использования хранится в mtime метаданных; при превышении лимита
+    размера вытесняются самые давно использованные записи.
+    """
+    
+    HASH_CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self, cache_dir: Path | str, max_size_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: Директория кэша
+            max_size_bytes: Максимальный суммарный размер обработанных файлов
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.logger = logging.getLogger(f"{__name__}.cache")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def hash_file(cls, file_path: Path) -> str:
+        """SHA-256 содержимого файла (читается блоками, без загрузки в память)"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def make_key(input_hash: str, params: Dict[str, Any]) -> str:
+        """Детерминированный ключ из хэша входа и параметров обработки"""
+        payload = json.dumps({'input': input_hash, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key: str, output_file: Path) -> Optional[Dict[str, Any]]:
+        """
+        Копирует закэшированный результат в output_file
+        
+        Args:
+            key: Ключ кэша
+            output_file: Куда положить обработанный файл
+            
+        Returns:
+            Сохранённый словарь PreprocessingResult или None при промахе
+        """
+        meta_path = self._meta_path(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            restored = []
+            for suffix in [meta['suffix']] + meta.get('artifacts', []):
+                target = output_file if suffix == meta['suffix'] else output_file.with_suffix(suffix)
+                tmp_file = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+                shutil.copyfile(meta_path.with_name(f"{key}{suffix}"), tmp_file)
+                os.replace(tmp_file, target)
+                if target != output_file:
+                    restored.append(str(target))
+            
+            # Отмечаем использование для LRU
+            os.utime(meta_path)
+            return {**meta['result'], 'artifacts': restored}
+        
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Broken cache entry {key[:12]}: {e}")
+            self._remove(key)
+            return None
+    
+    def put(
+        self,
+        key: str,
+        output_file: Path,
+        result: Dict[str, Any],
+        artifacts: Optional[List[Path]] = None
+    ) -> None:
+        """
+        Сохраняет обработанный файл и его метрики в кэш
+        
+        Args:
+            key: Ключ кэша
+            output_file: Обработанный файл
+            result: PreprocessingResult.to_dict()
+            artifacts: Побочные файлы фильтров (<output>.<suffix>)
+        """
+        artifact_suffixes = [
+            artifact.name[len(output_file.stem):] for artifact in (artifacts or [])
+        ]
+        meta_path = self._meta_path(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        sources = [(output_file, output_file.suffix)] + list(zip(artifacts or [], artifact_suffixes))
+        
+        try:
+            # Запись через временный файл: кэш делят воркеры process_batch
+            for source, suffix in sources:
+                target = meta_path.with_name(f"{key}{suffix}")
+                tmp_data = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+                shutil.copyfile(source, tmp_data)
+                os.replace(tmp_data, target)
+            
+            tmp_meta = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'suffix': output_file.suffix, 'artifacts': artifact_suffixes, 'result': result},
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_meta, meta_path)
+        
+        except OSError as e:
+            self.logger.warning(f"Failed to store cache entry {key[:12]}: {e}")
+            return
+        
+        self.evict()
+    
+    def _remove(self, key: str) -> None:
+        meta_path = self._meta_path(key)
+        for path in meta_path.parent.glob(f"{key}*"):
+            path.unlink(missing_ok=True)
+    
+    def evict(self) -> None:
+        """Удаляет давно использованные записи, пока кэш не уложится в лимит"""
+        entries = []
+        total_size = 0
+        
+        for meta_path in self.cache_dir.glob('??/*.json'):
+            key = meta_path.stem
+            try:
+                last_used = meta_path.stat().st_mtime
+                size = sum(
+                    p.stat().st_size for p in meta_path.parent.glob(f"{key}*")
+                )
+            except FileNotFoundError:
+                continue
+            entries.append((last_used, size, key))
+            total_size += size
+        
+        if total_size <= self.max_size_bytes:
+            return
+        
+        for _, size, key in sorted(entries):
+            self._remove(key)
+            total_size -= size
+            self.logger.info(f"Evicted cache entry {key[:12]} ({size / 1024 / 1024:.1f} MB)")
+            if total_size <= self.max_size_bytes:
+                break
 
 
 # ============================================================================
@@ -253,11 +967,23 @@ class AudioPreprocessor:
         }
     }
     
+    # Профиль, выбираемый автоматически по анализу короткого фрагмента
+    AUTO_PROFILE = 'auto'
+    AUTO_PROFILE_DESCRIPTION = 'Самый дешёвый профиль, достаточный по анализу фрагмента записи'
+    
     def __init__(
         self,
         target_sample_rate: int = 16000,
         target_codec: str = 'libmp3lame',
         target_bitrate: str = '128k',
+        single_pass: bool = True,
+        cache_dir: Optional[Path] = None,
+        cache_max_size_mb: int = 2048,
+        segment_index: bool = False,
+        quality_target: Optional[QualityTarget] = None,
+        output_format: Optional[str] = None,
+        backend: str = 'auto',
+        numpy_max_duration_sec: float = 60.0,
         logger: Optional[logging.Logger] = None
     ):
         """
@@ -265,6 +991,19 @@ class AudioPreprocessor:
             target_sample_rate: Целевая частота дискретизации (Hz, default: 16000)
             target_codec: Целевой кодек (default: libmp3lame для MP3)
             target_bitrate: Целевой битрейт (default: 128k)
+            single_pass: Собирать метрики до/после из stderr одного запуска ffmpeg
+                вместо отдельных ffprobe (default: True)
+            cache_dir: Директория кэша результатов (None — кэш выключен)
+            cache_max_size_mb: Максимальный размер кэша в MB (LRU-вытеснение)
+            segment_index: Ставить silence_detection первым в цепочку
+                (индекс речевых сегментов во времени исходной записи)
+            quality_target: Пороги выбора профиля для profile='auto'
+            output_format: Выходной формат из OUTPUT_FORMATS (mp3, ogg_opus, wav,
+                linear16); задаёт кодек, контейнер и битрейт вместо target_codec
+                и target_bitrate
+            backend: 'ffmpeg', 'numpy' или 'auto' — NumPy для клипов не длиннее
+                numpy_max_duration_sec, если все фильтры цепочки его поддерживают
+            numpy_max_duration_sec: Порог длительности для NumPy-бэкенда (сек, default: 60)
             logger: Опциональный logger
         """
         if not FFMPEG_AVAILABLE:
@@ -273,10 +1012,29 @@ class AudioPreprocessor:
                 "Install with: pip install ffmpeg-python"
             )
         
+        if output_format is not None and output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format: {output_format}. "
+                f"Available formats: {', '.join(OUTPUT_FORMATS.keys())}"
+            )
+        
+        if backend not in ('auto', 'ffmpeg', 'numpy'):
+            raise ValueError(f"Unknown backend: {backend}. Available backends: auto, ffmpeg, numpy")
+        
+        self.output_format = output_format
+        self.backend = backend
+        self.numpy_max_duration_sec = numpy_max_duration_sec
         self.target_sample_rate = target_sample_rate
-        self.target_codec = target_codec
-        self.target_bitrate = target_bitrate
+        self.target_codec = OUTPUT_FORMATS[output_format]['codec'] if output_format else target_codec
+        self.target_bitrate = OUTPUT_FORMATS[output_format]['bitrate'] if output_format else target_bitrate
+        self.single_pass = single_pass
+        self.segment_index = segment_index
+        self.quality_target = quality_target or QualityTarget()
         self.logger = logger or logging.getLogger(__name__)
+        self.cache = (
+            PreprocessingCache(cache_dir, max_size_bytes=cache_max_size_mb * 1024 * 1024)
+            if cache_dir else None
+        )
         
         # Регистр доступных фильтров
         self._filter_registry = {
@@ -284,6 +1042,7 @@ class AudioPreprocessor:
             'loudness_normalization': LoudnessNormalizationFilter(),
             'mono_conversion': MonoConversionFilter(),
             'silence_removal': SilenceRemovalFilter(),
+            'silence_detection': SilenceDetectionFilter(),
             'highpass': HighPassFilter(),
             'lowpass': LowPassFilter()
         }
@@ -309,6 +1068,17 @@ class AudioPreprocessor:
         Returns:
             AudioMetrics с характеристиками файла
         """
+        if self._is_raw_pcm_output(file_path):
+            # У linear16 нет заголовка, ffprobe его не прочитает: параметры заданы форматом
+            channels = 1 if OUTPUT_FORMATS['linear16']['mono'] else 2
+            return AudioMetrics(
+                duration_sec=file_path.stat().st_size / (2 * channels * self.target_sample_rate),
+                sample_rate=self.target_sample_rate,
+                channels=channels,
+                bitrate=self.target_sample_rate * channels * 16,
+                codec='pcm_s16le'
+            )
+        
         try:
             probe = ffmpeg.probe(str(file_path))
             audio_stream = next(
@@ -331,42 +1101,376 @@ class AudioPreprocessor:
             self.logger.error(f"Failed to extract audio metrics: {e}")
             raise
     
-    def process(
+    def _is_raw_pcm_output(self, file_path: Path) -> bool:
+        """Файл — наш выход linear16 (сырой PCM s16le без заголовка)"""
+        return (
+            self.output_format == 'linear16'
+            and file_path.suffix.lower() == OUTPUT_FORMATS['linear16']['suffix']
+        )
+    
+    def _save_metrics(self, result: PreprocessingResult) -> None:
+        metrics_file = result.output_file.with_suffix('.preprocessing.json')
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
+        self.logger.info(f"Metrics saved: {metrics_file.name}")
+    
+    def _cache_key(self, input_file: Path, filters_to_apply: List[str], backend: str = 'ffmpeg') -> str:
+        """Ключ кэша: хэш содержимого входа + цепочка фильтров + выходные параметры"""
+        filter_chain = [
+            {
+                'name': name,
+                'class': type(self._filter_registry[name]).__name__,
+                'params': self._filter_registry[name].cache_params()
+            }
+            for name in filters_to_apply
+            if name in self._filter_registry
+        ]
+        return self.cache.make_key(
+            PreprocessingCache.hash_file(input_file),
+            {
+                'filters': filter_chain,
+                'sample_rate': self.target_sample_rate,
+                'codec': self.target_codec,
+                'bitrate': self.target_bitrate,
+                'format': self.output_format,
+                'backend': backend
+            }
+        )
+    
+    def _resolve_filters(
         self,
         input_file: Path,
-        output_file: Optional[Path] = None,
-        profile: str = 'standard',
-        custom_filters: Optional[List[str]] = None,
-        save_metrics: bool = True
-    ) -> PreprocessingResult:
+        profile: str,
+        custom_filters: Optional[List[str]]
+    ) -> tuple[str, List[str]]:
+        """Профиль и список фильтров: пользовательский, из профиля или выбранный анализом"""
+        if custom_filters:
+            filters = list(custom_filters)
+        elif profile == self.AUTO_PROFILE:
+            profile = self.select_profile(input_file)
+            filters = list(self.PROFILES[profile]['filters'])
+        elif profile in self.PROFILES:
+            filters = list(self.PROFILES[profile]['filters'])
+        else:
+            raise ValueError(
+                f"Unknown profile: {profile}. "
+                f"Available profiles: {', '.join(self.PROFILES.keys())}, {self.AUTO_PROFILE}"
+            )
+        
+        if self.segment_index and 'silence_detection' not in filters:
+            filters.insert(0, 'silence_detection')
+        return profile, filters
+    
+    def analyze(self, input_file: Path, sample_sec: float = 30.0) -> AudioAnalysis:
         """
-        Обрабатывает аудио файл
+        Быстрый анализ начала записи (astats + спектральный спад)
         
         Args:
-            input_file: Путь к входному файлу
-            output_file: Путь к выходному файлу (опционально)
-            profile: Предустановленный профиль ('clean', 'standard', 'aggressive', 'speech_optimized')
-            custom_filters: Список пользовательских фильтров (перекрывает profile)
-            save_metrics: Сохранить метрики в .json файл
+            input_file: Входной файл
+            sample_sec: Длина анализируемого фрагмента (default: 30)
             
         Returns:
-            PreprocessingResult с результатами обработки
-            
-        Raises:
-            FileNotFoundError: Если входной файл не найден
-            ValueError: Если профиль неизвестен
-            RuntimeError: Если обработка не удалась
+            AudioAnalysis
         """
-        start_time = time.time()
+        def run(with_rolloff: bool) -> str:
+            stream = ffmpeg.input(str(input_file), t=sample_sec)
+            stream = stream.filter('astats', metadata=0)
+            if with_rolloff:
+                stream = stream.filter('aspectralstats', measure='rolloff').filter(
+                    'ametadata', mode='print', key='lavfi.aspectralstats.1.rolloff'
+                )
+            _, stderr = stream.output('-', format='null').run(quiet=True, capture_stderr=True)
+            return stderr.decode('utf-8', errors='replace')
         
-        # Валидация входных данных
-        input_file = Path(input_file)
+        try:
+            stderr = run(with_rolloff=True)
+        except ffmpeg.Error:
+            # aspectralstats есть только в ffmpeg >= 5.1
+            self.logger.debug("aspectralstats unavailable, analysing without spectral rolloff")
+            stderr = run(with_rolloff=False)
+        
+        analysis = parse_audio_analysis(stderr, sample_sec)
+        if analysis is None:
+            raise RuntimeError(f"Could not analyse audio: {input_file}")
+        return analysis
+    
+    def select_profile(self, input_file: Path) -> str:
+        """
+        Выбирает самый дешёвый профиль, удовлетворяющий quality_target
+        
+        Порядок по стоимости: clean (без afftdn и loudnorm) → standard → aggressive.
+        
+        Args:
+            input_file: Входной файл
+            
+        Returns:
+            Имя профиля из PROFILES
+        """
+        target = self.quality_target
+        try:
+            analysis = self.analyze(input_file)
+        except Exception as e:
+            self.logger.warning(f"Audio analysis failed ({e}), using 'standard' profile")
+            return 'standard'
+        
+        hiss = (
+            analysis.spectral_rolloff_hz is not None
+            and analysis.spectral_rolloff_hz > target.max_rolloff_hz
+            and analysis.snr_db < target.clean_snr_db
+        )
+        
+        if (
+            analysis.snr_db >= target.clean_snr_db
+            and target.min_rms_db <= analysis.rms_level_db <= target.max_rms_db
+        ):
+            profile = 'clean'
+        elif analysis.snr_db < target.min_snr_db or hiss:
+            profile = 'aggressive'
+        else:
+            profile = 'standard'
+        
+        self.logger.info(
+            f"Auto profile: {profile} (SNR {analysis.snr_db:.1f} dB, "
+            f"RMS {analysis.rms_level_db:.1f} dB, "
+            f"rolloff {analysis.spectral_rolloff_hz or 0:.0f} Hz, {analysis.channels} ch)"
+        )
+        return profile
+    
+    def _lookup_filters(self, filters_to_apply: List[str]) -> List[AudioFilter]:
+        """Находит фильтры в регистре (неизвестные пропускаются)"""
+        chain: List[AudioFilter] = []
+        for filter_name in filters_to_apply:
+            if filter_name not in self._filter_registry:
+                self.logger.warning(f"Unknown filter: {filter_name}, skipping")
+                continue
+            chain.append(self._filter_registry[filter_name])
+        return chain
+    
+    def _prepare_filters(self, input_file: Path, filters_to_apply: List[str]) -> List[AudioFilter]:
+        """Находит фильтры в регистре и вызывает их prepare() для входного файла"""
+        chain = self._lookup_filters(filters_to_apply)
+        for index, filter_instance in enumerate(chain):
+            filter_instance.prepare(input_file, chain[:index])
+        return chain
+    
+    def _select_backend(self, input_file: Path, filters_to_apply: List[str]) -> str:
+        """
+        Выбирает бэкенд: 'numpy' для коротких клипов, если все фильтры его поддерживают
+        
+        Returns:
+            'numpy' или 'ffmpeg'
+        """
+        if self.backend == 'ffmpeg':
+            return 'ffmpeg'
+        
+        if not NUMPY_AVAILABLE:
+            if self.backend == 'numpy':
+                self.logger.warning("NumPy is not installed, using ffmpeg backend")
+            return 'ffmpeg'
+        
+        chain = [self._filter_registry[name] for name in filters_to_apply if name in self._filter_registry]
+        unsupported = [f.name for f in chain if not f.supports_array()]
+        if unsupported:
+            if self.backend == 'numpy':
+                self.logger.warning(
+                    f"Filters without NumPy implementation: {', '.join(unsupported)}, using ffmpeg backend"
+                )
+            return 'ffmpeg'
+        
+        if self.backend == 'numpy':
+            return 'numpy'
+        
+        duration = estimate_duration_sec(input_file)
+        return 'numpy' if duration is not None and duration <= self.numpy_max_duration_sec else 'ffmpeg'
+    
+    def _process_numpy(
+        self,
+        input_file: Path,
+        output_file: Path,
+        chain: List[AudioFilter]
+    ) -> tuple[AudioMetrics, AudioMetrics]:
+        """
+        NumPy-бэкенд: декодирование в float32, фильтры в памяти, запись результата
+        
+        WAV (PCM 16 bit с целевой частотой) читается без ffmpeg; остальное
+        декодируется одним запуском ffmpeg с ресемплингом в target_sample_rate.
+        Форматы wav/linear16 пишутся без ffmpeg, остальные кодируются через pipe.
+        
+        Returns:
+            (original_metrics, processed_metrics)
+        """
+        samples, original_metrics = self._decode_to_array(input_file)
+        sample_rate = self.target_sample_rate
+        
+        for filter_instance in chain:
+            samples = filter_instance.apply_array(samples, sample_rate)
+        
+        if self.output_format and OUTPUT_FORMATS[self.output_format]['mono'] and samples.shape[1] > 1:
+            samples = samples.mean(axis=1, keepdims=True, dtype=np.float32)
+        
+        channels = samples.shape[1]
+        duration_sec = samples.shape[0] / sample_rate
+        
+        if self.output_format in ('wav', 'linear16'):
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype('<i2')
+            if self.output_format == 'wav':
+                with wave.open(str(output_file), 'wb') as wav:
+                    wav.setnchannels(channels)
+                    wav.setsampwidth(2)
+                    wav.setframerate(sample_rate)
+                    wav.writeframes(pcm.tobytes())
+            else:
+                output_file.write_bytes(pcm.tobytes())
+            processed_metrics = AudioMetrics(
+                duration_sec=duration_sec,
+                sample_rate=sample_rate,
+                channels=channels,
+                bitrate=sample_rate * channels * 16,
+                codec='pcm_s16le'
+            )
+        else:
+            _, stderr = (
+                ffmpeg
+                .input('pipe:', format='f32le', ac=channels, ar=sample_rate)
+                .output(str(output_file), **self._output_kwargs())
+                .run(input=samples.astype('<f4').tobytes(), overwrite_output=True, quiet=True)
+            )
+            _, processed_metrics = parse_ffmpeg_stderr(
+                stderr.decode('utf-8', errors='replace') if stderr else ''
+            )
+            if processed_metrics is None:
+                processed_metrics = self.get_audio_metrics(output_file)
+        
+        return original_metrics, processed_metrics
+    
+    def _decode_to_array(self, input_file: Path) -> tuple[Any, AudioMetrics]:
+        """Декодирует вход в массив float32 формы (frames, channels) с target_sample_rate"""
+        if input_file.suffix.lower() == '.wav':
+            try:
+                with wave.open(str(input_file), 'rb') as wav:
+                    if wav.getsampwidth() == 2 and wav.getframerate() == self.target_sample_rate:
+                        channels = wav.getnchannels()
+                        frames = wav.readframes(wav.getnframes())
+                        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+                        samples = samples.reshape(-1, channels)
+                        return samples, AudioMetrics(
+                            duration_sec=samples.shape[0] / self.target_sample_rate,
+                            sample_rate=self.target_sample_rate,
+                            channels=channels,
+                            bitrate=self.target_sample_rate * channels * 16,
+                            codec='pcm_s16le'
+                        )
+            except wave.Error:
+                pass  # Не PCM WAV — декодируем через ffmpeg
+        
+        stdout, stderr = (
+            ffmpeg
+            .input(str(input_file))
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ar=self.target_sample_rate)
+            .run(capture_stdout=True, capture_stderr=True, quiet=True)
+        )
+        original_metrics, _ = parse_ffmpeg_stderr(stderr.decode('utf-8', errors='replace'))
+        if original_metrics is None:
+            original_metrics = self.get_audio_metrics(input_file)
+        
+        channels = max(1, original_metrics.channels)
+        samples = np.frombuffer(stdout, dtype='<f4').reshape(-1, channels)
+        return samples, original_metrics
+    
+    @staticmethod
+    def _apply_filters(stream, chain: List[AudioFilter]) -> Any:
+        for filter_instance in chain:
+            stream = filter_instance.apply(stream)
+        return stream
+    
+    @staticmethod
+    def _collect_artifacts(
+        chain: List[AudioFilter],
+        output_file: Path,
+        stderr: str,
+        start_sec: float = 0.0,
+        duration_sec: Optional[float] = None
+    ) -> List[Path]:
+        artifacts: List[Path] = []
+        for filter_instance in chain:
+            artifacts.extend(filter_instance.on_complete(output_file, stderr, start_sec, duration_sec))
+        return artifacts
+    
+    def _output_kwargs(self) -> Dict[str, Any]:
+        """Выходные параметры ffmpeg (кодек, битрейт, частота, контейнер)"""
+        if self.output_format:
+            spec = OUTPUT_FORMATS[self.output_format]
+            kwargs = {
+                'acodec': spec['codec'],
+                'audio_bitrate': spec['bitrate'],
+                'ar': self.target_sample_rate,
+                'ac': 1 if spec['mono'] else None,
+                'format': spec['container']
+            }
+        else:
+            kwargs = {
+                'acodec': self.target_codec,
+                'audio_bitrate': self.target_bitrate,
+                'ar': self.target_sample_rate,
+                'format': 'mp3' if self.target_codec == 'libmp3lame' else None
+            }
+        # ffmpeg-python передаёт None как аргумент командной строки — убираем
+        return {key: value for key, value in kwargs.items() if value is not None}
+    
+    def _output_suffix(self, default: str) -> str:
+        """Расширение выходного файла: по формату или переданное по умолчанию"""
+        return OUTPUT_FORMATS[self.output_format]['suffix'] if self.output_format else default
+    
+    @property
+    def speechkit_audio_format(self) -> str:
+        """Значение audio_format для YandexSpeechKit.transcribe_from_uri"""
+        if self.output_format:
+            return OUTPUT_FORMATS[self.output_format]['speechkit_format']
+        return 'MP3' if self.target_codec == 'libmp3lame' else 'AUTO'
+    
+    def _log_metrics(self, label: str, metrics: AudioMetrics) -> None:
+        self.logger.info(
+            f"{label}: {metrics.sample_rate} Hz, "
+            f"{metrics.channels} ch, "
+            f"{metrics.duration_sec:.1f}s"
+        )
+    
+    def process(
+        self,
+        input_file: Path,
+        output_file: Optional[Path] = None,
+        profile: str = 'standard',
+        custom_filters: Optional[List[str]] = None,
+        save_metrics: bool = True
+    ) -> PreprocessingResult:
+        """
+        Обрабатывает аудио файл
+        
+        Args:
+            input_file: Путь к входному файлу
+            output_file: Путь к выходному файлу (опционально)
+            profile: Предустановленный профиль ('clean', 'standard', 'aggressive', 'speech_optimized')
+            custom_filters: Список пользовательских фильтров (перекрывает profile)
+            save_metrics: Сохранить метрики в .json файл
+            
+        Returns:
+            PreprocessingResult с результатами обработки
+            
+        Raises:
+            FileNotFoundError: Если входной файл не найден
+            ValueError: Если профиль неизвестен
+            RuntimeError: Если обработка не удалась
+        """
+        start_time = time.time()
+        
+        # Валидация входных данных
+        input_file = Path(input_file)
         if not input_file.exists():
             raise FileNotFoundError(f"Input file not found: {input_file}")
         
         # Определяем выходной файл
         if output_file is None:
-            output_file = input_file.parent / f"{input_file.stem}_preprocessed{input_file.suffix}"
+            output_file = input_file.parent / f"{input_file.stem}_preprocessed{self._output_suffix(input_file.suffix)}"
         else:
             output_file = Path(output_file)
         
@@ -374,55 +1478,75 @@ class AudioPreprocessor:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Определяем фильтры
-        if custom_filters:
-            filters_to_apply = custom_filters
-        elif profile in self.PROFILES:
-            filters_to_apply = self.PROFILES[profile]['filters']
-        else:
-            raise ValueError(
-                f"Unknown profile: {profile}. "
-                f"Available profiles: {', '.join(self.PROFILES.keys())}"
-            )
+        profile, filters_to_apply = self._resolve_filters(input_file, profile, custom_filters)
         
         self.logger.info(f"Processing: {input_file.name}")
         self.logger.info(f"Profile: {profile}")
         self.logger.info(f"Filters: {', '.join(filters_to_apply)}")
         
+        cache_key = None
+        backend = self._select_backend(input_file, filters_to_apply)
+        
         try:
-            # Извлекаем метрики оригинала
-            original_metrics = self.get_audio_metrics(input_file)
-            self.logger.info(
-                f"Original: {original_metrics.sample_rate} Hz, "
-                f"{original_metrics.channels} ch, "
-                f"{original_metrics.duration_sec:.1f}s"
-            )
+            # Проверяем кэш: совпадение входа и цепочки фильтров — ffmpeg не нужен
+            if self.cache is not None:
+                cache_key = self._cache_key(input_file, filters_to_apply, backend)
+                cached = self.cache.get(cache_key, output_file)
+                if cached is not None:
+                    result = PreprocessingResult(
+                        output_file=output_file,
+                        original_metrics=AudioMetrics(**cached['original_metrics']),
+                        processed_metrics=AudioMetrics(**cached['processed_metrics']),
+                        filters_applied=filters_to_apply,
+                        profile=profile,
+                        processing_time_sec=time.time() - start_time,
+                        success=True,
+                        cache_status='hit',
+                        artifacts=[Path(p) for p in cached['artifacts']],
+                        backend=backend
+                    )
+                    self.logger.info(f"Cache hit: {input_file.name} ({cache_key[:12]})")
+                    if save_metrics:
+                        self._save_metrics(result)
+                    return result
             
-            # Создаем ffmpeg stream
-            stream = ffmpeg.input(str(input_file))
+            if backend == 'numpy':
+                # Короткий клип: декодируем один раз и фильтруем в памяти
+                original_metrics, processed_metrics = self._process_numpy(
+                    input_file, output_file, self._lookup_filters(filters_to_apply)
+                )
+                artifacts = []
+                self._log_metrics("Original", original_metrics)
+            else:
+                # Извлекаем метрики оригинала (в single-pass режиме — из stderr ffmpeg)
+                if not self.single_pass:
+                    original_metrics = self.get_audio_metrics(input_file)
+                    self._log_metrics("Original", original_metrics)
             
-            # Применяем фильтры последовательно
-            for filter_name in filters_to_apply:
-                if filter_name not in self._filter_registry:
-                    self.logger.warning(f"Unknown filter: {filter_name}, skipping")
-                    continue
-                
-                filter_instance = self._filter_registry[filter_name]
-                stream = filter_instance.apply(stream)
-            
-            # Применяем выходные параметры
-            stream = stream.output(
-                str(output_file),
-                acodec=self.target_codec,
-                audio_bitrate=self.target_bitrate,
-                ar=self.target_sample_rate,
-                format='mp3' if self.target_codec == 'libmp3lame' else None
-            )
+                # Создаем ffmpeg stream и применяем фильтры последовательно
+                filter_chain = self._prepare_filters(input_file, filters_to_apply)
+                stream = self._apply_filters(ffmpeg.input(str(input_file)), filter_chain)
+            
+                # Применяем выходные параметры
+                stream = stream.output(str(output_file), **self._output_kwargs())
             
-            # Выполняем обработку
-            stream.run(overwrite_output=True, quiet=True, capture_stderr=True)
+                # Выполняем обработку
+                _, stderr = stream.run(overwrite_output=True, quiet=True, capture_stderr=True)
+                stderr_text = stderr.decode('utf-8', errors='replace') if stderr else ''
+                artifacts = self._collect_artifacts(filter_chain, output_file, stderr_text)
+            
+                # Извлекаем метрики результата
+                if self.single_pass:
+                    original_metrics, processed_metrics = parse_ffmpeg_stderr(stderr_text)
+                    # Если stderr не удалось разобрать — откатываемся на ffprobe
+                    if original_metrics is None:
+                        original_metrics = self.get_audio_metrics(input_file)
+                    if processed_metrics is None:
+                        processed_metrics = self.get_audio_metrics(output_file)
+                    self._log_metrics("Original", original_metrics)
+                else:
+                    processed_metrics = self.get_audio_metrics(output_file)
             
-            # Извлекаем метрики результата
-            processed_metrics = self.get_audio_metrics(output_file)
             processing_time = time.time() - start_time
             
             self.logger.info(
@@ -437,16 +1561,20 @@ class AudioPreprocessor:
                 original_metrics=original_metrics,
                 processed_metrics=processed_metrics,
                 filters_applied=filters_to_apply,
+                profile=profile,
                 processing_time_sec=processing_time,
-                success=True
+                success=True,
+                cache_status='miss' if cache_key else None,
+                artifacts=artifacts,
+                backend=backend
             )
             
+            if cache_key:
+                self.cache.put(cache_key, output_file, result.to_dict(), artifacts=artifacts)
+            
             # Сохраняем метрики
             if save_metrics:
-                metrics_file = output_file.with_suffix('.preprocessing.json')
-                with open(metrics_file, 'w', encoding='utf-8') as f:
-                    json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
-                self.logger.info(f"Metrics saved: {metrics_file.name}")
+                self._save_metrics(result)
             
             return result
         
@@ -460,10 +1588,857 @@ class AudioPreprocessor:
                 original_metrics=original_metrics if 'original_metrics' in locals() else None,
                 processed_metrics=None,
                 filters_applied=filters_to_apply,
+                profile=profile,
                 processing_time_sec=processing_time,
                 success=False,
+                error_message=error_msg,
+                backend=backend
+            )
+
+    def process_chunks(
+        self,
+        input_file: Path,
+        output_dir: Optional[Path] = None,
+        profile: str = 'standard',
+        custom_filters: Optional[List[str]] = None,
+        chunk_sec: float = 300.0,
+        overlap_sec: float = 2.0,
+        workers: int = 2
+    ) -> Iterator[AudioChunk]:
+        """
+        Потоковая обработка длинной записи фрагментами
+        
+        Запись режется на фрагменты фиксированной длины с перекрытием,
+        каждый фрагмент проходит цепочку фильтров и отдаётся сразу после
+        готовности (в порядке следования), так что загрузку и распознавание
+        можно начинать, не дожидаясь обработки всего файла.
+        
+        prepare() фильтров вызывается один раз для всей записи — например,
+        двухпроходный loudnorm измеряет громкость целиком и применяет
+        одинаковое линейное усиление ко всем фрагментам. Фильтр silence_removal
+        сдвигает время внутри фрагмента относительно start_sec; индекс
+        silence_detection у фрагмента — во времени всей записи.
+        
+        Args:
+            input_file: Путь к входному файлу
+            output_dir: Директория для фрагментов (default: <stem>_chunks рядом с входом)
+            profile: Предустановленный профиль
+            custom_filters: Список пользовательских фильтров (перекрывает profile)
+            chunk_sec: Длина фрагмента в секундах (default: 300)
+            overlap_sec: Перекрытие соседних фрагментов в секундах (default: 2)
+            workers: Сколько фрагментов обрабатывать одновременно (default: 2)
+            
+        Yields:
+            AudioChunk по порядку
+            
+        Raises:
+            FileNotFoundError: Если входной файл не найден
+            ValueError: Если профиль или параметры нарезки некорректны
+        """
+        input_file = Path(input_file)
+        if not input_file.exists():
+            raise FileNotFoundError(f"Input file not found: {input_file}")
+        
+        if output_dir is None:
+            output_dir = input_file.parent / f"{input_file.stem}_chunks"
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        profile, filters_to_apply = self._resolve_filters(input_file, profile, custom_filters)
+        original_metrics = self.get_audio_metrics(input_file)
+        plan = plan_chunks(original_metrics.duration_sec, chunk_sec, overlap_sec)
+        
+        self.logger.info(
+            f"Streaming {input_file.name}: {len(plan)} chunks of {chunk_sec:.0f}s "
+            f"(overlap {overlap_sec:.1f}s), filters: {', '.join(filters_to_apply)}"
+        )
+        
+        filter_chain = self._prepare_filters(input_file, filters_to_apply)
+        suffix = self._output_suffix('.mp3' if self.target_codec == 'libmp3lame' else input_file.suffix)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            pending = deque()
+            for index, (start, duration, overlap) in enumerate(plan):
+                output_file = output_dir / f"{input_file.stem}_chunk{index:04d}{suffix}"
+                future = executor.submit(
+                    self._process_chunk,
+                    input_file, output_file, filter_chain, filters_to_apply, profile, start, duration
+                )
+                pending.append((index, start, duration, overlap, future))
+                
+                # Держим в работе не больше workers фрагментов
+                if len(pending) >= max(1, workers):
+                    yield self._chunk_from_pending(pending.popleft())
+            
+            while pending:
+                yield self._chunk_from_pending(pending.popleft())
+    
+    def detect_speech_segments(
+        self,
+        input_file: Path,
+        threshold: str = '-50dB',
+        min_silence_sec: float = 0.5
+    ) -> List[tuple[int, int]]:
+        """
+        Речевые сегменты записи (silencedetect, один проход без кодирования)
+        
+        Args:
+            input_file: Входной файл
+            threshold: Порог тишины (как у SilenceDetectionFilter)
+            min_silence_sec: Минимальная длительность паузы
+            
+        Returns:
+            Список (start_ms, end_ms) речевых сегментов
+        """
+        _, stderr = (
+            ffmpeg.input(str(input_file))
+            .filter('silencedetect', noise=threshold, d=min_silence_sec)
+            .output('-', format='null')
+            .run(quiet=True, capture_stderr=True)
+        )
+        return parse_silencedetect(stderr.decode('utf-8', errors='replace'))
+    
+    def split_at_silence(
+        self,
+        input_file: Path,
+        output_dir: Optional[Path] = None,
+        segment_sec: float = 600.0,
+        overlap_sec: float = 1.0,
+        search_sec: Optional[float] = None,
+        profile: Optional[str] = None,
+        custom_filters: Optional[List[str]] = None,
+        workers: int = 4
+    ) -> List[AudioChunk]:
+        """
+        Режет длинную запись на сегменты по паузам (plan_silence_splits)
+        
+        Сегменты нарезаются параллельно (seek на входе) и предназначены
+        для одновременного распознавания: YandexSpeechKit.transcribe_split
+        сдвигает метки времени на start_sec и убирает дубли слов в
+        перекрытиях. Без profile/custom_filters звук только перекодируется
+        в выходной формат.
+        
+        Args:
+            input_file: Путь к входному файлу
+            output_dir: Директория для сегментов (default: <stem>_split рядом с входом)
+            segment_sec: Номинальная длина сегмента в секундах (default: 600)
+            overlap_sec: Расширение сегмента за каждую границу (default: 1)
+            search_sec: Окно поиска паузы вокруг номинальной границы (default: segment_sec / 4)
+            profile: Профиль предобработки сегментов (default: без фильтров)
+            custom_filters: Список пользовательских фильтров (перекрывает profile)
+            workers: Сколько сегментов нарезать одновременно (default: 4)
+            
+        Returns:
+            Список AudioChunk по порядку
+            
+        Raises:
+            FileNotFoundError: Если входной файл не найден
+            ValueError: Если профиль или параметры нарезки некорректны
+            RuntimeError: Если не удалось нарезать сегмент
+        """
+        input_file = Path(input_file)
+        if not input_file.exists():
+            raise FileNotFoundError(f"Input file not found: {input_file}")
+        
+        if output_dir is None:
+            output_dir = input_file.parent / f"{input_file.stem}_split"
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if profile is None and not custom_filters:
+            profile, filters_to_apply = 'none', []
+        else:
+            profile, filters_to_apply = self._resolve_filters(input_file, profile or 'standard', custom_filters)
+            # Индекс пауз для сегментов не нужен — паузы уже найдены по всей записи
+            filters_to_apply = [name for name in filters_to_apply if name != 'silence_detection']
+        
+        duration_sec = self.get_audio_metrics(input_file).duration_sec
+        speech_segments = self.detect_speech_segments(input_file)
+        plan = plan_silence_splits(duration_sec, speech_segments, segment_sec, overlap_sec, search_sec)
+        
+        self.logger.info(
+            f"Splitting {input_file.name} ({duration_sec:.0f}s) into {len(plan)} segments "
+            f"at silence (~{segment_sec:.0f}s, overlap {overlap_sec:.1f}s)"
+        )
+        
+        filter_chain = self._prepare_filters(input_file, filters_to_apply) if filters_to_apply else []
+        suffix = self._output_suffix('.mp3' if self.target_codec == 'libmp3lame' else input_file.suffix)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [
+                executor.submit(
+                    self._process_chunk,
+                    input_file, output_dir / f"{input_file.stem}_part{index:04d}{suffix}",
+                    filter_chain, filters_to_apply, profile, start, duration
+                )
+                for index, (start, duration, _, _) in enumerate(plan)
+            ]
+            chunks = [
+                AudioChunk(
+                    index=index,
+                    start_sec=start,
+                    duration_sec=duration,
+                    overlap_sec=overlap,
+                    result=future.result(),
+                    overlap_end_sec=overlap_end
+                )
+                for index, ((start, duration, overlap, overlap_end), future) in enumerate(zip(plan, futures))
+            ]
+        
+        failed = [chunk for chunk in chunks if not chunk.result.success]
+        if failed:
+            raise RuntimeError(f"Failed to split {input_file.name}: {failed[0].result.error_message}")
+        return chunks
+    
+    @staticmethod
+    def _chunk_from_pending(item: tuple) -> AudioChunk:
+        index, start, duration, overlap, future = item
+        return AudioChunk(
+            index=index,
+            start_sec=start,
+            duration_sec=duration,
+            overlap_sec=overlap,
+            result=future.result()
+        )
+    
+    def _process_chunk(
+        self,
+        input_file: Path,
+        output_file: Path,
+        filter_chain: List[AudioFilter],
+        filters_to_apply: List[str],
+        profile: str,
+        start_sec: float,
+        duration_sec: float
+    ) -> PreprocessingResult:
+        """Обрабатывает один фрагмент (seek на входе, без повторного prepare)"""
+        start_time = time.time()
+        try:
+            stream = ffmpeg.input(str(input_file), ss=start_sec, t=duration_sec)
+            stream = self._apply_filters(stream, filter_chain)
+            stream = stream.output(str(output_file), **self._output_kwargs())
+            _, stderr = stream.run(overwrite_output=True, quiet=True, capture_stderr=True)
+            stderr_text = stderr.decode('utf-8', errors='replace') if stderr else ''
+            artifacts = self._collect_artifacts(filter_chain, output_file, stderr_text, start_sec, duration_sec)
+            
+            original_metrics, processed_metrics = parse_ffmpeg_stderr(stderr_text)
+            if processed_metrics is None:
+                processed_metrics = self.get_audio_metrics(output_file)
+            
+            return PreprocessingResult(
+                output_file=output_file,
+                original_metrics=original_metrics,
+                processed_metrics=processed_metrics,
+                filters_applied=filters_to_apply,
+                profile=profile,
+                processing_time_sec=time.time() - start_time,
+                success=True,
+                artifacts=artifacts
+            )
+        
+        except Exception as e:
+            error_msg = f"Chunk preprocessing failed: {str(e)}"
+            self.logger.error(f"{output_file.name}: {error_msg}")
+            return PreprocessingResult(
+                output_file=output_file,
+                original_metrics=None,
+                processed_metrics=None,
+                filters_applied=filters_to_apply,
+                profile=profile,
+                processing_time_sec=time.time() - start_time,
+                success=False,
                 error_message=error_msg
             )
+    
+    def process_batch(
+        self,
+        input_files: Iterable[Path | str],
+        output_dir: Optional[Path] = None,
+        profile: str = 'standard',
+        custom_filters: Optional[List[str]] = None,
+        save_metrics: bool = True,
+        jobs: Optional[int] = None,
+        report_file: Optional[Path] = None
+    ) -> Iterator[PreprocessingResult]:
+        """
+        Обрабатывает набор файлов параллельно в пуле процессов
+
+        Каждый файл обрабатывается через process() в отдельном процессе,
+        результаты отдаются по мере готовности (порядок не гарантирован).
+        После обработки всех файлов пишется сводный отчёт.
+
+        Args:
+            input_files: Файлы и/или директории (директории обходятся рекурсивно)
+            output_dir: Директория для результатов (по умолчанию: рядом с исходниками);
+                при совпадении имён к результату добавляется номер (<stem>_2_preprocessed)
+            profile: Предустановленный профиль
+            custom_filters: Список пользовательских фильтров (перекрывает profile)
+            save_metrics: Сохранить метрики каждого файла в .json
+            jobs: Размер пула процессов (default: число CPU)
+            report_file: Путь к сводному отчёту (default: batch.preprocessing.json
+                в output_dir или в директории первого файла)
+
+        Yields:
+            PreprocessingResult для каждого файла по мере завершения
+        """
+        files = discover_media_files(input_files)
+        if not files:
+            self.logger.warning("No media files to process")
+            return
+
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+        self.logger.info(f"Batch: {len(files)} files, {jobs} workers")
+
+        start_time = time.time()
+        results: List[PreprocessingResult] = []
+
+        taken: set[str] = set()
+        
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {}
+            for input_file in files:
+                output_file = None
+                if output_dir is not None:
+                    # Одноимённые файлы из разных директорий не должны затирать друг друга
+                    suffix = self._output_suffix(input_file.suffix)
+                    name = f"{input_file.stem}_preprocessed{suffix}"
+                    index = 1
+                    while name in taken:
+                        index += 1
+                        name = f"{input_file.stem}_{index}_preprocessed{suffix}"
+                    taken.add(name)
+                    output_file = output_dir / name
+
+                future = executor.submit(
+                    self.process,
+                    input_file,
+                    output_file,
+                    profile,
+                    custom_filters,
+                    save_metrics
+                )
+                futures[future] = (input_file, output_file)
+
+            for future in as_completed(futures):
+                input_file, output_file = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Ошибки валидации (и падение воркера) не должны останавливать пакет
+                    error_msg = f"Preprocessing failed: {str(e)}"
+                    self.logger.error(f"{input_file.name}: {error_msg}")
+                    result = PreprocessingResult(
+                        output_file=output_file or input_file,
+                        original_metrics=None,
+                        processed_metrics=None,
+                        filters_applied=custom_filters or [],
+                        processing_time_sec=0.0,
+                        success=False,
+                        error_message=error_msg
+                    )
+
+                results.append(result)
+                yield result
+
+        wall_time = time.time() - start_time
+
+        if report_file is None:
+            report_dir = output_dir if output_dir is not None else files[0].parent
+            report_file = report_dir / 'batch.preprocessing.json'
+
+        report = build_batch_report(results, wall_time_sec=wall_time, jobs=jobs)
+        report_file = Path(report_file)
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(
+            f"Batch done: {report['succeeded']}/{report['total_files']} ok, "
+            f"wall time: {wall_time:.2f}s, speedup: {report['speedup']:.1f}x"
+        )
+        self.logger.info(f"Batch report saved: {report_file}")
+
+
+# ============================================================================
+# FFMPEG STDERR PARSING (single-pass metrics)
+# ============================================================================
+
+_CHANNEL_LAYOUTS = {
+    'mono': 1, 'stereo': 2, '2.1': 3, '3.0': 3, 'quad': 4, '4.0': 4,
+    '5.0': 5, '5.1': 6, '6.0': 6, '6.1': 7, '7.0': 7, '7.1': 8
+}
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+_INPUT_BITRATE_RE = re.compile(r'bitrate:\s*(\d+(?:\.\d+)?)\s*kb/s')
+_AUDIO_STREAM_RE = re.compile(r'Stream #\d+:\d+.*?: Audio: (.*)')
+_SAMPLE_RATE_RE = re.compile(r'(\d+) Hz')
+_PROGRESS_TIME_RE = re.compile(r'time=\s*(-?\d+):(\d+):(\d+(?:\.\d+)?)')
+_PROGRESS_BITRATE_RE = re.compile(r'bitrate=\s*(\d+(?:\.\d+)?)kbits/s')
+
+
+def _hms_to_sec(hours: str, minutes: str, seconds: str) -> float:
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _parse_audio_stream_line(description: str) -> Optional[Dict[str, Any]]:
+    """Разбирает описание аудиопотока: 'aac (LC) (...), 44100 Hz, stereo, fltp, 128 kb/s'"""
+    sample_rate = _SAMPLE_RATE_RE.search(description)
+    if not sample_rate:
+        return None
+    
+    codec = description.split(',')[0].split()[0] if description.strip() else None
+    
+    channels = 0
+    parts = [p.strip() for p in description.split(',')]
+    for index, part in enumerate(parts):
+        if part.endswith(' Hz') and index + 1 < len(parts):
+            layout = parts[index + 1].split('(')[0].strip()
+            if layout in _CHANNEL_LAYOUTS:
+                channels = _CHANNEL_LAYOUTS[layout]
+            elif layout.endswith('channels'):
+                channels = int(layout.split()[0])
+            break
+    
+    return {
+        'codec': codec,
+        'sample_rate': int(sample_rate.group(1)),
+        'channels': channels
+    }
+
+
+def parse_ffmpeg_stderr(stderr: str) -> tuple[Optional[AudioMetrics], Optional[AudioMetrics]]:
+    """
+    Извлекает метрики входа и выхода из stderr одного запуска ffmpeg
+    
+    ffmpeg печатает описание входного контейнера (Duration, bitrate, потоки),
+    описание выходных потоков и строки прогресса (time=, bitrate=) — этого
+    достаточно, чтобы не запускать ffprobe до и после обработки.
+    
+    Args:
+        stderr: Захваченный stderr ffmpeg
+        
+    Returns:
+        (original_metrics, processed_metrics); None для той части, которую
+        не удалось разобрать
+    """
+    section = None
+    inputs_seen = 0
+    input_info: Dict[str, Any] = {}
+    output_info: Dict[str, Any] = {}
+    output_duration = None
+    output_bitrate = None
+    
+    # Строки прогресса разделяются \r, а не \n
+    for line in stderr.replace('\r', '\n').splitlines():
+        stripped = line.strip()
+        
+        if stripped.startswith('Input #'):
+            # Метрики берём только для первого входа (как get_audio_metrics)
+            section = 'input' if inputs_seen == 0 else 'other'
+            inputs_seen += 1
+            continue
+        if stripped.startswith('Output #'):
+            section = 'output'
+            continue
+        if stripped.startswith('Stream mapping:'):
+            section = None
+            continue
+        
+        if section == 'input' and stripped.startswith('Duration:'):
+            duration = _DURATION_RE.search(stripped)
+            if duration:
+                input_info['duration_sec'] = _hms_to_sec(*duration.groups())
+            bitrate = _INPUT_BITRATE_RE.search(stripped)
+            if bitrate:
+                input_info['bitrate'] = round(float(bitrate.group(1)) * 1000)
+            continue
+        
+        stream = _AUDIO_STREAM_RE.search(stripped)
+        if stream and section in ('input', 'output'):
+            target = input_info if section == 'input' else output_info
+            if 'sample_rate' not in target:
+                parsed = _parse_audio_stream_line(stream.group(1))
+                if parsed:
+                    target.update(parsed)
+            continue
+        
+        progress_time = _PROGRESS_TIME_RE.search(stripped)
+        if progress_time and stripped.startswith('size='):
+            output_duration = max(0.0, _hms_to_sec(*progress_time.groups()))
+            progress_bitrate = _PROGRESS_BITRATE_RE.search(stripped)
+            if progress_bitrate:
+                output_bitrate = round(float(progress_bitrate.group(1)) * 1000)
+    
+    original = None
+    if 'sample_rate' in input_info and 'duration_sec' in input_info:
+        original = AudioMetrics(
+            duration_sec=input_info['duration_sec'],
+            sample_rate=input_info['sample_rate'],
+            channels=input_info['channels'],
+            bitrate=input_info.get('bitrate'),
+            codec=input_info.get('codec')
+        )
+    
+    processed = None
+    if 'sample_rate' in output_info and output_duration is not None:
+        processed = AudioMetrics(
+            duration_sec=output_duration,
+            sample_rate=output_info['sample_rate'],
+            channels=output_info['channels'],
+            bitrate=output_bitrate,
+            codec=output_info.get('codec')
+        )
+    
+    return original, processed
+
+
+# ============================================================================
+# SEGMENT INDEX (silencedetect)
+# ============================================================================
+
+_SILENCE_START_RE = re.compile(r'silence_start:\s*(-?\d+(?:\.\d+)?)')
+_SILENCE_END_RE = re.compile(r'silence_end:\s*(-?\d+(?:\.\d+)?)')
+
+
+def parse_silencedetect(stderr: str, total_duration_sec: Optional[float] = None) -> List[tuple[int, int]]:
+    """
+    Строит список речевых сегментов по выводу silencedetect
+    
+    Args:
+        stderr: Захваченный stderr ffmpeg
+        total_duration_sec: Длительность записи (default: Duration входа из stderr)
+        
+    Returns:
+        Список (start_ms, end_ms) речевых сегментов
+    """
+    if total_duration_sec is None:
+        duration = _DURATION_RE.search(stderr)
+        total_duration_sec = _hms_to_sec(*duration.groups()) if duration else None
+    
+    silences: List[List[Optional[float]]] = []
+    for line in stderr.replace('\r', '\n').splitlines():
+        start = _SILENCE_START_RE.search(line)
+        if start:
+            silences.append([max(0.0, float(start.group(1))), None])
+            continue
+        end = _SILENCE_END_RE.search(line)
+        if end and silences and silences[-1][1] is None:
+            silences[-1][1] = float(end.group(1))
+    
+    segments: List[tuple[int, int]] = []
+    cursor = 0.0
+    for silence_start, silence_end in silences:
+        if silence_start > cursor:
+            segments.append((round(cursor * 1000), round(silence_start * 1000)))
+        if silence_end is None:
+            # Тишина до конца записи
+            cursor = None
+            break
+        cursor = silence_end
+    
+    if cursor is not None and total_duration_sec is not None and total_duration_sec > cursor:
+        segments.append((round(cursor * 1000), round(total_duration_sec * 1000)))
+    
+    return segments
+
+
+_NPY_MAGIC = b'\x93NUMPY'
+
+
+def write_segment_index(index_file: Path, segments: List[tuple[int, int]]) -> None:
+    """
+    Сохраняет сегменты в формате NPY (uint32, форма (N, 2)) без зависимости от NumPy
+    
+    Args:
+        index_file: Путь к .npy файлу
+        segments: Список (start_ms, end_ms)
+    """
+    header = f"{{'descr': '<u4', 'fortran_order': False, 'shape': ({len(segments)}, 2), }}"
+    # Заголовок выравнивается до кратного 64 байтам (включая magic, версию и длину)
+    padding = 64 - (len(_NPY_MAGIC) + 4 + len(header) + 1) % 64
+    header_bytes = (header + ' ' * (padding % 64) + '\n').encode('latin1')
+    
+    data = array('I', (value for segment in segments for value in segment))
+    if sys.byteorder != 'little':
+        data.byteswap()
+    
+    with open(index_file, 'wb') as f:
+        f.write(_NPY_MAGIC + b'\x01\x00' + struct.pack('<H', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data.tobytes())
+
+
+def load_segment_index(index_file: Path) -> List[tuple[int, int]]:
+    """
+    Загружает индекс сегментов, записанный write_segment_index
+    
+    Файл — обычный NPY: с NumPy его можно читать и как numpy.load(path).
+    
+    Args:
+        index_file: Путь к .npy файлу
+        
+    Returns:
+        Список (start_ms, end_ms)
+    """
+    with open(index_file, 'rb') as f:
+        if f.read(6) != _NPY_MAGIC:
+            raise ValueError(f"Not an NPY file: {index_file}")
+        f.read(2)  # Версия формата
+        (header_len,) = struct.unpack('<H', f.read(2))
+        header = f.read(header_len).decode('latin1')
+        if "'<u4'" not in header:
+            raise ValueError(f"Unexpected segment index dtype in {index_file}: {header.strip()}")
+        data = array('I')
+        data.frombytes(f.read())
+    
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return [(data[i], data[i + 1]) for i in range(0, len(data), 2)]
+
+
+# ============================================================================
+# CHUNK HELPERS
+# ============================================================================
+
+def plan_chunks(
+    duration_sec: float,
+    chunk_sec: float,
+    overlap_sec: float
+) -> List[tuple[float, float, float]]:
+    """
+    Разбивает запись на фрагменты фиксированной длины с перекрытием
+    
+    Каждый фрагмент, кроме первого, начинается на overlap_sec раньше
+    своей номинальной границы, чтобы слова на стыке попали целиком
+    хотя бы в один фрагмент.
+    
+    Args:
+        duration_sec: Длительность записи
+        chunk_sec: Номинальная длина фрагмента
+        overlap_sec: Перекрытие соседних фрагментов
+        
+    Returns:
+        Список (start_sec, duration_sec, overlap_sec)
+    """
+    if chunk_sec <= 0:
+        raise ValueError(f"chunk_sec must be positive, got {chunk_sec}")
+    if not 0 <= overlap_sec < chunk_sec:
+        raise ValueError(f"overlap_sec must be in [0, chunk_sec), got {overlap_sec}")
+    
+    chunks = []
+    boundary = 0.0
+    while boundary < duration_sec:
+        start = max(0.0, boundary - overlap_sec)
+        end = min(duration_sec, boundary + chunk_sec)
+        chunks.append((start, end - start, boundary - start))
+        boundary += chunk_sec
+    return chunks
+
+
+def plan_silence_splits(
+    duration_sec: float,
+    speech_segments: List[tuple[int, int]],
+    segment_sec: float,
+    overlap_sec: float,
+    search_sec: Optional[float] = None
+) -> List[tuple[float, float, float, float]]:
+    """
+    Разбивает запись на сегменты по паузам для параллельного распознавания
+    
+    Граница сегмента ставится в середину паузы, ближайшей к номинальной
+    границе (кратной segment_sec от предыдущего разреза) в пределах
+    ±search_sec. Если пауз рядом нет, режем по номинальной границе.
+    Каждый сегмент расширяется на overlap_sec в обе стороны: слово на
+    жёстком разрезе целиком попадает в оба соседних сегмента, а при
+    склейке остаётся в том, чьему окну [граница, следующая граница)
+    принадлежит его середина.
+    
+    Args:
+        duration_sec: Длительность записи
+        speech_segments: Речевые сегменты (start_ms, end_ms), как у parse_silencedetect
+        segment_sec: Номинальная длина сегмента
+        overlap_sec: Расширение сегмента за каждую границу
+        search_sec: Окно поиска паузы вокруг номинальной границы (default: segment_sec / 4)
+        
+    Returns:
+        Список (start_sec, duration_sec, overlap_sec, overlap_end_sec)
+    """
+    if segment_sec <= 0:
+        raise ValueError(f"segment_sec must be positive, got {segment_sec}")
+    if not 0 <= overlap_sec < segment_sec:
+        raise ValueError(f"overlap_sec must be in [0, segment_sec), got {overlap_sec}")
+    if search_sec is None:
+        search_sec = segment_sec / 4
+    if not 0 <= search_sec < segment_sec:
+        raise ValueError(f"search_sec must be in [0, segment_sec), got {search_sec}")
+    
+    # Середины пауз между речевыми сегментами (в секундах, по возрастанию)
+    gaps = [
+        (previous_end + start) / 2000
+        for (_, previous_end), (start, _) in zip(speech_segments, speech_segments[1:])
+        if start > previous_end
+    ]
+    
+    cuts = [0.0]
+    gap_index = 0
+    while duration_sec - cuts[-1] > segment_sec + search_sec:
+        nominal = cuts[-1] + segment_sec
+        while gap_index < len(gaps) and gaps[gap_index] < nominal - search_sec:
+            gap_index += 1
+        best = None
+        index = gap_index
+        while index < len(gaps) and gaps[index] <= nominal + search_sec:
+            if best is None or abs(gaps[index] - nominal) < abs(best - nominal):
+                best = gaps[index]
+            index += 1
+        cuts.append(best if best is not None else nominal)
+    cuts.append(duration_sec)
+    
+    segments = []
+    for boundary, next_boundary in zip(cuts, cuts[1:]):
+        start = max(0.0, boundary - overlap_sec)
+        end = min(duration_sec, next_boundary + overlap_sec)
+        segments.append((start, end - start, boundary - start, end - next_boundary))
+    return segments
+
+
+# ============================================================================
+# AUDIO ANALYSIS (auto profile)
+# ============================================================================
+
+_ASTATS_VALUE_RE = re.compile(r'\]\s*([A-Za-z ]+?):\s*(-?(?:inf|nan|\d+(?:\.\d+)?))\s*$')
+_ROLLOFF_RE = re.compile(r'lavfi\.aspectralstats\.1\.rolloff=(-?\d+(?:\.\d+)?)')
+
+
+def parse_audio_analysis(stderr: str, sample_sec: float) -> Optional[AudioAnalysis]:
+    """
+    Разбирает вывод astats (секция Overall) и ametadata со спектральным спадом
+    
+    Args:
+        stderr: Захваченный stderr ffmpeg
+        sample_sec: Длина проанализированного фрагмента
+        
+    Returns:
+        AudioAnalysis или None, если статистика не найдена
+    """
+    overall: Dict[str, float] = {}
+    in_overall = False
+    rolloffs: List[float] = []
+    
+    for line in stderr.replace('\r', '\n').splitlines():
+        rolloff = _ROLLOFF_RE.search(line)
+        if rolloff:
+            rolloffs.append(float(rolloff.group(1)))
+            continue
+        if 'astats' not in line:
+            continue
+        if line.rstrip().endswith('Overall'):
+            in_overall = True
+            continue
+        if in_overall:
+            value = _ASTATS_VALUE_RE.search(line)
+            if value:
+                overall[value.group(1).strip()] = float(value.group(2))
+    
+    if 'RMS level dB' not in overall or 'Noise floor dB' not in overall:
+        return None
+    
+    input_metrics, _ = parse_ffmpeg_stderr(stderr)
+    
+    # Полная цифровая тишина даёт -inf; ограничиваем разумным минимумом
+    noise_floor = max(overall['Noise floor dB'], -120.0)
+    
+    return AudioAnalysis(
+        sample_sec=sample_sec,
+        channels=input_metrics.channels if input_metrics else int(overall.get('Number of channels', 0)),
+        rms_level_db=max(overall['RMS level dB'], -120.0),
+        peak_level_db=max(overall.get('Peak level dB', 0.0), -120.0),
+        noise_floor_db=noise_floor,
+        spectral_rolloff_hz=sum(rolloffs) / len(rolloffs) if rolloffs else None
+    )
+
+
+# ============================================================================
+# BATCH HELPERS
+# ============================================================================
+
+def discover_media_files(inputs: Iterable[Path | str]) -> List[Path]:
+    """
+    Разворачивает список путей в список медиафайлов
+
+    Args:
+        inputs: Файлы и/или директории
+
+    Returns:
+        Отсортированный список файлов без дубликатов (скрытые файлы
+        и результаты предобработки пропускаются)
+    """
+    files: List[Path] = []
+    seen = set()
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = sorted(
+                p for p in path.rglob('*')
+                if p.is_file() and p.suffix.lower() in MEDIA_EXTENSIONS
+            )
+        else:
+            candidates = [path]
+
+        for candidate in candidates:
+            if candidate.name.startswith('.') or candidate.stem.endswith('_preprocessed'):
+                continue
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+
+    return files
+
+
+def build_batch_report(
+    results: List[PreprocessingResult],
+    wall_time_sec: float,
+    jobs: int
+) -> Dict[str, Any]:
+    """
+    Формирует сводный отчёт по пакетной обработке
+
+    Args:
+        results: Результаты обработки всех файлов
+        wall_time_sec: Общее время пакета
+        jobs: Размер пула процессов
+
+    Returns:
+        Словарь со сводными метриками и результатами по каждому файлу
+    """
+    succeeded = [r for r in results if r.success]
+    cpu_time = sum(r.processing_time_sec for r in results)
+
+    original_duration = sum(
+        r.original_metrics.duration_sec for r in succeeded if r.original_metrics
+    )
+    processed_duration = sum(
+        r.processed_metrics.duration_sec for r in succeeded if r.processed_metrics
+    )
+
+    return {
+        'total_files': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'jobs': jobs,
+        'wall_time_sec': round(wall_time_sec, 3),
+        'cumulative_processing_time_sec': round(cpu_time, 3),
+        'speedup': round(cpu_time / wall_time_sec, 2) if wall_time_sec > 0 else 0.0,
+        'original_duration_sec': round(original_duration, 3),
+        'processed_duration_sec': round(processed_duration, 3),
+        'results': [r.to_dict() for r in results]
+    }
 
 
 # ============================================================================
@@ -529,6 +2504,7 @@ if __name__ == '__main__':
         epilog=f"""
 Available profiles:
 {chr(10).join(f"  {name}: {info['description']}" for name, info in AudioPreprocessor.PROFILES.items())}
+  {AudioPreprocessor.AUTO_PROFILE}: {AudioPreprocessor.AUTO_PROFILE_DESCRIPTION}
 
 Examples:
   # Standard processing
@@ -539,16 +2515,38 @@ Examples:
   
   # Custom filters
   python audio_preprocessor.py input.mp4 -f noise_reduction loudness_normalization
+  
+  # Batch processing of a whole recordings folder with 8 workers
+  python audio_preprocessor.py recordings/audio recordings/video -j 8 --output-dir processed/
+  
+  # Streaming a multi-hour recording in 5-minute chunks
+  python audio_preprocessor.py event.mp4 --chunk-sec 300 --output-dir chunks/
 """
     )
     
-    parser.add_argument('input', type=str, help='Input audio/video file')
-    parser.add_argument('-o', '--output', type=str, help='Output file (optional)')
+    parser.add_argument('input', type=str, nargs='+', help='Input audio/video file(s) or directories')
+    parser.add_argument('-o', '--output', type=str, help='Output file (optional, single file only)')
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Number of parallel workers for batch mode (default: CPU count)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        help='Output directory for batch mode (default: next to inputs)'
+    )
+    parser.add_argument(
+        '--report',
+        type=str,
+        help='Aggregate batch report path (default: batch.preprocessing.json)'
+    )
     parser.add_argument(
         '-p', '--profile',
         type=str,
         default='standard',
-        choices=list(AudioPreprocessor.PROFILES.keys()),
+        choices=list(AudioPreprocessor.PROFILES.keys()) + [AudioPreprocessor.AUTO_PROFILE],
         help='Processing profile (default: standard)'
     )
     parser.add_argument(
@@ -556,12 +2554,67 @@ Examples:
         nargs='+',
         help='Custom filter list (overrides profile)'
     )
+    parser.add_argument(
+        '--format',
+        choices=list(OUTPUT_FORMATS.keys()),
+        help='Output format for recognition: mp3 (default codec settings), '
+             'ogg_opus / wav / linear16 (16 kHz mono, no MP3 encode)'
+    )
     parser.add_argument(
         '--sample-rate',
         type=int,
         default=16000,
         help='Target sample rate in Hz (default: 16000)'
     )
+    parser.add_argument(
+        '--ffprobe-metrics',
+        action='store_true',
+        help='Collect metrics with separate ffprobe runs instead of parsing ffmpeg output'
+    )
+    parser.add_argument(
+        '--segments',
+        action='store_true',
+        help='Write a speech segment index (<output>.segments.npy) via silencedetect'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['auto', 'ffmpeg', 'numpy'],
+        default='auto',
+        help='Filter backend: auto uses in-process NumPy for short clips (default: auto)'
+    )
+    parser.add_argument(
+        '--numpy-max-duration',
+        type=float,
+        default=60.0,
+        help='Longest clip (seconds) processed by the NumPy backend in auto mode (default: 60)'
+    )
+    parser.add_argument(
+        '--chunk-sec',
+        type=float,
+        help='Streaming mode: split the input into chunks of this length (seconds)'
+    )
+    parser.add_argument(
+        '--overlap-sec',
+        type=float,
+        default=2.0,
+        help='Overlap between consecutive chunks in streaming mode (default: 2.0)'
+    )
+    parser.add_argument(
+        '--two-pass-loudnorm',
+        action='store_true',
+        help='Use measured two-pass linear loudnorm (measurements are stored next to inputs)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='Directory for the content-addressed preprocessing cache (disabled by default)'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=2048,
+        help='Maximum cache size in MB, least recently used entries are evicted (default: 2048)'
+    )
     parser.add_argument(
         '--no-metrics',
         action='store_true',
@@ -583,11 +2636,76 @@ Examples:
         print("Install with: pip install ffmpeg-python")
         exit(1)
     
+    batch_mode = (
+        len(args.input) > 1
+        or Path(args.input[0]).is_dir()
+        or args.jobs is not None
+        or args.output_dir is not None
+    )
+    
+    if batch_mode and args.output:
+        print("ERROR: --output is only supported for a single input file (use --output-dir)")
+        exit(1)
+    
     try:
-        preprocessor = AudioPreprocessor(target_sample_rate=args.sample_rate)
+        preprocessor = AudioPreprocessor(
+            target_sample_rate=args.sample_rate,
+            single_pass=not args.ffprobe_metrics,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+            cache_max_size_mb=args.cache_max_size,
+            segment_index=args.segments,
+            output_format=args.format,
+            backend=args.backend,
+            numpy_max_duration_sec=args.numpy_max_duration
+        )
+        
+        if args.two_pass_loudnorm:
+            preprocessor.register_filter(
+                'loudness_normalization',
+                LoudnessNormalizationFilter(two_pass=True)
+            )
+        
+        if args.chunk_sec:
+            if len(args.input) != 1:
+                print("ERROR: streaming mode (--chunk-sec) takes a single input file")
+                exit(1)
+            failed = 0
+            for chunk in preprocessor.process_chunks(
+                input_file=Path(args.input[0]),
+                output_dir=Path(args.output_dir) if args.output_dir else None,
+                profile=args.profile,
+                custom_filters=args.filters,
+                chunk_sec=args.chunk_sec,
+                overlap_sec=args.overlap_sec,
+                workers=args.jobs or 2
+            ):
+                if chunk.result.success:
+                    print(f"✅ [{chunk.index}] {chunk.output_file} (from {chunk.start_sec:.1f}s)")
+                else:
+                    failed += 1
+                    print(f"❌ [{chunk.index}] {chunk.result.error_message}")
+            exit(1 if failed else 0)
+        
+        if batch_mode:
+            failed = 0
+            for result in preprocessor.process_batch(
+                input_files=args.input,
+                output_dir=Path(args.output_dir) if args.output_dir else None,
+                profile=args.profile,
+                custom_filters=args.filters,
+                save_metrics=not args.no_metrics,
+                jobs=args.jobs,
+                report_file=Path(args.report) if args.report else None
+            ):
+                if result.success:
+                    print(f"✅ {result.output_file} ({result.processing_time_sec:.2f}s)")
+                else:
+                    failed += 1
+                    print(f"❌ {result.output_file}: {result.error_message}")
+            exit(1 if failed else 0)
         
         result = preprocessor.process(
-            input_file=Path(args.input),
+            input_file=Path(args.input[0]),
             output_file=Path(args.output) if args.output else None,
             profile=args.profile,
             custom_filters=args.filters,
@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: AUDIO PREPROCESSOR
+Замеры скорости и памяти предобработки аудио (tools/audio_preprocessor.py)
+
+Каждый вариант запускается в отдельном процессе, без влияния предыдущих
+замеров: пиковая память ffmpeg берётся из RUSAGE_CHILDREN этого процесса,
+память самого Python (бэкенд numpy работает в процессе) — из RUSAGE_SELF.
+Неуспешный прогон обработки прерывает замер: время неудачных запусков
+не попадает в отчёт.
+
+Использование:
+    # Однопроходный vs двухпроходный loudnorm на синтетической записи 1 час
+    python benchmark_audio_preprocessor.py loudnorm --duration 3600
+
+    # То же на реальной записи
+    python benchmark_audio_preprocessor.py loudnorm --input event.mp4 -o loudnorm.json
+
+    # Время кодирования и размер загрузки по выходным форматам
+    python benchmark_audio_preprocessor.py formats --duration 600 --uplink-mbps 20
+
+    # Регрессионный прогон: все профили на синтетическом корпусе
+    python benchmark_audio_preprocessor.py suite -o baseline.json
+    python benchmark_audio_preprocessor.py suite --baseline baseline.json -o current.json
+"""
+
+import sys
+import json
+import time
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+sys.path.append(str(Path(__file__).parent))
+
+from audio_preprocessor import (
+    FFMPEG_AVAILABLE,
+    OUTPUT_FORMATS,
+    AudioPreprocessor,
+    LoudnessNormalizationFilter,
+    NUMPY_AVAILABLE
+)
+
+if FFMPEG_AVAILABLE:
+    import ffmpeg
+
+
+# ============================================================================
+# SYNTHETIC INPUT
+# ============================================================================
+
+def generate_recording(
+    output_file: Path,
+    duration_sec: float,
+    sample_rate: int = 44100,
+    channels: int = 2
+) -> Path:
+    """
+    Генерирует синтетическую запись: тон поверх розового шума
+
+    Args:
+        output_file: Куда сохранить (.mp3)
+        duration_sec: Длительность в секундах
+        sample_rate: Частота дискретизации
+        channels: Число каналов
+
+    Returns:
+        Путь к созданному файлу
+    """
+    tone = ffmpeg.input(
+        f"sine=frequency=220:sample_rate={sample_rate}:duration={duration_sec}",
+        f='lavfi'
+    )
+    noise = ffmpeg.input(
+        f"anoisesrc=color=pink:amplitude=0.05:sample_rate={sample_rate}:duration={duration_sec}",
+        f='lavfi'
+    )
+    (
+        ffmpeg
+        .filter([tone, noise], 'amix', inputs=2)
+        .output(str(output_file), acodec='libmp3lame', ac=channels, ar=sample_rate)
+        .run(overwrite_output=True, quiet=True)
+    )
+    return output_file
+
+
+# Детерминированный корпус: (имя, вид, длительность, частота, каналы).
+# Шум генерируется с фиксированным seed, поэтому файлы побайтно совпадают
+# между запусками и машинами с одинаковой версией ffmpeg.
+CORPUS = [
+    ('tone_10s_16k_mono', 'tone', 10, 16000, 1),
+    ('noise_bed_30s_44k_stereo', 'noise', 30, 44100, 2),
+    ('speech_30s_16k_mono', 'speech', 30, 16000, 1),
+    ('speech_120s_44k_stereo', 'speech', 120, 44100, 2),
+    ('speech_600s_48k_stereo', 'speech', 600, 48000, 2)
+]
+
+CORPUS_SEED = 20240601
+
+
+def generate_corpus_item(
+    output_file: Path,
+    kind: str,
+    duration_sec: float,
+    sample_rate: int,
+    channels: int
+) -> Path:
+    """
+    Генерирует один файл синтетического корпуса (WAV, без сети)
+    
+    Виды:
+        tone   — чистый тон 440 Hz
+        noise  — розовый шумовой фон
+        speech — «речеподобные» всплески: гармоники 150 Hz с амплитудной
+                 модуляцией слогов (4 Hz) и паузами ~1 с каждые 3 с
+                 поверх тихого шумового фона
+    
+    Args:
+        output_file: Куда сохранить (.wav)
+        kind: 'tone', 'noise' или 'speech'
+        duration_sec: Длительность в секундах
+        sample_rate: Частота дискретизации
+        channels: Число каналов
+        
+    Returns:
+        Путь к созданному файлу
+    """
+    noise_source = (
+        f"anoisesrc=color=pink:seed={CORPUS_SEED}:sample_rate={sample_rate}:duration={duration_sec}"
+    )
+    if kind == 'tone':
+        stream = ffmpeg.input(
+            f"sine=frequency=440:sample_rate={sample_rate}:duration={duration_sec}",
+            f='lavfi'
+        )
+    elif kind == 'noise':
+        stream = ffmpeg.input(f"{noise_source}:amplitude=0.2", f='lavfi')
+    elif kind == 'speech':
+        voice = ffmpeg.input(
+            "aevalsrc="
+            "'(0.5*sin(2*PI*150*t)+0.3*sin(2*PI*300*t)+0.2*sin(2*PI*450*t))"
+            "*(0.5+0.5*sin(2*PI*4*t))*lt(mod(t,3),2)'"
+            f":sample_rate={sample_rate}:duration={duration_sec}",
+            f='lavfi'
+        )
+        noise = ffmpeg.input(f"{noise_source}:amplitude=0.01", f='lavfi')
+        stream = ffmpeg.filter([voice, noise], 'amix', inputs=2)
+    else:
+        raise ValueError(f"Unknown corpus item kind: {kind}")
+    
+    (
+        stream
+        .output(str(output_file), acodec='pcm_s16le', ac=channels, ar=sample_rate, fflags='+bitexact')
+        .run(overwrite_output=True, quiet=True)
+    )
+    return output_file
+
+
+def generate_corpus(corpus_dir: Path, max_duration_sec: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Генерирует корпус (уже существующие файлы переиспользуются)
+    
+    Args:
+        corpus_dir: Директория корпуса
+        max_duration_sec: Пропустить файлы длиннее (для быстрых прогонов)
+        
+    Returns:
+        Список описаний файлов: name, kind, duration_sec, sample_rate, channels, file, size_bytes
+    """
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    items = []
+    for name, kind, duration, sample_rate, channels in CORPUS:
+        if max_duration_sec is not None and duration > max_duration_sec:
+            continue
+        output_file = corpus_dir / f"{name}.wav"
+        if not output_file.exists():
+            print(f"🎛  Generating {name}...")
+            generate_corpus_item(output_file, kind, duration, sample_rate, channels)
+        items.append({
+            'name': name,
+            'kind': kind,
+            'duration_sec': duration,
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'file': str(output_file),
+            'size_bytes': output_file.stat().st_size
+        })
+    return items
+
+
+# ============================================================================
+# ISOLATED RUNS
+# ============================================================================
+
+def _peak_rss_mb(who: int) -> float:
+    """Пиковый RSS по getrusage (ru_maxrss: KB на Linux, байты на macOS)"""
+    rss = resource.getrusage(who).ru_maxrss
+    divider = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(rss / divider, 1)
+
+
+def _measure(func: Callable[..., Dict[str, Any]], args: tuple) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return {
+        'wall_time_sec': round(time.perf_counter() - start, 3),
+        'peak_ffmpeg_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        'peak_python_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        **result
+    }
+
+
+def _require_success(result, input_file: str) -> None:
+    """Прерывает замер, если обработка не удалась (иначе меряется время ошибки)"""
+    if not result.success:
+        raise RuntimeError(f"Preprocessing of {input_file} failed: {result.error_message}")
+
+
+def run_isolated(func: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """
+    Выполняет замер в свежем процессе
+
+    Args:
+        func: Функция верхнего уровня, возвращающая словарь с результатами
+        *args: Аргументы функции
+
+    Returns:
+        Результат func + wall_time_sec, peak_ffmpeg_rss_mb и peak_python_rss_mb
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(_measure, (func, args))
+
+
+# ============================================================================
+# LOUDNORM: SINGLE PASS VS TWO PASS
+# ============================================================================
+
+def _loudnorm_run(input_file: str, output_file: str, two_pass: bool) -> Dict[str, Any]:
+    preprocessor = AudioPreprocessor()
+    preprocessor.register_filter(
+        'loudness_normalization',
+        LoudnessNormalizationFilter(two_pass=two_pass)
+    )
+    result = preprocessor.process(
+        input_file=Path(input_file),
+        output_file=Path(output_file),
+        custom_filters=['loudness_normalization', 'mono_conversion'],
+        save_metrics=False
+    )
+    _require_success(result, input_file)
+    return {
+        'success': result.success,
+        'error_message': result.error_message,
+        'output_size_bytes': Path(output_file).stat().st_size if result.success else None
+    }
+
+
+def bench_loudnorm(input_file: Path, work_dir: Path) -> Dict[str, Any]:
+    """
+    Сравнивает однопроходный loudnorm с двухпроходным (с измерением и из сохранённого)
+
+    Замер идёт на копии записи в work_dir: сохранённые измерения пишутся
+    рядом со входом, и рядом с оригиналом пользователя ничего не появляется.
+    
+    Args:
+        input_file: Запись для замера
+        work_dir: Директория для выходных файлов
+    
+    Returns:
+        Словарь с результатами по вариантам
+    """
+    bench_input = work_dir / f"loudnorm_input{input_file.suffix}"
+    if input_file.resolve() != bench_input.resolve():
+        shutil.copyfile(input_file, bench_input)
+    store_file = bench_input.with_name(bench_input.name + LoudnessNormalizationFilter.MEASUREMENT_SUFFIX)
+    store_file.unlink(missing_ok=True)
+
+    variants = {}
+    for name, two_pass in (
+        ('single_pass_dynamic', False),
+        ('two_pass_linear_measure', True),
+        ('two_pass_linear_stored', True)
+    ):
+        print(f"⏱  {name}...")
+        variants[name] = run_isolated(
+            _loudnorm_run,
+            str(bench_input),
+            str(work_dir / f"{name}.mp3"),
+            two_pass
+        )
+        print(
+            f"   {variants[name]['wall_time_sec']:.2f}s, "
+            f"peak ffmpeg RSS {variants[name]['peak_ffmpeg_rss_mb']} MB, "
+            f"python RSS {variants[name]['peak_python_rss_mb']} MB"
+        )
+
+    return {
+        'benchmark': 'loudnorm',
+        'input_file': str(input_file),
+        'input_size_bytes': input_file.stat().st_size,
+        'variants': variants
+    }
+
+
+# ============================================================================
+# OUTPUT FORMATS: ENCODE TIME VS UPLOAD SIZE
+# ============================================================================
+
+def _format_run(input_file: str, output_file: str, output_format: str) -> Dict[str, Any]:
+    preprocessor = AudioPreprocessor(output_format=output_format)
+    result = preprocessor.process(
+        input_file=Path(input_file),
+        output_file=Path(output_file),
+        custom_filters=['highpass'],
+        save_metrics=False
+    )
+    return {
+        'success': result.success,
+        'error_message': result.error_message,
+        'output_size_bytes': Path(output_file).stat().st_size if result.success else None,
+        'duration_sec': result.original_metrics.duration_sec if result.original_metrics else None
+    }
+
+
+def bench_formats(input_file: Path, work_dir: Path, uplink_mbps: float) -> Dict[str, Any]:
+    """
+    Сравнивает выходные форматы: время кодирования, размер и время загрузки
+
+    Args:
+        input_file: Запись для замера
+        work_dir: Директория для выходных файлов
+        uplink_mbps: Пропускная способность канала загрузки (Мбит/с)
+
+    Returns:
+        Словарь с результатами по форматам
+    """
+    formats = {}
+    for name, spec in OUTPUT_FORMATS.items():
+        print(f"⏱  {name}...")
+        run = run_isolated(
+            _format_run,
+            str(input_file),
+            str(work_dir / f"{name}{spec['suffix']}"),
+            name
+        )
+        if run['success']:
+            size = run['output_size_bytes']
+            run['upload_time_sec'] = round(size * 8 / (uplink_mbps * 1_000_000), 2)
+            run['encode_plus_upload_sec'] = round(run['wall_time_sec'] + run['upload_time_sec'], 2)
+            if run['duration_sec']:
+                run['bytes_per_audio_sec'] = round(size / run['duration_sec'])
+            print(
+                f"   encode {run['wall_time_sec']:.2f}s, {size / 1024 / 1024:.1f} MB, "
+                f"upload ~{run['upload_time_sec']:.1f}s"
+            )
+        else:
+            print(f"   ❌ {run['error_message']}")
+        run['speechkit_format'] = spec['speechkit_format']
+        formats[name] = run
+
+    return {
+        'benchmark': 'formats',
+        'input_file': str(input_file),
+        'input_size_bytes': input_file.stat().st_size,
+        'uplink_mbps': uplink_mbps,
+        'formats': formats
+    }
+
+
+# ============================================================================
+# SUITE: EVERY PROFILE ON THE SYNTHETIC CORPUS
+# ============================================================================
+
+def _suite_run(input_file: str, output_file: str, filters: List[str], backend: str) -> Dict[str, Any]:
+    preprocessor = AudioPreprocessor(backend=backend)
+    result = preprocessor.process(
+        input_file=Path(input_file),
+        output_file=Path(output_file),
+        custom_filters=filters,
+        save_metrics=False
+    )
+    _require_success(result, input_file)
+    return {
+        'success': result.success,
+        'error_message': result.error_message,
+        'backend': result.backend,
+        'output_size_bytes': Path(output_file).stat().st_size if result.success else None
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    """Версии и коммит — чтобы сравнивать отчёты между коммитами"""
+    def command_output(cmd: List[str]) -> Optional[str]:
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    
+    ffmpeg_version = command_output(['ffmpeg', '-version'])
+    return {
+        'git_commit': command_output(['git', '-C', str(Path(__file__).parent), 'rev-parse', 'HEAD']),
+        'ffmpeg': ffmpeg_version.splitlines()[0] if ffmpeg_version else None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': NUMPY_AVAILABLE
+    }
+
+
+def bench_suite(
+    corpus: List[Dict[str, Any]],
+    work_dir: Path,
+    backend: str = 'ffmpeg'
+) -> Dict[str, Any]:
+    """
+    Прогоняет все профили AudioPreprocessor.PROFILES по корпусу
+    
+    Фильтры одного профиля выполняются одним графом ffmpeg, поэтому время
+    по фильтрам меряется отдельными прогонами каждого фильтра в одиночку
+    (один раз на файл корпуса — профили их переиспользуют).
+    
+    Args:
+        corpus: Результат generate_corpus()
+        work_dir: Директория для выходных файлов
+        backend: Бэкенд препроцессора (default: ffmpeg — стабильная база)
+        
+    Returns:
+        Словарь: items[name] -> filters / profiles с wall_time_sec,
+        peak_ffmpeg_rss_mb, peak_python_rss_mb, output_size_bytes
+    
+    Raises:
+        RuntimeError: Если какой-либо прогон завершился ошибкой
+    """
+    all_filters = sorted({
+        name for spec in AudioPreprocessor.PROFILES.values() for name in spec['filters']
+    })
+    
+    items = {}
+    for item in corpus:
+        print(f"📂 {item['name']}")
+        filters = {}
+        for filter_name in all_filters:
+            filters[filter_name] = run_isolated(
+                _suite_run,
+                item['file'],
+                str(work_dir / f"{item['name']}.{filter_name}.mp3"),
+                [filter_name],
+                backend
+            )
+            print(f"   {filter_name:<24} {filters[filter_name]['wall_time_sec']:.2f}s")
+        
+        profiles = {}
+        for profile, spec in AudioPreprocessor.PROFILES.items():
+            run = run_isolated(
+                _suite_run,
+                item['file'],
+                str(work_dir / f"{item['name']}.{profile}.mp3"),
+                spec['filters'],
+                backend
+            )
+            run['filters'] = {name: filters[name] for name in spec['filters']}
+            profiles[profile] = run
+            print(
+                f"   profile {profile:<16} {run['wall_time_sec']:.2f}s, "
+                f"peak ffmpeg RSS {run['peak_ffmpeg_rss_mb']} MB, "
+                f"python RSS {run['peak_python_rss_mb']} MB"
+            )
+        
+        items[item['name']] = {**item, 'filters': filters, 'profiles': profiles}
+    
+    return {
+        'benchmark': 'suite',
+        'backend': backend,
+        'environment': _environment(),
+        'items': items
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Сравнивает время профилей с базовым отчётом
+    
+    Returns:
+        Строки вида "speech_30s_16k_mono / standard: 1.20s -> 1.05s (-12.5%)"
+    """
+    lines = []
+    for name, item in current['items'].items():
+        base_item = baseline.get('items', {}).get(name)
+        if base_item is None:
+            continue
+        for profile, run in item['profiles'].items():
+            base_run = base_item['profiles'].get(profile)
+            if not base_run or not base_run.get('success') or not run.get('success'):
+                continue
+            before, after = base_run['wall_time_sec'], run['wall_time_sec']
+            change = (after - before) / before * 100 if before else 0.0
+            lines.append(f"{name} / {profile}: {before:.2f}s -> {after:.2f}s ({change:+.1f}%)")
+    return lines
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Audio preprocessor benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    loudnorm_parser = subparsers.add_parser(
+        'loudnorm',
+        help='Single-pass vs two-pass linear loudnorm (wall time and peak memory)'
+    )
+    loudnorm_parser.add_argument('--input', type=str, help='Recording to use (default: synthetic)')
+    loudnorm_parser.add_argument(
+        '--duration',
+        type=float,
+        default=3600,
+        help='Duration of the synthetic recording in seconds (default: 3600)'
+    )
+    loudnorm_parser.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+
+    formats_parser = subparsers.add_parser(
+        'formats',
+        help='Encode time and upload size per output format (mp3, ogg_opus, wav, linear16)'
+    )
+    formats_parser.add_argument('--input', type=str, help='Recording to use (default: synthetic)')
+    formats_parser.add_argument(
+        '--duration',
+        type=float,
+        default=600,
+        help='Duration of the synthetic recording in seconds (default: 600)'
+    )
+    formats_parser.add_argument(
+        '--uplink-mbps',
+        type=float,
+        default=20.0,
+        help='Upload bandwidth used to estimate upload time (default: 20)'
+    )
+    formats_parser.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+
+    suite_parser = subparsers.add_parser(
+        'suite',
+        help='Every profile on a deterministic synthetic corpus (per-filter time, peak memory, size)'
+    )
+    suite_parser.add_argument(
+        '--corpus-dir',
+        type=str,
+        help='Keep the generated corpus here and reuse it between runs (default: temporary)'
+    )
+    suite_parser.add_argument(
+        '--max-duration',
+        type=float,
+        help='Skip corpus files longer than this many seconds (quick runs)'
+    )
+    suite_parser.add_argument(
+        '--backend',
+        choices=['auto', 'ffmpeg', 'numpy'],
+        default='ffmpeg',
+        help='Preprocessor backend (default: ffmpeg)'
+    )
+    suite_parser.add_argument('--baseline', type=str, help='Previous suite report to compare against')
+    suite_parser.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+
+    args = parser.parse_args(argv)
+
+    if not FFMPEG_AVAILABLE:
+        print("ERROR: ffmpeg-python is not installed.")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='audio_bench_') as tmp:
+        work_dir = Path(tmp)
+
+        if args.command == 'suite':
+            corpus_dir = Path(args.corpus_dir) if args.corpus_dir else work_dir / 'corpus'
+            corpus = generate_corpus(corpus_dir, args.max_duration)
+            report = bench_suite(corpus, work_dir, args.backend)
+        elif args.input:
+            input_file = Path(args.input)
+        else:
+            print(f"🎛  Generating synthetic recording ({args.duration:.0f}s)...")
+            input_file = generate_recording(work_dir / 'synthetic.mp3', args.duration)
+
+        if args.command == 'loudnorm':
+            report = bench_loudnorm(input_file, work_dir)
+        elif args.command == 'formats':
+            report = bench_formats(input_file, work_dir, args.uplink_mbps)
+
+    if args.command == 'suite' and args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        print(f"\n📊 Compared to {args.baseline}:")
+        for line in compare_reports(baseline, report):
+            print(f"   {line}")
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"💾 Report saved: {args.output}")
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: YANDEX OBJECT STORAGE
+Накладные расходы загрузки (tools/yandex_object_storage.py) для
+небольших голосовых заметок: встроенный S3-клиент против yc CLI
+
+Без --real S3-бэкенд работает с локальным стендом
+(fake_object_storage.py, задержка сети задаётся --latency-ms), а для
+yc замеряется только запуск процесса `yc --version` — нижняя граница
+цены каждой операции CLI, которая от сети не зависит. С --real оба
+бэкенда загружают в настоящий bucket (ключи и YANDEX_FOLDER_ID из
+окружения).
+
+Использование:
+    # 50 заметок по 60 KB, 20 мс до «хранилища»
+    python benchmark_yandex_object_storage.py uploads --count 50 --latency-ms 20
+    
+    # Настоящий bucket, оба бэкенда
+    python benchmark_yandex_object_storage.py uploads --real --bucket my-bench-bucket -o uploads.json
+    
+    # Составная загрузка больших файлов: время и пиковый RSS по размерам
+    python benchmark_yandex_object_storage.py multipart --sizes-mb 64 256 1024 --workers 4
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import resource
+import hashlib
+import contextlib
+import subprocess
+import tempfile
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.append(str(Path(__file__).parent))
+
+from yandex_object_storage import YandexObjectStorage, S3Client, file_md5
+from fake_object_storage import FakeObjectStorageServer
+
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def generate_voice_notes(directory: Path, count: int, size_kb: int, seed: int = 42) -> List[Path]:
+    """
+    Файлы размером с голосовую заметку (OGG/Opus ≈ 2 KB на секунду речи)
+    
+    Returns:
+        Пути к созданным файлам
+    """
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        path = directory / f"voice_{i:04d}.ogg"
+        path.write_bytes(rng.randbytes(size_kb * 1024))
+        files.append(path)
+    return files
+
+
+# ============================================================================
+# UPLOADS
+# ============================================================================
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 4) if values else None
+
+
+def bench_backend(backend: str, files: List[Path], storage_options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Создание YandexObjectStorage и загрузка + удаление каждого файла
+    
+    Args:
+        backend: 's3' или 'yc'
+        files: Файлы для загрузки (по одному, последовательно)
+        storage_options: Параметры YandexObjectStorage
+    
+    Returns:
+        Время создания клиента и распределение времени на файл
+    """
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # Прогресс хранилища (print) на каждый файл не нужен
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        storage = YandexObjectStorage(backend=backend, **storage_options)
+        init_sec = time.perf_counter() - start
+        
+        upload, delete = [], []
+        for path in files:
+            start = time.perf_counter()
+            url = storage.upload_file(path)
+            uploaded = time.perf_counter()
+            storage.delete_file(url.split(storage.bucket_name + '/')[-1])
+            upload.append(uploaded - start)
+            delete.append(time.perf_counter() - uploaded)
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    
+    cpu_sec = sum(
+        after.ru_utime - before.ru_utime + after.ru_stime - before.ru_stime
+        for before, after in ((usage_before, usage_after), (children_before, children_after))
+    )
+    total = [u + d for u, d in zip(upload, delete)]
+    return {
+        'backend': backend,
+        'init_sec': round(init_sec, 4),
+        'upload_mean_sec': _mean(upload),
+        'upload_p95_sec': _percentile(upload, 0.95),
+        'delete_mean_sec': _mean(delete),
+        'per_file_p50_sec': _percentile(total, 0.5),
+        'per_file_p95_sec': _percentile(total, 0.95),
+        # CPU этого процесса и запущенных им yc
+        'cpu_sec_per_file': round(cpu_sec / len(files), 4)
+    }
+
+
+def yc_spawn_cost(runs: int = 5) -> Optional[Dict[str, Any]]:
+    """
+    Время запуска `yc --version` (None — yc не установлен)
+    
+    Каждая операция yc-бэкенда — отдельный такой процесс: создание
+    клиента — три (--version, config set, bucket list), загрузка и
+    удаление файла — ещё по одному.
+    """
+    if shutil.which('yc') is None:
+        return None
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(['yc', '--version'], capture_output=True)
+        timings.append(time.perf_counter() - start)
+    spawn = sorted(timings)[len(timings) // 2]
+    return {
+        'spawn_p50_sec': round(spawn, 4),
+        'init_floor_sec': round(3 * spawn, 4),
+        'per_file_floor_sec': round(2 * spawn, 4)
+    }
+
+
+def bench_uploads(
+    count: int = 50,
+    size_kb: int = 60,
+    latency_ms: float = 0.0,
+    real: bool = False,
+    bucket: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Накладные расходы на одну небольшую загрузку по бэкендам
+    
+    Args:
+        count: Файлов
+        size_kb: Размер файла, KB (60 KB ≈ 30 секунд Opus)
+        latency_ms: Задержка локального стенда на запрос (без real)
+        real: Загружать в настоящий bucket обоими доступными бэкендами
+        bucket: Bucket для real (default: как у YandexObjectStorage)
+    
+    Returns:
+        Словарь с результатами по бэкендам
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix='storage_bench_') as tmp:
+        files = generate_voice_notes(Path(tmp), count, size_kb)
+        
+        if real:
+            options = {'bucket_name': bucket} if bucket else {}
+            backends = ['yc'] if shutil.which('yc') else []
+            if os.getenv('YANDEX_STORAGE_ACCESS_KEY') or os.getenv('AWS_ACCESS_KEY_ID'):
+                backends.insert(0, 's3')
+            for backend in backends:
+                print(f"⏱  {backend}: {count} × {size_kb} KB...")
+                results.append(bench_backend(backend, files, options))
+        else:
+            credentials = ('bench-key', 'bench-secret')
+            with FakeObjectStorageServer(latency_ms=latency_ms, credentials=credentials) as server:
+                print(f"⏱  s3 (local stand, {latency_ms:g} ms): {count} × {size_kb} KB...")
+                level = bench_backend('s3', files, {
+                    'access_key': credentials[0],
+                    'secret_key': credentials[1],
+                    'endpoint_url': server.url
+                })
+                level['requests'] = server.stats()['requests']
+                results.append(level)
+    
+    for level in results:
+        print(
+            f"   {level['backend']}: init {level['init_sec']}s, "
+            f"per file p50 {level['per_file_p50_sec']}s / p95 {level['per_file_p95_sec']}s, "
+            f"CPU {level['cpu_sec_per_file']}s"
+        )
+    
+    spawn = yc_spawn_cost()
+    if spawn is not None:
+        print(
+            f"   yc: process start {spawn['spawn_p50_sec']}s "
+            f"(≥ {spawn['per_file_floor_sec']}s per file before any network)"
+        )
+    
+    return {
+        'benchmark': 'uploads',
+        'files': count,
+        'size_kb': size_kb,
+        'real': real,
+        'latency_ms': None if real else latency_ms,
+        'backends': results,
+        'yc_spawn': spawn
+    }
+
+
+# ============================================================================
+# MULTIPART: LARGE FILES
+# ============================================================================
+
+def generate_large_file(path: Path, size_mb: int, seed: int = 42) -> Path:
+    """Файл size_mb MB (повтор случайного блока 1 MB — создаётся быстро)"""
+    block = random.Random(seed).randbytes(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path
+
+
+def _peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса (ru_maxrss: KB на Linux, байты на macOS)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divider = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(rss / divider, 1)
+
+
+def _upload_multipart(endpoint_url: str, credentials: tuple, path: str, part_size: int, workers: int) -> Dict[str, Any]:
+    client = S3Client(*credentials, endpoint_url=endpoint_url, pool_size=max(10, workers))
+    start = time.perf_counter()
+    name_hash = file_md5(path)[:8]
+    hash_sec = time.perf_counter() - start
+    upload = client.upload_multipart('bench', f"speechkit/{name_hash}_{Path(path).name}", Path(path), part_size, workers)
+    return {
+        'wall_time_sec': round(time.perf_counter() - start, 3),
+        'hash_sec': round(hash_sec, 3),
+        'parts': upload['parts'],
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+
+def _legacy_hash(path: str) -> Dict[str, Any]:
+    # Прежнее имя объекта: MD5 от файла, прочитанного целиком
+    start = time.perf_counter()
+    hashlib.md5(Path(path).read_bytes()).hexdigest()
+    return {'wall_time_sec': round(time.perf_counter() - start, 3), 'peak_rss_mb': _peak_rss_mb()}
+
+
+def run_isolated(func, *args) -> Dict[str, Any]:
+    """Выполняет замер в свежем процессе (пиковый RSS — только этого замера)"""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def bench_multipart(
+    sizes_mb: List[int],
+    part_size_mb: int = 16,
+    workers: int = 4,
+    latency_ms: float = 0.0,
+    legacy: bool = True
+) -> Dict[str, Any]:
+    """
+    Составная загрузка файлов разного размера в локальный стенд
+    
+    Загрузка идёт в отдельном процессе, стенд (без хранения содержимого)
+    работает в этом: пиковый RSS — только клиента. Он не должен расти
+    с размером файла.
+    
+    Args:
+        sizes_mb: Размеры файлов, MB
+        part_size_mb: Размер части, MB
+        workers: Частей одновременно
+        latency_ms: Задержка стенда на запрос
+        legacy: Замерить и прежний MD5 по read_bytes() (память ~ размер файла)
+    
+    Returns:
+        Словарь с результатами по размерам
+    """
+    credentials = ('bench-key', 'bench-secret')
+    results = []
+    with FakeObjectStorageServer(latency_ms=latency_ms, credentials=credentials, store_bodies=False) as server:
+        S3Client(*credentials, endpoint_url=server.url).create_bucket('bench')
+        with tempfile.TemporaryDirectory(prefix='storage_bench_') as tmp:
+            for size_mb in sizes_mb:
+                path = generate_large_file(Path(tmp) / f"video_{size_mb}mb.mp4", size_mb)
+                print(f"⏱  {size_mb} MB, parts of {part_size_mb} MB × {workers} workers...")
+                level = run_isolated(
+                    _upload_multipart, server.url, credentials, str(path), part_size_mb * 1024 * 1024, workers
+                )
+                level['size_mb'] = size_mb
+                level['throughput_mb_per_sec'] = round(size_mb / level['wall_time_sec'], 1)
+                if legacy:
+                    level['legacy_hash'] = run_isolated(_legacy_hash, str(path))
+                print(
+                    f"   {level['wall_time_sec']}s ({level['throughput_mb_per_sec']} MB/s), "
+                    f"peak RSS {level['peak_rss_mb']} MB"
+                    + (f", read_bytes() MD5: {level['legacy_hash']['peak_rss_mb']} MB" if legacy else '')
+                )
+                results.append(level)
+                path.unlink()
+    
+    return {
+        'benchmark': 'multipart',
+        'part_size_mb': part_size_mb,
+        'workers': workers,
+        'latency_ms': latency_ms,
+        'sizes': results
+    }
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Yandex Object Storage upload benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    parser_uploads = subparsers.add_parser(
+        'uploads',
+        help='Per-upload overhead for small voice notes: S3 client vs yc CLI'
+    )
+    parser_uploads.add_argument('--count', type=int, default=50, help='Files to upload (default: 50)')
+    parser_uploads.add_argument('--size-kb', type=int, default=60, help='File size, KB (default: 60)')
+    parser_uploads.add_argument('--latency-ms', type=float, default=0.0, help='Local stand delay per request')
+    parser_uploads.add_argument('--real', action='store_true', help='Upload to the real bucket with every available backend')
+    parser_uploads.add_argument('--bucket', type=str, help='Bucket for --real')
+    parser_uploads.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+    
+    parser_multipart = subparsers.add_parser(
+        'multipart',
+        help='Multipart upload of large files: time and client peak RSS by file size'
+    )
+    parser_multipart.add_argument(
+        '--sizes-mb',
+        type=int,
+        nargs='+',
+        default=[64, 256, 1024],
+        help='File sizes, MB (default: 64 256 1024)'
+    )
+    parser_multipart.add_argument('--part-size-mb', type=int, default=16, help='Part size, MB (default: 16)')
+    parser_multipart.add_argument('--workers', type=int, default=4, help='Parts in flight (default: 4)')
+    parser_multipart.add_argument('--latency-ms', type=float, default=0.0, help='Local stand delay per request')
+    parser_multipart.add_argument('--no-legacy', action='store_true', help='Skip the read_bytes() MD5 baseline')
+    parser_multipart.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'multipart':
+        report = bench_multipart(
+            args.sizes_mb,
+            part_size_mb=args.part_size_mb,
+            workers=args.workers,
+            latency_ms=args.latency_ms,
+            legacy=not args.no_legacy
+        )
+    else:
+        report = bench_uploads(
+            count=args.count,
+            size_kb=args.size_kb,
+            latency_ms=args.latency_ms,
+            real=args.real,
+            bucket=args.bucket
+        )
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"💾 Report saved: {args.output}")
+    else:
+        print(output)
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
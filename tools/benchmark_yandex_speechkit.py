@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: YANDEX SPEECHKIT
+Замеры клиента SpeechKit (tools/yandex_speechkit.py): разбор ответа
+getRecognition и нагрузочный прогон против локального стенда
+(fake_speechkit_server.py)
+
+Синтетический NDJSON повторяет формат API v3: на каждую фразу строка
+'final' со словами и временными метками, строка 'finalRefinement'
+с нормализованным текстом и служебная 'statusCode'. Каждый вариант
+разбора запускается в отдельном процессе: пиковая память — это
+ru_maxrss и пик tracemalloc этого процесса.
+
+Использование:
+    # Многочасовая запись (~3 часа речи)
+    python benchmark_yandex_speechkit.py parser --hours 3
+
+    # На сохранённом ответе API
+    python benchmark_yandex_speechkit.py parser --input recognition.ndjson -o parser.json
+
+    # 1, 10 и 100 одновременных заданий без сети: пропускная способность,
+    # задержка опроса после готовности и время получения/разбора
+    python benchmark_yandex_speechkit.py load --client async -o load.json
+"""
+
+import io
+import sys
+import json
+import time
+import contextlib
+import resource
+import tempfile
+import tracemalloc
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+sys.path.append(str(Path(__file__).parent))
+
+from yandex_speechkit import (
+    YandexSpeechKit,
+    AsyncYandexSpeechKit,
+    RecognitionResultParser,
+    FixedIntervalPolling,
+    default_polling_policy,
+    HTTPX_AVAILABLE
+)
+from fake_speechkit_server import FakeSpeechKitServer, synthetic_recognition_lines
+
+
+# ============================================================================
+# SYNTHETIC INPUT
+# ============================================================================
+
+def generate_fixture(output_file: Path, hours: float, seed: int = 42) -> Path:
+    """
+    Генерирует синтетический ответ getRecognition (NDJSON)
+    
+    Args:
+        output_file: Куда сохранить
+        hours: Длительность «записи» в часах (≈ 2.5 слова в секунду, фразы по 8-20 слов)
+        seed: Seed генератора (файл воспроизводим)
+        
+    Returns:
+        Путь к созданному файлу
+    """
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.writelines(synthetic_recognition_lines(hours * 3600, seed))
+    return output_file
+
+
+# ============================================================================
+# ISOLATED RUNS
+# ============================================================================
+
+def _peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса (ru_maxrss: KB на Linux, байты на macOS)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divider = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(rss / divider, 1)
+
+
+def _measure(func: Callable[..., Dict[str, Any]], args: tuple) -> Dict[str, Any]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'wall_time_sec': round(wall_time, 3),
+        'peak_python_alloc_mb': round(peak / 1024 / 1024, 1),
+        'peak_rss_mb': _peak_rss_mb(),
+        **result
+    }
+
+
+def run_isolated(func: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """
+    Выполняет замер в свежем процессе
+    
+    Returns:
+        Результат func + wall_time_sec, peak_python_alloc_mb и peak_rss_mb
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(_measure, (func, args))
+
+
+# ============================================================================
+# PARSER: WHOLE RESPONSE VS STREAMING
+# ============================================================================
+
+def _summary(results: Dict, utterances: int) -> Dict[str, Any]:
+    return {
+        'utterances': utterances,
+        'words': len(results['words']),
+        'raw_lines': len(results['raw'])
+    }
+
+
+def _parse_whole(input_file: str) -> Dict[str, Any]:
+    # Прежнее поведение: ответ целиком в строке, split и все строки в 'raw'
+    text = Path(input_file).read_text(encoding='utf-8')
+    parser = RecognitionResultParser(keep_raw=True)
+    utterances = sum(1 for _ in parser.iter_utterances(text.strip().split('\n')))
+    return _summary(parser.result(), utterances)
+
+
+def _parse_streaming(input_file: str, keep_raw: bool) -> Dict[str, Any]:
+    # Как get_recognition(): строки читаются из потока по одной
+    parser = RecognitionResultParser(keep_raw=keep_raw)
+    with open(input_file, 'rb') as f:
+        utterances = sum(1 for _ in parser.iter_utterances(f))
+    return _summary(parser.result(), utterances)
+
+
+def bench_parser(input_file: Path) -> Dict[str, Any]:
+    """
+    Сравнивает разбор ответа целиком (с raw) и потоковый (raw по желанию)
+    
+    Args:
+        input_file: NDJSON-ответ getRecognition
+        
+    Returns:
+        Словарь с результатами по вариантам
+    """
+    variants = {}
+    for name, func, args in (
+        ('whole_response_keep_raw', _parse_whole, (str(input_file),)),
+        ('streaming_keep_raw', _parse_streaming, (str(input_file), True)),
+        ('streaming', _parse_streaming, (str(input_file), False))
+    ):
+        print(f"⏱  {name}...")
+        variants[name] = run_isolated(func, *args)
+        print(
+            f"   {variants[name]['wall_time_sec']:.2f}s, "
+            f"peak alloc {variants[name]['peak_python_alloc_mb']} MB, "
+            f"peak RSS {variants[name]['peak_rss_mb']} MB"
+        )
+    
+    return {
+        'benchmark': 'parser',
+        'input_file': str(input_file),
+        'input_size_bytes': input_file.stat().st_size,
+        'variants': variants
+    }
+
+
+# ============================================================================
+# LOAD: CONCURRENT JOBS AGAINST THE FAKE API
+# ============================================================================
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 3) if values else None
+
+
+def _run_sync_jobs(server: FakeSpeechKitServer, uris: List[str], duration_sec: float,
+                   concurrency: int, polling: Callable) -> Dict[str, tuple]:
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+    
+    stt = YandexSpeechKit(api_key='fake', api_base_url=server.url, polling_policy=polling)
+    # Пул соединений requests по умолчанию — 10 на хост
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    stt.session.mount('http://', adapter)
+    
+    def job(uri: str) -> tuple:
+        start = time.time()
+        try:
+            stt.transcribe_from_uri(uri, audio_duration_sec=duration_sec)
+            return start, time.time(), None
+        except Exception as e:
+            return start, time.time(), str(e)
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return dict(zip(uris, executor.map(job, uris)))
+
+
+def _run_async_jobs(server: FakeSpeechKitServer, uris: List[str], duration_sec: float,
+                    concurrency: int, polling: Callable) -> Dict[str, tuple]:
+    import asyncio
+    
+    async def run() -> Dict[str, tuple]:
+        async with AsyncYandexSpeechKit(
+            api_key='fake',
+            api_base_url=server.url,
+            polling_policy=polling,
+            max_connections=concurrency,
+            max_keepalive_connections=concurrency
+        ) as stt:
+            slots = asyncio.Semaphore(concurrency)
+            
+            async def job(uri: str) -> tuple:
+                async with slots:
+                    start = time.time()
+                    try:
+                        await stt.transcribe_from_uri(uri, audio_duration_sec=duration_sec)
+                        return start, time.time(), None
+                    except Exception as e:
+                        return start, time.time(), str(e)
+            
+            return dict(zip(uris, await asyncio.gather(*(job(uri) for uri in uris))))
+    
+    return asyncio.run(run())
+
+
+def bench_load_level(
+    concurrency: int,
+    client: str = 'sync',
+    audio_duration_sec: float = 60.0,
+    rounds: int = 1,
+    polling: str = 'adaptive',
+    server_options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Прогон concurrency одновременных заданий против FakeSpeechKitServer
+    
+    Каждое задание — transcribe_from_uri (создание операции, опрос,
+    получение и разбор NDJSON). По моментам сервера время задания
+    раскладывается на «распознавание» (его задаёт стенд) и накладные
+    расходы клиента: задержку опроса после готовности (poll_lag) и
+    получение с разбором результата (fetch_parse).
+    
+    Args:
+        concurrency: Одновременных заданий
+        client: 'sync' (YandexSpeechKit в потоках) или 'async' (AsyncYandexSpeechKit)
+        audio_duration_sec: Длительность «аудио» каждого задания
+        rounds: Заданий на один слот (всего concurrency * rounds)
+        polling: 'adaptive' (default_polling_policy) или 'fixed' (каждые 5 с)
+        server_options: Параметры FakeSpeechKitServer
+        
+    Returns:
+        Словарь с пропускной способностью и распределениями времён
+    """
+    policy = default_polling_policy if polling == 'adaptive' else (lambda duration: FixedIntervalPolling())
+    run_jobs = _run_async_jobs if client == 'async' else _run_sync_jobs
+    
+    with FakeSpeechKitServer(**(server_options or {})) as server:
+        uris = [
+            server.fake_uri(f"c{concurrency}_job{i:04d}", audio_duration_sec)
+            for i in range(concurrency * rounds)
+        ]
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        wall_start = time.perf_counter()
+        # Прогресс клиента (print) на каждое задание не нужен
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings = run_jobs(server, uris, audio_duration_sec, concurrency, policy)
+        wall_time = time.perf_counter() - wall_start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        stats = server.stats()
+    
+    operations = {op['uri']: op for op in stats['operations'].values()}
+    latency, overhead, poll_lag, fetch_parse, polls = [], [], [], [], []
+    errors = []
+    for uri, (start, end, error) in timings.items():
+        if error is not None:
+            errors.append(error)
+            continue
+        op = operations[uri]
+        latency.append(end - start)
+        overhead.append(end - start - (op['ready_at'] - op['created_at']))
+        poll_lag.append(op['done_seen_at'] - op['ready_at'])
+        fetch_parse.append(end - op['fetched_at'])
+        polls.append(op['polls'])
+    
+    cpu_sec = (
+        usage_after.ru_utime - usage_before.ru_utime
+        + usage_after.ru_stime - usage_before.ru_stime
+    )
+    return {
+        'concurrency': concurrency,
+        'jobs': len(uris),
+        'failed': len(errors),
+        'errors': sorted(set(errors))[:5],
+        'wall_time_sec': round(wall_time, 3),
+        'throughput_jobs_per_sec': round(len(latency) / wall_time, 3),
+        'latency_p50_sec': _percentile(latency, 0.5),
+        'latency_p95_sec': _percentile(latency, 0.95),
+        'overhead_mean_sec': _mean(overhead),
+        'overhead_p95_sec': _percentile(overhead, 0.95),
+        'poll_lag_mean_sec': _mean(poll_lag),
+        'poll_lag_p95_sec': _percentile(poll_lag, 0.95),
+        'fetch_parse_mean_sec': _mean(fetch_parse),
+        'fetch_parse_p95_sec': _percentile(fetch_parse, 0.95),
+        'polls_per_job': _mean(polls),
+        # Сервер работает в том же процессе: CPU включает и его
+        'cpu_sec_per_job': round(cpu_sec / len(uris), 4),
+        'requests': stats['requests']
+    }
+
+
+def bench_load(
+    levels: List[int],
+    client: str = 'sync',
+    audio_duration_sec: float = 60.0,
+    rounds: int = 1,
+    polling: str = 'adaptive',
+    server_options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Нагрузочный прогон клиента на нескольких уровнях параллельности
+    
+    Returns:
+        Словарь с результатами по уровням (bench_load_level)
+    """
+    if client == 'async' and not HTTPX_AVAILABLE:
+        raise ImportError("Для --client async нужен httpx: pip install 'httpx[http2]'")
+    
+    results = []
+    for concurrency in levels:
+        print(f"⏱  {client}, {concurrency} concurrent jobs...")
+        level = bench_load_level(concurrency, client, audio_duration_sec, rounds, polling, server_options)
+        print(
+            f"   {level['throughput_jobs_per_sec']:.2f} jobs/s, "
+            f"overhead {level['overhead_mean_sec']}s (poll lag {level['poll_lag_mean_sec']}s, "
+            f"fetch+parse {level['fetch_parse_mean_sec']}s), "
+            f"{level['polls_per_job']} polls/job, failed {level['failed']}"
+        )
+        results.append(level)
+    
+    return {
+        'benchmark': 'load',
+        'client': client,
+        'polling': polling,
+        'audio_duration_sec': audio_duration_sec,
+        'server': server_options or {},
+        'levels': results
+    }
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Yandex SpeechKit client benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    parser_bench = subparsers.add_parser(
+        'parser',
+        help='Whole-response vs streaming getRecognition parsing (time and peak memory)'
+    )
+    parser_bench.add_argument('--input', type=str, help='NDJSON response to use (default: synthetic)')
+    parser_bench.add_argument(
+        '--hours',
+        type=float,
+        default=3.0,
+        help='Length of the synthetic recording in hours (default: 3)'
+    )
+    parser_bench.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+    
+    parser_load = subparsers.add_parser(
+        'load',
+        help='Client throughput and polling/parsing overhead against the local fake API'
+    )
+    parser_load.add_argument(
+        '--concurrency',
+        type=int,
+        nargs='+',
+        default=[1, 10, 100],
+        help='Concurrent job levels (default: 1 10 100)'
+    )
+    parser_load.add_argument('--client', choices=['sync', 'async'], default='sync')
+    parser_load.add_argument('--duration', type=float, default=60.0, help='Audio duration per job, sec (default: 60)')
+    parser_load.add_argument('--rounds', type=int, default=1, help='Jobs per concurrency slot (default: 1)')
+    parser_load.add_argument('--polling', choices=['adaptive', 'fixed'], default='adaptive')
+    parser_load.add_argument('--latency-ms', type=float, default=0.0, help='Fake server delay per request')
+    parser_load.add_argument(
+        '--processing-ratio',
+        type=float,
+        default=0.1,
+        help='Fake recognition time as a fraction of audio duration (default: 0.1)'
+    )
+    parser_load.add_argument('--failure-rate', type=float, default=0.0, help='Share of fake operations that fail')
+    parser_load.add_argument('-o', '--output', type=str, help='Write JSON report to file')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'load':
+        report = bench_load(
+            args.concurrency,
+            client=args.client,
+            audio_duration_sec=args.duration,
+            rounds=args.rounds,
+            polling=args.polling,
+            server_options={
+                'latency_ms': args.latency_ms,
+                'processing_ratio': args.processing_ratio,
+                'failure_rate': args.failure_rate
+            }
+        )
+    else:
+        with tempfile.TemporaryDirectory(prefix='speechkit_bench_') as tmp:
+            if args.input:
+                input_file = Path(args.input)
+            else:
+                print(f"🎛  Generating synthetic getRecognition response ({args.hours:g}h)...")
+                input_file = generate_fixture(Path(tmp) / 'recognition.ndjson', args.hours)
+            report = bench_parser(input_file)
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"💾 Report saved: {args.output}")
+    else:
+        print(output)
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
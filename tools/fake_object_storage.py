@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+FAKE OBJECT STORAGE - ЛОКАЛЬНЫЙ S3-СТЕНД
+
+Заменяет storage.yandexcloud.net для тестов и замеров без сети и ключей:
+path-style S3 API (bucket: HEAD / PUT / GET list-type=2; объект: PUT /
+HEAD / GET / DELETE; составная загрузка: uploads, части, ListParts,
+Complete, Abort) с хранением объектов в памяти. Если заданы
+credentials, каждая подпись AWS Signature V4 проверяется так же, как её
+считает сервер (403 SignatureDoesNotMatch). С store_bodies=False
+хранятся только размеры и ETag — для замеров на многогигабайтных файлах.
+
+Использование:
+    # Отдельным процессом
+    python fake_object_storage.py --port 8766 --latency-ms 20
+    export YANDEX_STORAGE_ENDPOINT=http://127.0.0.1:8766
+    
+    # В тестах и бенчмарках
+    with FakeObjectStorageServer(credentials=('key', 'secret')) as server:
+        storage = YandexObjectStorage(
+            backend='s3', access_key='key', secret_key='secret', endpoint_url=server.url
+        )
+        storage.upload_file('voice.ogg')
+"""
+
+import sys
+import time
+import uuid
+import hashlib
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Any
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from xml.sax.saxutils import escape
+import xml.etree.ElementTree as ET
+
+from yandex_object_storage import sign_v4
+
+
+S3_NS = 'http://s3.amazonaws.com/doc/2006-03-01/'
+# Тело запроса: MD5 и размер считаются при чтении блоками, data — только если нужно хранить
+RequestBody = namedtuple('RequestBody', 'data etag size')
+
+
+class FakeObjectStorageServer:
+    """
+    Локальный HTTP-сервер с подмножеством S3 API
+    
+    Каждый запрос обрабатывается в своём потоке (ThreadingHTTPServer,
+    HTTP/1.1 keep-alive). stats() считает запросы по операциям — по ним
+    видно, сколько обращений стоит одна загрузка.
+    """
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency_ms: float = 0.0,
+        credentials: Optional[Tuple[str, str]] = None,
+        region: str = 'ru-central1',
+        store_bodies: bool = True
+    ):
+        """
+        Args:
+            host: Адрес (default: 127.0.0.1)
+            port: Порт (0 — свободный, см. url)
+            latency_ms: Задержка ответа на каждый запрос
+            credentials: (access_key, secret_key) — проверять подписи;
+                None — достаточно заголовка Authorization
+            region: Регион подписи
+            store_bodies: Хранить содержимое объектов (False — только размер и ETag)
+        """
+        self.latency_ms = latency_ms
+        self.credentials = credentials
+        self.region = region
+        self.store_bodies = store_bodies
+        
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._requests: Dict[str, int] = {}
+        # UploadId -> bucket, key, initiated, parts (номер -> объект части)
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Адрес для YandexObjectStorage(endpoint_url=...)"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'FakeObjectStorageServer':
+        """Запускает сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Останавливает сервер"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self) -> 'FakeObjectStorageServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Счётчики запросов и содержимое хранилища
+        
+        Returns:
+            Словарь: requests (операция -> число), objects (bucket -> ключ -> размер)
+            и uploads (незавершённые составные загрузки: UploadId -> ключ и номера частей)
+        """
+        with self._lock:
+            return {
+                'requests': dict(self._requests),
+                'objects': {
+                    bucket: {key: obj['size'] for key, obj in objects.items()}
+                    for bucket, objects in self._buckets.items()
+                },
+                'uploads': {
+                    upload_id: {'key': upload['key'], 'parts': sorted(upload['parts'])}
+                    for upload_id, upload in self._uploads.items()
+                }
+            }
+    
+    def get_object(self, bucket: str, key: str) -> Optional[bytes]:
+        """Содержимое объекта (None — нет такого)"""
+        with self._lock:
+            obj = self._buckets.get(bucket, {}).get(key)
+            return obj['body'] if obj else None
+    
+    def _stored(self, body: bytes, etag: str, size: int) -> Dict[str, Any]:
+        return {
+            'body': body if self.store_bodies else None,
+            'size': size,
+            'etag': etag,
+            'last_modified': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        }
+    
+    def _count(self, operation: str) -> None:
+        with self._lock:
+            self._requests[operation] = self._requests.get(operation, 0) + 1
+    
+    def _check_signature(self, method: str, path: str, headers) -> Optional[str]:
+        """None — подпись верна, иначе код ошибки S3"""
+        authorization = headers.get('Authorization', '')
+        if not authorization.startswith('AWS4-HMAC-SHA256 '):
+            return 'AccessDenied'
+        if self.credentials is None:
+            return None
+        
+        fields = dict(
+            part.strip().split('=', 1)
+            for part in authorization[len('AWS4-HMAC-SHA256 '):].split(',')
+        )
+        access_key, secret_key = self.credentials
+        if fields.get('Credential', '').split('/', 1)[0] != access_key:
+            return 'InvalidAccessKeyId'
+        
+        implicit = ('host', 'x-amz-date', 'x-amz-content-sha256')
+        signed = {
+            name: headers.get(name, '')
+            for name in fields.get('SignedHeaders', '').split(';')
+            if name not in implicit
+        }
+        now = datetime.strptime(headers.get('x-amz-date', ''), '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+        expected = sign_v4(
+            method, f"http://{headers.get('Host', '')}{path}", signed,
+            headers.get('x-amz-content-sha256', ''), access_key, secret_key,
+            self.region, now=now
+        )
+        if expected['Authorization'] != authorization:
+            return 'SignatureDoesNotMatch'
+        return None
+    
+    # ------------------------------------------------------------------------
+    # Операции: (статус, заголовки, тело)
+    # ------------------------------------------------------------------------
+    
+    @staticmethod
+    def _error(status: int, code: str, message: str = '') -> tuple:
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<Error><Code>{code}</Code><Message>{escape(message or code)}</Message></Error>'
+        )
+        return status, {'Content-Type': 'application/xml'}, body.encode('utf-8')
+    
+    def _head_bucket(self, bucket: str) -> tuple:
+        self._count('head_bucket')
+        with self._lock:
+            exists = bucket in self._buckets
+        return (200, {}, b'') if exists else self._error(404, 'NoSuchBucket')
+    
+    def _create_bucket(self, bucket: str) -> tuple:
+        self._count('create_bucket')
+        with self._lock:
+            if bucket in self._buckets:
+                return self._error(409, 'BucketAlreadyOwnedByYou')
+            self._buckets[bucket] = {}
+        return 200, {}, b''
+    
+    def _list_objects(self, bucket: str, query: Dict[str, list]) -> tuple:
+        self._count('list_objects')
+        prefix = query.get('prefix', [''])[0]
+        max_keys = int(query.get('max-keys', ['1000'])[0])
+        after = query.get('continuation-token', [''])[0]
+        with self._lock:
+            objects = self._buckets.get(bucket)
+            if objects is None:
+                return self._error(404, 'NoSuchBucket')
+            keys = sorted(key for key in objects if key.startswith(prefix) and key > after)
+            page = [(key, objects[key]) for key in keys[:max_keys]]
+        
+        truncated = len(keys) > max_keys
+        parts = [
+            f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="{S3_NS}">',
+            f'<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>',
+            f'<KeyCount>{len(page)}</KeyCount><MaxKeys>{max_keys}</MaxKeys>',
+            f'<IsTruncated>{"true" if truncated else "false"}</IsTruncated>'
+        ]
+        if truncated:
+            parts.append(f'<NextContinuationToken>{escape(page[-1][0])}</NextContinuationToken>')
+        for key, obj in page:
+            parts.append(
+                f'<Contents><Key>{escape(key)}</Key><LastModified>{obj["last_modified"]}</LastModified>'
+                f'<ETag>"{obj["etag"]}"</ETag><Size>{obj["size"]}</Size></Contents>'
+            )
+        parts.append('</ListBucketResult>')
+        return 200, {'Content-Type': 'application/xml'}, ''.join(parts).encode('utf-8')
+    
+    def _put_object(self, bucket: str, key: str, body: RequestBody) -> tuple:
+        self._count('put_object')
+        with self._lock:
+            objects = self._buckets.get(bucket)
+            if objects is None:
+                return self._error(404, 'NoSuchBucket')
+            objects[key] = self._stored(body.data, body.etag, body.size)
+        return 200, {'ETag': f'"{body.etag}"'}, b''
+    
+    def _get_object(self, bucket: str, key: str, head: bool) -> tuple:
+        self._count('head_object' if head else 'get_object')
+        with self._lock:
+            obj = self._buckets.get(bucket, {}).get(key)
+        if obj is None:
+            return self._error(404, 'NoSuchKey')
+        headers = {'ETag': f'"{obj["etag"]}"', 'Content-Length': str(obj['size'])}
+        if head:
+            return 200, headers, b''
+        if obj['body'] is None:
+            return self._error(501, 'NotImplemented', 'store_bodies=False')
+        return 200, headers, obj['body']
+    
+    def _delete_object(self, bucket: str, key: str) -> tuple:
+        self._count('delete_object')
+        with self._lock:
+            self._buckets.get(bucket, {}).pop(key, None)
+        return 204, {}, b''
+    
+    def _create_upload(self, bucket: str, key: str) -> tuple:
+        self._count('create_multipart_upload')
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            if bucket not in self._buckets:
+                return self._error(404, 'NoSuchBucket')
+            self._uploads[upload_id] = {
+                'bucket': bucket,
+                'key': key,
+                'initiated': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'parts': {}
+            }
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?><InitiateMultipartUploadResult xmlns="{S3_NS}">'
+            f'<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>'
+            '</InitiateMultipartUploadResult>'
+        )
+        return 200, {'Content-Type': 'application/xml'}, body.encode('utf-8')
+    
+    def _upload_part(self, upload_id: str, number: int, body: RequestBody) -> tuple:
+        self._count('upload_part')
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                return self._error(404, 'NoSuchUpload')
+            upload['parts'][number] = self._stored(body.data, body.etag, body.size)
+        return 200, {'ETag': f'"{body.etag}"'}, b''
+    
+    def _list_parts(self, upload_id: str, query: Dict[str, list]) -> tuple:
+        self._count('list_parts')
+        max_parts = int(query.get('max-parts', ['1000'])[0])
+        marker = int(query.get('part-number-marker', ['0'])[0])
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                return self._error(404, 'NoSuchUpload')
+            numbers = sorted(number for number in upload['parts'] if number > marker)
+            page = [(number, upload['parts'][number]) for number in numbers[:max_parts]]
+        
+        truncated = len(numbers) > max_parts
+        parts = [
+            f'<?xml version="1.0" encoding="UTF-8"?><ListPartsResult xmlns="{S3_NS}">',
+            f'<UploadId>{upload_id}</UploadId><MaxParts>{max_parts}</MaxParts>',
+            f'<IsTruncated>{"true" if truncated else "false"}</IsTruncated>'
+        ]
+        if truncated:
+            parts.append(f'<NextPartNumberMarker>{page[-1][0]}</NextPartNumberMarker>')
+        for number, part in page:
+            parts.append(
+                f'<Part><PartNumber>{number}</PartNumber><LastModified>{part["last_modified"]}</LastModified>'
+                f'<ETag>"{part["etag"]}"</ETag><Size>{part["size"]}</Size></Part>'
+            )
+        parts.append('</ListPartsResult>')
+        return 200, {'Content-Type': 'application/xml'}, ''.join(parts).encode('utf-8')
+    
+    def _complete_upload(self, upload_id: str, body: RequestBody) -> tuple:
+        self._count('complete_multipart_upload')
+        requested = [
+            (int(item.findtext('PartNumber')), item.findtext('ETag', '').strip('"'))
+            for item in ET.fromstring(body.data).iter('Part')
+        ]
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                return self._error(404, 'NoSuchUpload')
+            parts = upload['parts']
+            if not requested or any(parts.get(number, {}).get('etag') != etag for number, etag in requested):
+                return self._error(400, 'InvalidPart')
+            if [number for number, _ in requested] != sorted(number for number, _ in requested):
+                return self._error(400, 'InvalidPartOrder')
+            chosen = [parts[number] for number, _ in requested]
+            digest = hashlib.md5(b''.join(bytes.fromhex(part['etag']) for part in chosen)).hexdigest()
+            etag = f"{digest}-{len(chosen)}"
+            data = b''.join(part['body'] for part in chosen) if self.store_bodies else b''
+            obj = self._stored(data, etag, sum(part['size'] for part in chosen))
+            self._buckets[upload['bucket']][upload['key']] = obj
+            del self._uploads[upload_id]
+        result = (
+            f'<?xml version="1.0" encoding="UTF-8"?><CompleteMultipartUploadResult xmlns="{S3_NS}">'
+            f'<Key>{escape(upload["key"])}</Key><ETag>"{etag}"</ETag></CompleteMultipartUploadResult>'
+        )
+        return 200, {'Content-Type': 'application/xml'}, result.encode('utf-8')
+    
+    def _abort_upload(self, upload_id: str) -> tuple:
+        self._count('abort_multipart_upload')
+        with self._lock:
+            if self._uploads.pop(upload_id, None) is None:
+                return self._error(404, 'NoSuchUpload')
+        return 204, {}, b''
+    
+    def _list_uploads(self, bucket: str, query: Dict[str, list]) -> tuple:
+        self._count('list_multipart_uploads')
+        prefix = query.get('prefix', [''])[0]
+        with self._lock:
+            uploads = sorted(
+                (upload['key'], upload_id, upload['initiated'])
+                for upload_id, upload in self._uploads.items()
+                if upload['bucket'] == bucket and upload['key'].startswith(prefix)
+            )
+        parts = [
+            f'<?xml version="1.0" encoding="UTF-8"?><ListMultipartUploadsResult xmlns="{S3_NS}">',
+            f'<Bucket>{escape(bucket)}</Bucket><Prefix>{escape(prefix)}</Prefix><IsTruncated>false</IsTruncated>'
+        ]
+        for key, upload_id, initiated in uploads:
+            parts.append(
+                f'<Upload><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>'
+                f'<Initiated>{initiated}</Initiated></Upload>'
+            )
+        parts.append('</ListMultipartUploadsResult>')
+        return 200, {'Content-Type': 'application/xml'}, ''.join(parts).encode('utf-8')
+    
+    def _dispatch(self, method: str, bucket: str, key: str, query: Dict[str, list], body: RequestBody) -> tuple:
+        if not bucket:
+            return self._error(400, 'InvalidRequest', 'path-style bucket required')
+        upload_id = query.get('uploadId', [''])[0]
+        if not key:
+            if method == 'GET' and 'uploads' in query:
+                return self._list_uploads(bucket, query)
+            if method == 'HEAD':
+                return self._head_bucket(bucket)
+            if method == 'PUT':
+                return self._create_bucket(bucket)
+            if method == 'GET':
+                return self._list_objects(bucket, query)
+        elif method == 'POST' and 'uploads' in query:
+            return self._create_upload(bucket, key)
+        elif upload_id:
+            if method == 'PUT':
+                return self._upload_part(upload_id, int(query.get('partNumber', ['0'])[0]), body)
+            if method == 'GET':
+                return self._list_parts(upload_id, query)
+            if method == 'POST':
+                return self._complete_upload(upload_id, body)
+            if method == 'DELETE':
+                return self._abort_upload(upload_id)
+        else:
+            if method == 'PUT':
+                return self._put_object(bucket, key, body)
+            if method in ('GET', 'HEAD'):
+                return self._get_object(bucket, key, head=method == 'HEAD')
+            if method == 'DELETE':
+                return self._delete_object(bucket, key)
+        return self._error(405, 'MethodNotAllowed')
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _read_body(self, keep: bool) -> RequestBody:
+                left = int(self.headers.get('Content-Length') or 0)
+                digest = hashlib.md5()
+                chunks = []
+                size = 0
+                while left > 0:
+                    data = self.rfile.read(min(left, 1024 * 1024))
+                    if not data:
+                        break
+                    digest.update(data)
+                    size += len(data)
+                    left -= len(data)
+                    if keep:
+                        chunks.append(data)
+                return RequestBody(b''.join(chunks) if keep else None, digest.hexdigest(), size)
+            
+            def _handle(self, method: str) -> None:
+                if server.latency_ms > 0:
+                    time.sleep(server.latency_ms / 1000)
+                body = self._read_body(keep=server.store_bodies or method == 'POST')
+                
+                error = server._check_signature(method, self.path, self.headers)
+                if error is not None:
+                    status, headers, payload = server._error(403, error)
+                else:
+                    url = urlparse(self.path)
+                    bucket, _, key = url.path.lstrip('/').partition('/')
+                    status, headers, payload = server._dispatch(
+                        method, unquote(bucket), unquote(key),
+                        parse_qs(url.query, keep_blank_values=True), body
+                    )
+                
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if 'Content-Length' not in headers:
+                    self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if method != 'HEAD':
+                    self.wfile.write(payload)
+            
+            def do_HEAD(self):
+                self._handle('HEAD')
+            
+            def do_GET(self):
+                self._handle('GET')
+            
+            def do_PUT(self):
+                self._handle('PUT')
+            
+            def do_POST(self):
+                self._handle('POST')
+            
+            def do_DELETE(self):
+                self._handle('DELETE')
+        
+        return Handler
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main() -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Local S3 (Yandex Object Storage) stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every request')
+    parser.add_argument('--access-key', help='Verify signatures made with this key (requires --secret-key)')
+    parser.add_argument('--secret-key')
+    parser.add_argument('--no-bodies', action='store_true', help='Keep only sizes and ETags (large-file benchmarks)')
+    
+    args = parser.parse_args()
+    
+    credentials = (args.access_key, args.secret_key) if args.access_key and args.secret_key else None
+    server = FakeObjectStorageServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        credentials=credentials,
+        store_bodies=not args.no_bodies
+    )
+    print(f"🧪 Fake Object Storage: {server.url}")
+    print(f"   export YANDEX_STORAGE_ENDPOINT={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
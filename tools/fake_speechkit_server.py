@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+FAKE SPEECHKIT SERVER - ЛОКАЛЬНЫЙ СТЕНД API V3
+
+Заменяет облачные recognizeFileAsync, operations/{id} и getRecognition
+для тестов и нагрузочных замеров без сети и ключей. Операция
+«распознаётся» duration_sec * processing_ratio секунд, результат —
+синтетический NDJSON в формате API v3 (строки 'final',
+'finalRefinement' и 'statusCode' на каждую фразу).
+
+Длительность аудио берётся из параметра duration_sec в uri запроса
+(https://example/voice.ogg?duration_sec=600), иначе — default_duration_sec.
+
+Использование:
+    # Отдельным процессом
+    python fake_speechkit_server.py --port 8765 --latency-ms 20 --failure-rate 0.05
+    export YANDEX_SPEECHKIT_API_BASE_URL=http://127.0.0.1:8765
+    
+    # В тестах и бенчмарках
+    with FakeSpeechKitServer(processing_ratio=0.01) as server:
+        stt = YandexSpeechKit(api_key='fake', api_base_url=server.url)
+        result = stt.transcribe_from_uri(server.fake_uri('job1', duration_sec=60))
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+from typing import Dict, Optional, Iterator, Any
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# ============================================================================
+# SYNTHETIC RECOGNITION OUTPUT
+# ============================================================================
+
+WORDS = [
+    'сегодня', 'мы', 'говорим', 'о', 'ремесле', 'и', 'дизайне', 'путешествия',
+    'париж', 'мастерская', 'история', 'человек', 'всегда', 'сейчас', 'материал',
+    'работа', 'руками', 'время', 'город', 'выставка'
+]
+
+
+def synthetic_recognition_lines(duration_sec: float, seed: int = 42) -> Iterator[str]:
+    """
+    Строки синтетического ответа getRecognition (NDJSON, с переводом строки)
+    
+    Args:
+        duration_sec: Длительность «записи» (≈ 2.5 слова в секунду, фразы по 8-20 слов)
+        seed: Seed генератора (ответ воспроизводим)
+    
+    Yields:
+        Строки JSON
+    """
+    rng = random.Random(seed)
+    total_ms = int(duration_sec * 1000)
+    cursor_ms = 0
+    index = 0
+    
+    while cursor_ms < total_ms:
+        words = []
+        for _ in range(rng.randint(8, 20)):
+            duration = rng.randint(200, 600)
+            words.append({
+                'text': rng.choice(WORDS),
+                'startTimeMs': str(cursor_ms),
+                'endTimeMs': str(cursor_ms + duration)
+            })
+            cursor_ms += duration
+        text = ' '.join(w['text'] for w in words)
+        alternative = {
+            'words': words,
+            'text': text,
+            'startTimeMs': words[0]['startTimeMs'],
+            'endTimeMs': words[-1]['endTimeMs'],
+            'confidence': 0
+        }
+        session = {'sessionUuid': {'uuid': 'fake', 'userRequestId': ''}, 'channelTag': '0'}
+        yield json.dumps({'result': {
+            **session,
+            'audioCursors': {'receivedDataMs': str(cursor_ms), 'finalIndex': str(index)},
+            'final': {'alternatives': [alternative], 'channelTag': '0'}
+        }}, ensure_ascii=False) + '\n'
+        yield json.dumps({'result': {
+            **session,
+            'finalRefinement': {
+                'finalIndex': str(index),
+                'normalizedText': {'alternatives': [{**alternative, 'text': text.capitalize() + '.'}]}
+            }
+        }}, ensure_ascii=False) + '\n'
+        yield json.dumps({'result': {
+            **session,
+            'statusCode': {'codeType': 'WORKING', 'message': ''}
+        }}) + '\n'
+        cursor_ms += rng.randint(300, 1500)
+        index += 1
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class FakeSpeechKitServer:
+    """
+    Локальный HTTP-сервер с эндпоинтами SpeechKit API v3
+    
+    Каждый запрос обрабатывается в своём потоке (ThreadingHTTPServer,
+    HTTP/1.1 keep-alive). Для каждой операции сервер запоминает моменты
+    создания, готовности, первого опроса после готовности и выдачи
+    результата — по ним бенчмарк отделяет время «распознавания» от
+    накладных расходов клиента на опрос и разбор (stats()).
+    """
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency_ms: float = 0.0,
+        processing_ratio: float = 0.1,
+        min_processing_sec: float = 0.5,
+        submit_failure_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        default_duration_sec: float = 60.0,
+        chunk_lines: int = 64,
+        seed: int = 42
+    ):
+        """
+        Args:
+            host: Адрес (default: 127.0.0.1)
+            port: Порт (0 — свободный, см. url)
+            latency_ms: Задержка ответа на каждый запрос
+            processing_ratio: Время «распознавания» к длительности аудио (default: 0.1)
+            min_processing_sec: Минимальное время «распознавания»
+            submit_failure_rate: Доля recognizeFileAsync, отвечающих 503
+            failure_rate: Доля операций, завершающихся ошибкой
+            default_duration_sec: Длительность аудио без duration_sec в uri
+            chunk_lines: Строк NDJSON в одном HTTP-чанке getRecognition
+            seed: Seed для отказов и синтетического текста
+        """
+        self.latency_ms = latency_ms
+        self.processing_ratio = processing_ratio
+        self.min_processing_sec = min_processing_sec
+        self.submit_failure_rate = submit_failure_rate
+        self.failure_rate = failure_rate
+        self.default_duration_sec = default_duration_sec
+        self.chunk_lines = chunk_lines
+        self.seed = seed
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Dict[str, Any]] = {}
+        # Длительность -> готовый ответ (одинаковые задания не генерируются заново)
+        self._payloads: Dict[float, list] = {}
+        self._requests = {'submit': 0, 'operation': 0, 'recognition': 0}
+        
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Базовый адрес для YandexSpeechKit(api_base_url=...)"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @staticmethod
+    def fake_uri(name: str, duration_sec: float) -> str:
+        """uri для transcribe_from_uri с заданной длительностью аудио"""
+        return f"https://storage.yandexcloud.net/fake/{name}.ogg?duration_sec={duration_sec:g}"
+    
+    def start(self) -> 'FakeSpeechKitServer':
+        """Запускает сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Останавливает сервер"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self) -> 'FakeSpeechKitServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Счётчики запросов и моменты жизни операций (time.time())
+        
+        Returns:
+            Словарь: requests (по эндпоинтам) и operations:
+            id -> uri, duration_sec, created_at, ready_at, polls, failed,
+            done_seen_at (первый опрос с done=true), fetched_at / served_at
+            (начало и конец выдачи getRecognition)
+        """
+        with self._lock:
+            return {
+                'requests': dict(self._requests),
+                'operations': {op_id: dict(op) for op_id, op in self._operations.items()}
+            }
+    
+    # ------------------------------------------------------------------------
+    # Эндпоинты
+    # ------------------------------------------------------------------------
+    
+    def _submit(self, body: Dict) -> tuple[int, Dict]:
+        uri = body.get('uri', '')
+        duration_sec = float(
+            parse_qs(urlparse(uri).query).get('duration_sec', [self.default_duration_sec])[0]
+        )
+        with self._lock:
+            self._requests['submit'] += 1
+            if self._rng.random() < self.submit_failure_rate:
+                return 503, {'code': 14, 'message': 'fake: service unavailable'}
+            failed = self._rng.random() < self.failure_rate
+            now = time.time()
+            op_id = f"fake{uuid.uuid4().hex[:16]}"
+            self._operations[op_id] = {
+                'uri': uri,
+                'duration_sec': duration_sec,
+                'created_at': now,
+                'ready_at': now + max(self.min_processing_sec, duration_sec * self.processing_ratio),
+                'failed': failed,
+                'polls': 0,
+                'done_seen_at': None,
+                'fetched_at': None,
+                'served_at': None
+            }
+        return 200, self._operation_body(op_id, done=False)
+    
+    def _operation(self, op_id: str) -> tuple[int, Dict]:
+        with self._lock:
+            self._requests['operation'] += 1
+            op = self._operations.get(op_id)
+            if op is None:
+                return 404, {'code': 5, 'message': f'fake: operation {op_id} not found'}
+            op['polls'] += 1
+            now = time.time()
+            done = now >= op['ready_at']
+            if done and op['done_seen_at'] is None:
+                op['done_seen_at'] = now
+            failed = op['failed']
+        
+        body = self._operation_body(op_id, done=done)
+        if done and failed:
+            body['error'] = {'code': 13, 'message': 'fake: recognition failed', 'details': []}
+        elif done:
+            body['response'] = {'@type': 'type.googleapis.com/google.protobuf.Empty'}
+        return 200, body
+    
+    def _recognition_lines(self, op_id: str) -> tuple[int, Any]:
+        with self._lock:
+            self._requests['recognition'] += 1
+            op = self._operations.get(op_id)
+            if op is None:
+                return 404, {'code': 5, 'message': f'fake: operation {op_id} not found'}
+            if time.time() < op['ready_at'] or op['failed']:
+                return 400, {'code': 9, 'message': 'fake: operation is not completed successfully'}
+            if op['fetched_at'] is None:
+                op['fetched_at'] = time.time()
+            duration_sec = op['duration_sec']
+            payload = self._payloads.get(duration_sec)
+        
+        if payload is None:
+            lines = [line.encode('utf-8') for line in synthetic_recognition_lines(duration_sec, self.seed)]
+            payload = [
+                b''.join(lines[i:i + self.chunk_lines])
+                for i in range(0, len(lines), self.chunk_lines)
+            ]
+            with self._lock:
+                self._payloads[duration_sec] = payload
+        return 200, payload
+    
+    def _served(self, op_id: str) -> None:
+        with self._lock:
+            op = self._operations.get(op_id)
+            if op is not None and op['served_at'] is None:
+                op['served_at'] = time.time()
+    
+    @staticmethod
+    def _operation_body(op_id: str, done: bool) -> Dict:
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        return {
+            'id': op_id,
+            'description': 'STT async recognition',
+            'createdAt': now,
+            'createdBy': 'fake',
+            'modifiedAt': now,
+            'done': done,
+            'metadata': None
+        }
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _authorized(self) -> bool:
+                if self.headers.get('Authorization'):
+                    return True
+                self._send_json(401, {'code': 16, 'message': 'fake: missing Authorization header'})
+                return False
+            
+            def _send_json(self, status: int, body: Dict) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def _delay(self) -> None:
+                if server.latency_ms > 0:
+                    time.sleep(server.latency_ms / 1000)
+            
+            def do_POST(self):
+                self._delay()
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not self._authorized():
+                    return
+                if urlparse(self.path).path != '/stt/v3/recognizeFileAsync':
+                    self._send_json(404, {'code': 12, 'message': f'fake: unknown method {self.path}'})
+                    return
+                self._send_json(*server._submit(body))
+            
+            def do_GET(self):
+                self._delay()
+                if not self._authorized():
+                    return
+                url = urlparse(self.path)
+                if url.path.startswith('/operations/'):
+                    self._send_json(*server._operation(url.path.rsplit('/', 1)[-1]))
+                elif url.path == '/stt/v3/getRecognition':
+                    query = parse_qs(url.query)
+                    op_id = (query.get('operation_id') or query.get('operationId') or [''])[0]
+                    status, payload = server._recognition_lines(op_id)
+                    if status != 200:
+                        self._send_json(status, payload)
+                        return
+                    # Ответ потоком (chunked), как у облачного API
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    for chunk in payload:
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b"\r\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    server._served(op_id)
+                else:
+                    self._send_json(404, {'code': 12, 'message': f'fake: unknown method {url.path}'})
+        
+        return Handler
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main() -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Local Yandex SpeechKit API v3 stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every request')
+    parser.add_argument(
+        '--processing-ratio',
+        type=float,
+        default=0.1,
+        help='Recognition time as a fraction of audio duration (default: 0.1)'
+    )
+    parser.add_argument('--min-processing', type=float, default=0.5, help='Minimum recognition time, sec')
+    parser.add_argument('--submit-failure-rate', type=float, default=0.0, help='Share of submits answered with 503')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of operations that finish with an error')
+    parser.add_argument('--default-duration', type=float, default=60.0, help='Audio duration when uri has none, sec')
+    parser.add_argument('--seed', type=int, default=42)
+    
+    args = parser.parse_args()
+    
+    server = FakeSpeechKitServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        processing_ratio=args.processing_ratio,
+        min_processing_sec=args.min_processing,
+        submit_failure_rate=args.submit_failure_rate,
+        failure_rate=args.failure_rate,
+        default_duration_sec=args.default_duration,
+        seed=args.seed
+    )
+    print(f"🧪 Fake SpeechKit API: {server.url}")
+    print(f"   export YANDEX_SPEECHKIT_API_BASE_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
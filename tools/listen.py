@@ -2,12 +2,16 @@
 """
 LISTEN: ГОЛОСОВОЙ ИНТЕРФЕЙС ОПЕРАТОРА
 Скрипт слушает папку inbox, транскрибирует голос и сохраняет смыслы.
+
+Новые файлы приходят событиями файловой системы (pip install watchdog),
+недописанные файлы пропускаются до окончания записи, несколько голосовых
+распознаются параллельно, а VOICE_LOG.md пополняется в порядке поступления.
 """
 
 import os
 import sys
-import time
 import shutil
+import asyncio
 from pathlib import Path
 from datetime import datetime
 
@@ -15,17 +19,36 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent))
 
 try:
-    from yandex_speechkit import YandexSpeechKit
+    from yandex_speechkit import YandexSpeechKit, AsyncYandexSpeechKit, TranscriptCache, JobJournal, HTTPX_AVAILABLE
 except ImportError:
     print("❌ Ошибка: Не найден модуль yandex_speechkit.py")
     sys.exit(1)
 
+from transcript_index import TranscriptIndex
+
+# Опциональный импорт watchdog (без него — опрос папки)
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
 # Конфигурация путей
 BASE_DIR = Path(__file__).parent.parent / "olga" / "chelovek-i-remeslo-vsegda-i-seychas" / "recordings"
 INBOX_DIR = BASE_DIR / "inbox"
 AUDIO_DIR = BASE_DIR / "audio"
 LOG_FILE = BASE_DIR / "VOICE_LOG.md"
 
+# Сколько голосовых распознавать одновременно
+WORKERS = 4
+# Файл считается записанным, если размер и mtime не менялись столько секунд
+SETTLE_SEC = 1.0
+# Сколько ждать данных в пустом файле, прежде чем освободить обработчик
+EMPTY_FILE_TIMEOUT_SEC = 30.0
+# Недокачанные файлы (браузеры, rsync, загрузчики) — ждём переименования
+PARTIAL_SUFFIXES = {'.part', '.partial', '.crdownload', '.download', '.tmp'}
+
 def log_to_file(text, filename):
     """Добавляет запись в лог"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -40,8 +63,41 @@ def log_to_file(text, filename):
     with open(LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(entry)
 
-def process_file(file_path):
-    """Обрабатывает один аудиофайл"""
+def create_client():
+    """
+    Один клиент на всё время работы: соединения с API SpeechKit
+    переиспользуются между файлами и опросами статуса; транскрипты
+    сохраняются в общее хранилище (telegram-bot/data/transcripts.sqlite3),
+    отправленные операции — в журнал заданий (переживают перезапуск)
+    """
+    options = dict(transcript_cache=TranscriptCache(), job_journal=JobJournal())
+    if HTTPX_AVAILABLE:
+        return AsyncYandexSpeechKit(**options)
+    return YandexSpeechKit(**options)
+
+async def resume_interrupted(stt, index):
+    """Дописывает в лог и индекс голосовые, распознавание которых прервал прошлый запуск"""
+    def on_result(file_path, result):
+        if 'error' in result:
+            log_to_file(f"ERROR: {result['error']}", file_path.name)
+            return
+        index.add(file_path, result)
+        text = result.get('normalized_text') or result.get('text', '')
+        if text:
+            log_to_file(text, file_path.name)
+    
+    if isinstance(stt, AsyncYandexSpeechKit):
+        await stt.resume_jobs(on_result)
+    else:
+        await asyncio.to_thread(stt.resume_jobs, on_result)
+
+async def process_file(file_path, stt, index):
+    """
+    Обрабатывает один аудиофайл (транскрипт попадает и в поисковый индекс)
+    
+    Returns:
+        (имя в архиве, текст для лога): текст пустой, если речь не распознана
+    """
     print(f"\n🎤 Обнаружен голос: {file_path.name}")
     
     # 1. Перемещение в архив (Ingest)
@@ -54,57 +110,210 @@ def process_file(file_path):
     print(f"📦 Сохранен в архив: {new_filename}")
     
     # 2. Транскрипция
-    print("🧠 Распознаю смысл...")
+    print(f"🧠 Распознаю смысл: {new_filename}")
     try:
-        stt = YandexSpeechKit()
         # Используем general:rc для лучшего качества
-        result = stt.transcribe(
+        options = dict(
             file_path=dest_path,
             model="general:rc",
             literature_text=True,
             cleanup_after=True
         )
+        if isinstance(stt, AsyncYandexSpeechKit):
+            result = await stt.transcribe(**options)
+        else:
+            result = await asyncio.to_thread(stt.transcribe, **options)
+        await asyncio.to_thread(index.add, dest_path, result)
         
         text = result.get('normalized_text') or result.get('text', '')
         
         if text:
-            print(f"\n💬 СМЫСЛ:\n{text}\n")
-            log_to_file(text, new_filename)
-            print(f"✅ Записано в {LOG_FILE.name}")
+            print(f"\n💬 СМЫСЛ ({new_filename}):\n{text}\n")
         else:
-            print("⚠️  Текст не распознан (тишина?)")
+            print(f"⚠️  Текст не распознан (тишина?): {new_filename}")
+        return new_filename, text
             
     except Exception as e:
         print(f"❌ Ошибка распознавания: {e}")
-        log_to_file(f"ERROR: {e}", new_filename)
+        return new_filename, f"ERROR: {e}"
+
+def is_voice_candidate(file_path):
+    """
+    Файл в inbox, который стоит ждать: не скрытый, не временный файл загрузки
+    и не пустой (когда в него начнут писать, придёт событие или следующий опрос)
+    """
+    if (
+        file_path.parent != INBOX_DIR
+        or file_path.name.startswith('.')
+        or file_path.suffix.lower() in PARTIAL_SUFFIXES
+    ):
+        return False
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return False
+    return file_path.is_file() and stat.st_size > 0
+
+async def wait_until_written(file_path):
+    """
+    Ждёт, пока файл перестанет расти (копирование или загрузка завершены)
+    
+    Returns:
+        False, если файл исчез (переименован или удалён) до завершения записи
+        или остаётся пустым дольше EMPTY_FILE_TIMEOUT_SEC
+    """
+    previous = None
+    empty_sec = 0.0
+    while True:
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return False
+        current = (stat.st_size, stat.st_mtime_ns)
+        if current == previous:
+            if stat.st_size > 0:
+                return True
+            empty_sec += SETTLE_SEC
+            if empty_sec >= EMPTY_FILE_TIMEOUT_SEC:
+                print(f"⚠️  {file_path.name}: файл пустой, пропускаю")
+                return False
+        previous = current
+        await asyncio.sleep(SETTLE_SEC)
+
+class ArrivalLog:
+    """
+    Записывает результаты в VOICE_LOG.md в порядке поступления файлов
+    
+    Распознавание идёт параллельно и завершается в любом порядке: готовый
+    результат ждёт, пока запишутся все поступившие раньше него.
+    """
+    
+    def __init__(self):
+        self._next_seq = 0
+        self._next_to_write = 0
+        self._ready = {}
+    
+    def register(self):
+        """Порядковый номер нового файла"""
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+    
+    def complete(self, seq, entry):
+        """Результат файла seq: (имя, текст) или None, если писать нечего"""
+        self._ready[seq] = entry
+        while self._next_to_write in self._ready:
+            entry = self._ready.pop(self._next_to_write)
+            self._next_to_write += 1
+            if entry is not None and entry[1]:
+                log_to_file(entry[1], entry[0])
+                print(f"✅ Записано в {LOG_FILE.name}: {entry[0]}")
 
-def listen_loop():
-    """Бесконечный цикл прослушивания"""
+if WATCHDOG_AVAILABLE:
+    class InboxHandler(FileSystemEventHandler):
+        """Передаёт новые файлы inbox в event loop (события приходят из потока observer)"""
+        
+        def __init__(self, loop, enqueue):
+            self.loop = loop
+            self.enqueue = enqueue
+        
+        def _submit(self, path):
+            self.loop.call_soon_threadsafe(self.enqueue, Path(path))
+        
+        def on_created(self, event):
+            if not event.is_directory:
+                self._submit(event.src_path)
+        
+        def on_moved(self, event):
+            # Загрузчики пишут во временный файл и переименовывают его в конце
+            if not event.is_directory:
+                self._submit(event.dest_path)
+        
+        def on_modified(self, event):
+            if not event.is_directory:
+                self._submit(event.src_path)
+
+async def worker(queue, stt, index, arrivals, queued):
+    """Берёт файлы из очереди: ждёт окончания записи, архивирует и распознаёт"""
+    while True:
+        seq, file_path = await queue.get()
+        entry = None
+        try:
+            if await wait_until_written(file_path):
+                entry = await process_file(file_path, stt, index)
+        except Exception as e:
+            print(f"❌ {file_path.name}: {e}")
+        finally:
+            queued.discard(file_path)
+            arrivals.complete(seq, entry)
+            queue.task_done()
+
+async def listen_loop():
+    """
+    Бесконечное прослушивание inbox
+    
+    Новые файлы приходят событиями файловой системы (watchdog: inotify /
+    FSEvents); без watchdog — опрос папки раз в 2 секунды. Одновременно
+    распознаётся до WORKERS файлов одним клиентом SpeechKit.
+    """
     print(f"👂 Слушаю папку: {INBOX_DIR}")
     print("   (Нажмите Ctrl+C для остановки)")
     
     # Создаем inbox если нет
     INBOX_DIR.mkdir(parents=True, exist_ok=True)
     
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    arrivals = ArrivalLog()
+    # Файлы в очереди или в работе (одно событие на файл)
+    queued = set()
+    
+    def enqueue(file_path):
+        if file_path in queued or not is_voice_candidate(file_path):
+            return
+        queued.add(file_path)
+        queue.put_nowait((arrivals.register(), file_path))
+    
+    def scan():
+        # Старые первыми
+        files = [f for f in INBOX_DIR.iterdir() if is_voice_candidate(f)]
+        for file_path in sorted(files, key=lambda f: f.stat().st_mtime):
+            enqueue(file_path)
+    
+    stt = create_client()
+    index = TranscriptIndex()
+    observer = None
+    workers = []
     try:
+        await resume_interrupted(stt, index)
+        
+        if WATCHDOG_AVAILABLE:
+            observer = Observer()
+            observer.schedule(InboxHandler(loop, enqueue), str(INBOX_DIR), recursive=False)
+            observer.start()
+        else:
+            print("⚠️  watchdog не установлен: опрос папки каждые 2 с (pip install watchdog)")
+        
+        # Файлы, пришедшие до запуска
+        scan()
+        
+        workers = [asyncio.create_task(worker(queue, stt, index, arrivals, queued)) for _ in range(WORKERS)]
+        
         while True:
-            # Сканируем файлы
-            files = [f for f in INBOX_DIR.iterdir() if f.is_file() and f.name != '.DS_Store']
-            
-            # Сортируем по времени создания (старые первыми)
-            files.sort(key=lambda f: f.stat().st_mtime)
-            
-            for file_path in files:
-                # Игнорируем временные файлы
-                if file_path.name.startswith('.'):
-                    continue
-                    
-                process_file(file_path)
-            
-            time.sleep(2)
-            
-    except KeyboardInterrupt:
-        print("\n🛑 Прослушивание остановлено.")
+            await asyncio.sleep(2)
+            if observer is None:
+                scan()
+    finally:
+        for task in workers:
+            task.cancel()
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        if isinstance(stt, AsyncYandexSpeechKit):
+            await stt.aclose()
 
 if __name__ == "__main__":
-    listen_loop()
+    try:
+        asyncio.run(listen_loop())
+    except KeyboardInterrupt:
+        print("\n🛑 Прослушивание остановлено.")
@@ -12,7 +12,10 @@ from datetime import datetime
 DELA_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(DELA_ROOT / "telegram-bot" / "tools"))
 
-from yandex_speechkit import YandexSpeechKit
+from yandex_speechkit import YandexSpeechKit, TranscriptCache, JobJournal
+
+sys.path.insert(0, str(Path(__file__).parent))
+from transcript_index import TranscriptIndex
 
 def main():
     project_dir = DELA_ROOT / "Ольга" / "Дизайн-путешествия" / "PARIS-2026"
@@ -26,51 +29,59 @@ def main():
     print(f"🎤 Движок: Yandex SpeechKit API v3 (general:rc - максимальная точность)")
     print()
     
-    client = YandexSpeechKit()
+    # Неизменившиеся видео берутся из кэша: без загрузки и повторной оплаты;
+    # при новых параметрах распознавания видео уже в bucket не загружается заново
+    client = YandexSpeechKit(
+        transcript_cache=TranscriptCache(),
+        job_journal=JobJournal(),
+        content_addressed=True
+    )
+    
+    # Операции прерванного запуска дожидаемся: их результаты попадут в кэш
+    client.resume_jobs()
+    
+    # Все видео отправляются сразу: пакет длится примерно как самое долгое видео
+    transcripts = client.transcribe_many(
+        videos,
+        language="ru-RU",
+        model="general:rc",
+        literature_text=True,
+        word_timestamps=True,
+        cleanup_after=True,
+        max_uploads=4
+    )
+    print()
     
     results = []
     total_chars = 0
     total_words = 0
+    # Поиск по фразам с точностью до слова: transcript_index.py search "..."
+    index = TranscriptIndex()
     
-    for i, video in enumerate(videos, 1):
-        print(f"[{i}/{len(videos)}] {video.name}")
-        
-        try:
-            result = client.transcribe(
-                file_path=video,
-                language="ru-RU",
-                model="general:rc",
-                literature_text=True,
-                word_timestamps=True,
-                cleanup_after=True
-            )
-            
-            text = result.get('normalized_text') or result.get('text', '')
-            words_count = len(result.get('words', []))
-            chars_count = len(text)
-            
-            results.append({
-                'filename': video.name,
-                'text': text,
-                'chars': chars_count,
-                'words': words_count
-            })
-            
-            total_chars += chars_count
-            total_words += words_count
-            
-            print(f"   ✅ {chars_count} символов, {words_count} слов")
-            
-        except Exception as e:
-            print(f"   ❌ Ошибка: {e}")
+    for video, result in transcripts.items():
+        if 'error' in result:
             results.append({
                 'filename': video.name,
                 'text': '',
                 'chars': 0,
                 'words': 0
             })
+            continue
+        
+        index.add(video, result)
+        text = result.get('normalized_text') or result.get('text', '')
+        words_count = len(result.get('words', []))
+        chars_count = len(text)
+        
+        results.append({
+            'filename': video.name,
+            'text': text,
+            'chars': chars_count,
+            'words': words_count
+        })
         
-        print()
+        total_chars += chars_count
+        total_words += words_count
     
     # Формируем markdown
     content = f"""# ТРАНСКРИПТЫ ВСЕХ ВИДЕО ОТ БОТА
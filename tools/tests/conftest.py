@@ -0,0 +1,11 @@
+"""
+Тесты модулей tools/ (запуск: python -m pytest tools/tests)
+
+Модули tools/ — самостоятельные скрипты, а не пакет: импортируются
+по имени, как в benchmark_*.py.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
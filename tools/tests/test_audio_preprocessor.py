@@ -0,0 +1,223 @@
+"""Тесты чистых функций audio_preprocessor (без ffmpeg)"""
+
+import pytest
+
+from audio_preprocessor import (
+    AudioMetrics,
+    parse_audio_analysis,
+    parse_ffmpeg_stderr,
+    plan_silence_splits
+)
+
+
+def windows(segments):
+    """Окна сегментов [граница, следующая граница) в абсолютном времени"""
+    return [
+        (start + overlap, start + duration - overlap_end)
+        for start, duration, overlap, overlap_end in segments
+    ]
+
+
+def test_plan_silence_splits_short_recording_is_one_segment():
+    assert plan_silence_splits(100.0, [], segment_sec=300, overlap_sec=5) == [(0.0, 100.0, 0.0, 0.0)]
+
+
+def test_plan_silence_splits_cuts_in_nearest_pause():
+    speech = [(0, 290000), (296000, 600000), (610000, 700000)]
+    segments = plan_silence_splits(700.0, speech, segment_sec=300, overlap_sec=2, search_sec=75)
+    
+    # Паузы с серединами 293 и 605 с — в окне ±75 с от номинальных 300 и 593
+    assert windows(segments) == [(0.0, 293.0), (293.0, 605.0), (605.0, 700.0)]
+    assert segments == [
+        (0.0, 295.0, 0.0, 2.0),
+        (291.0, 316.0, 2.0, 2.0),
+        (603.0, 97.0, 2.0, 0.0)
+    ]
+
+
+def test_plan_silence_splits_without_pauses_cuts_at_nominal_boundaries():
+    segments = plan_silence_splits(1000.0, [(0, 1000000)], segment_sec=300, overlap_sec=0)
+    assert windows(segments) == [(0.0, 300.0), (300.0, 600.0), (600.0, 900.0), (900.0, 1000.0)]
+
+
+def test_plan_silence_splits_ignores_pauses_outside_search_window():
+    speech = [(0, 100000), (110000, 1000000)]
+    segments = plan_silence_splits(1000.0, speech, segment_sec=300, overlap_sec=0, search_sec=30)
+    assert windows(segments)[0] == (0.0, 300.0)
+
+
+def test_plan_silence_splits_windows_cover_recording_without_gaps():
+    speech = [(start, start + 7000) for start in range(0, 3600000, 9000)]
+    segments = plan_silence_splits(3600.0, speech, segment_sec=240, overlap_sec=3)
+    bounds = windows(segments)
+    
+    assert bounds[0][0] == 0.0
+    assert bounds[-1][1] == 3600.0
+    for (_, end), (next_start, _) in zip(bounds, bounds[1:]):
+        assert end == pytest.approx(next_start)
+    for start, duration, _, _ in segments:
+        assert start >= 0.0 and start + duration <= 3600.0
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'segment_sec': 0, 'overlap_sec': 0},
+    {'segment_sec': 60, 'overlap_sec': 60},
+    {'segment_sec': 60, 'overlap_sec': -1},
+    {'segment_sec': 60, 'overlap_sec': 1, 'search_sec': 60}
+])
+def test_plan_silence_splits_rejects_invalid_parameters(kwargs):
+    with pytest.raises(ValueError):
+        plan_silence_splits(600.0, [], **kwargs)
+
+
+# Захваченный stderr ffmpeg 6: вход, схема потоков, выход, прогресс через \r
+FFMPEG_STDERR = (
+    "ffmpeg version 6.1.1 Copyright (c) 2000-2023 the FFmpeg developers\n"
+    "  built with gcc 13 (Ubuntu 13.2.0-23ubuntu3)\n"
+    "Input #0, mp3, from 'voice.mp3':\n"
+    "  Metadata:\n"
+    "    encoder         : Lavf60.16.100\n"
+    "  Duration: 00:01:30.05, start: 0.025057, bitrate: 128 kb/s\n"
+    "  Stream #0:0: Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s\n"
+    "Stream mapping:\n"
+    "  Stream #0:0 (mp3float) -> highpass:default\n"
+    "  aresample:default -> Stream #0:0 (libmp3lame)\n"
+    "Press [q] to stop, [?] for help\n"
+    "Output #0, mp3, to 'voice_preprocessed.mp3':\n"
+    "  Metadata:\n"
+    "    TSSE            : Lavf60.16.100\n"
+    "  Stream #0:0: Audio: mp3, 16000 Hz, mono, fltp, 64 kb/s\n"
+    "    Metadata:\n"
+    "      encoder         : Lavc60.31.102 libmp3lame\n"
+    "size=     256kB time=00:00:32.00 bitrate=  65.5kbits/s speed=64.0x    \r"
+    "size=     704kB time=00:01:30.02 bitrate=  64.1kbits/s speed=95.3x    \n"
+    "[out#0/mp3 @ 0x5581f0a0] video:0kB audio:704kB subtitle:0kB other streams:0kB\n"
+)
+
+
+def test_parse_ffmpeg_stderr_reads_input_and_output_metrics():
+    original, processed = parse_ffmpeg_stderr(FFMPEG_STDERR)
+    
+    assert original == AudioMetrics(duration_sec=90.05, sample_rate=44100, channels=2, bitrate=128000, codec='mp3')
+    # Длительность и битрейт выхода — из последней строки прогресса
+    assert processed == AudioMetrics(duration_sec=90.02, sample_rate=16000, channels=1, bitrate=64100, codec='mp3')
+
+
+def test_parse_ffmpeg_stderr_takes_first_audio_stream_of_first_input():
+    stderr = (
+        "Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'event.mp4':\n"
+        "  Duration: 01:02:03.50, start: 0.000000, bitrate: 2500 kb/s\n"
+        "  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p, 1920x1080, 2100 kb/s\n"
+        "  Stream #0:1[0x2](eng): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, 5.1, fltp, 384 kb/s (default)\n"
+        "  Stream #0:2[0x3](rus): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, stereo, fltp, 128 kb/s\n"
+        "Input #1, wav, from 'other.wav':\n"
+        "  Duration: 00:00:01.00, bitrate: 256 kb/s\n"
+        "  Stream #1:0: Audio: pcm_s16le ([1][0][0][0] / 0x0001), 16000 Hz, mono, s16, 256 kb/s\n"
+    )
+    original, processed = parse_ffmpeg_stderr(stderr)
+    
+    assert original == AudioMetrics(duration_sec=3723.5, sample_rate=48000, channels=6, bitrate=2500000, codec='aac')
+    assert processed is None
+
+
+def test_parse_ffmpeg_stderr_counts_numbered_channel_layout():
+    stderr = FFMPEG_STDERR.replace(
+        "Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s",
+        "Audio: pcm_s24le ([1][0][0][0] / 0x0001), 48000 Hz, 10 channels, s32 (24 bit), 11520 kb/s"
+    )
+    original, _ = parse_ffmpeg_stderr(stderr)
+    assert (original.codec, original.channels) == ('pcm_s24le', 10)
+
+
+def test_parse_ffmpeg_stderr_without_output_stream_has_no_processed_metrics():
+    # Запуск упал до открытия выхода: секции Output и прогресса нет
+    stderr = FFMPEG_STDERR.split("Output #0")[0]
+    original, processed = parse_ffmpeg_stderr(stderr)
+    
+    assert original is not None
+    assert processed is None
+
+
+def test_parse_ffmpeg_stderr_without_progress_has_no_processed_metrics():
+    stderr = '\n'.join(line for line in FFMPEG_STDERR.replace('\r', '\n').splitlines() if not line.startswith('size='))
+    assert parse_ffmpeg_stderr(stderr)[1] is None
+
+
+def test_parse_ffmpeg_stderr_without_input_duration_has_no_original_metrics():
+    # Вход из pipe: длительность неизвестна
+    stderr = FFMPEG_STDERR.replace(
+        "Duration: 00:01:30.05, start: 0.025057, bitrate: 128 kb/s",
+        "Duration: N/A, start: 0.000000, bitrate: N/A"
+    )
+    original, processed = parse_ffmpeg_stderr(stderr)
+    
+    assert original is None
+    assert processed is not None and processed.duration_sec == 90.02
+
+
+def test_parse_ffmpeg_stderr_without_input_stream_has_no_original_metrics():
+    stderr = FFMPEG_STDERR.replace("  Stream #0:0: Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s\n", "", 1)
+    original, processed = parse_ffmpeg_stderr(stderr)
+    
+    assert original is None
+    assert processed.sample_rate == 16000
+
+
+@pytest.mark.parametrize('stderr', ['', 'ffmpeg version 6.1.1\nvoice.mp3: No such file or directory\n'])
+def test_parse_ffmpeg_stderr_without_sections_returns_nothing(stderr):
+    assert parse_ffmpeg_stderr(stderr) == (None, None)
+
+
+ASTATS_STDERR = (
+    "Input #0, wav, from 'voice.wav':\n"
+    "  Duration: 00:00:30.00, bitrate: 1411 kb/s\n"
+    "  Stream #0:0: Audio: pcm_s16le ([1][0][0][0] / 0x0001), 44100 Hz, stereo, s16, 1411 kb/s\n"
+    "[Parsed_ametadata_2 @ 0x55d0] frame:0    pts:0       pts_time:0\n"
+    "[Parsed_ametadata_2 @ 0x55d0] lavfi.aspectralstats.1.rolloff=3000.000000\n"
+    "[Parsed_ametadata_2 @ 0x55d0] lavfi.aspectralstats.1.rolloff=5000.000000\n"
+    "[Parsed_astats_0 @ 0x55c0] Channel: 1\n"
+    "[Parsed_astats_0 @ 0x55c0] RMS level dB: -40.000000\n"
+    "[Parsed_astats_0 @ 0x55c0] Noise floor dB: -90.000000\n"
+    "[Parsed_astats_0 @ 0x55c0] Overall\n"
+    "[Parsed_astats_0 @ 0x55c0] DC offset: 0.000010\n"
+    "[Parsed_astats_0 @ 0x55c0] Peak level dB: -3.200000\n"
+    "[Parsed_astats_0 @ 0x55c0] RMS level dB: -24.500000\n"
+    "[Parsed_astats_0 @ 0x55c0] Noise floor dB: -62.000000\n"
+    "[Parsed_astats_0 @ 0x55c0] Number of samples: 1323000\n"
+)
+
+
+def test_parse_audio_analysis_reads_overall_section():
+    analysis = parse_audio_analysis(ASTATS_STDERR, sample_sec=30.0)
+    
+    # Значения по каналу 1 (до Overall) не используются
+    assert analysis.rms_level_db == -24.5
+    assert analysis.noise_floor_db == -62.0
+    assert analysis.peak_level_db == -3.2
+    assert analysis.snr_db == pytest.approx(37.5)
+    assert analysis.spectral_rolloff_hz == 4000.0
+    assert analysis.channels == 2
+
+
+def test_parse_audio_analysis_clamps_digital_silence():
+    stderr = ASTATS_STDERR.replace("Noise floor dB: -62.000000", "Noise floor dB: -inf")
+    stderr = stderr.replace("RMS level dB: -24.500000", "RMS level dB: -inf")
+    analysis = parse_audio_analysis(stderr, sample_sec=30.0)
+    assert (analysis.rms_level_db, analysis.noise_floor_db) == (-120.0, -120.0)
+
+
+def test_parse_audio_analysis_without_input_or_rolloff():
+    stderr = '\n'.join(
+        line for line in ASTATS_STDERR.splitlines()
+        if 'astats' in line
+    )
+    analysis = parse_audio_analysis(stderr, sample_sec=30.0)
+    
+    assert analysis.channels == 0
+    assert analysis.spectral_rolloff_hz is None
+
+
+def test_parse_audio_analysis_without_overall_section_returns_none():
+    stderr = ASTATS_STDERR.split("[Parsed_astats_0 @ 0x55c0] Overall")[0]
+    assert parse_audio_analysis(stderr, sample_sec=30.0) is None
+    assert parse_audio_analysis(FFMPEG_STDERR, sample_sec=30.0) is None
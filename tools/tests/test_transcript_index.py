@@ -0,0 +1,145 @@
+"""Тесты индекса транскриптов по словам (transcript_index)"""
+
+import pytest
+
+from transcript_index import TranscriptIndex, normalize_tokens, parse_time_ms
+
+
+def word(text, start_ms, end_ms):
+    return {'text': text, 'startTimeMs': str(start_ms), 'endTimeMs': str(end_ms)}
+
+
+def utterance(words, normalized_text=None, speaker=None):
+    return {
+        'channel': '0',
+        'start_ms': int(words[0]['startTimeMs']),
+        'end_ms': int(words[-1]['endTimeMs']),
+        'text': ' '.join(w['text'] for w in words),
+        'normalized_text': normalized_text,
+        'words': words,
+        'speaker': speaker
+    }
+
+
+def result(*utterances):
+    return {'utterances': list(utterances)}
+
+
+LECTURE = result(
+    utterance(
+        [word('Ремесло', 1000, 1600), word('и', 1600, 1700), word('дизайн', 1700, 2300), word('ещё', 2300, 2600)],
+        normalized_text='Ремесло и дизайн ещё.'
+    ),
+    utterance([word('опоздали', 60000, 60800), word('из-за', 60800, 61200), word('дождя', 61200, 61800)])
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return TranscriptIndex(tmp_path / 'index.sqlite3')
+
+
+def test_add_same_result_again_is_skipped(index):
+    assert index.add('lecture.mp4', LECTURE) is True
+    assert index.add('lecture.mp4', LECTURE) is False
+    assert index.stats() == {'recordings': 1, 'utterances': 2, 'words': 7}
+
+
+def test_add_changed_result_replaces_rows(index):
+    index.add('lecture.mp4', LECTURE)
+    changed = result(utterance([word('совсем', 500, 900), word('другое', 900, 1400)]))
+    
+    assert index.add('lecture.mp4', changed) is True
+    assert index.stats() == {'recordings': 1, 'utterances': 1, 'words': 2}
+    assert index.search('ремесло') == []
+    assert [hit['text'] for hit in index.search('другое')] == ['совсем другое']
+
+
+def test_add_path_uses_file_name(index, tmp_path):
+    index.add(tmp_path / 'voice.ogg', LECTURE)
+    [hit] = index.search('дизайн')
+    assert hit['recording'] == 'voice.ogg'
+    assert hit['path'] == str(tmp_path / 'voice.ogg')
+
+
+@pytest.mark.parametrize('phrase', ['ремесло и дизайн', 'РЕМЕСЛО, И ДИЗАЙН!', 'дизайн еще', 'Дизайн ЕЩЁ'])
+def test_search_ignores_case_yo_and_punctuation(index, phrase):
+    index.add('lecture.mp4', LECTURE)
+    [hit] = index.search(phrase)
+    
+    assert hit['recording'] == 'lecture.mp4'
+    # В выдаче — нормализованный текст фразы
+    assert hit['text'] == 'Ремесло и дизайн ещё.'
+
+
+def test_search_requires_words_in_a_row(index):
+    index.add('lecture.mp4', LECTURE)
+    assert index.search('ремесло дизайн') == []
+    assert index.search('...') == []
+
+
+def test_search_match_times_come_from_words(index):
+    index.add('lecture.mp4', LECTURE)
+    [hit] = index.search('и дизайн')
+    
+    assert (hit['start_ms'], hit['end_ms']) == (1000, 2600)
+    assert (hit['match_start_ms'], hit['match_end_ms']) == (1600, 2300)
+
+
+def test_search_matches_word_split_into_several_tokens(index):
+    index.add('lecture.mp4', LECTURE)
+    
+    [hit] = index.search('из-за дождя')
+    assert (hit['match_start_ms'], hit['match_end_ms']) == (60800, 61800)
+    # Часть слова-составного тоже находится: время — всего слова
+    [hit] = index.search('за дождя')
+    assert (hit['match_start_ms'], hit['match_end_ms']) == (60800, 61800)
+
+
+def test_search_filters_by_recording_and_time(index):
+    index.add('lecture.mp4', LECTURE)
+    index.add('voice.ogg', result(utterance([word('ремесло', 5000, 5500), word('и', 5500, 5600), word('дизайн', 5600, 6000)])))
+    
+    assert [hit['recording'] for hit in index.search('ремесло и дизайн')] == ['lecture.mp4', 'voice.ogg']
+    assert [hit['recording'] for hit in index.search('ремесло и дизайн', recording='voice.ogg')] == ['voice.ogg']
+    # Фраза попадает, если пересекает интервал [start_ms, end_ms]
+    assert [hit['recording'] for hit in index.search('ремесло и дизайн', start_ms=3000)] == ['voice.ogg']
+    assert [hit['recording'] for hit in index.search('ремесло и дизайн', end_ms=4000)] == ['lecture.mp4']
+    assert index.search('ремесло и дизайн', start_ms=3000, end_ms=4000) == []
+    assert len(index.search('ремесло', limit=1)) == 1
+
+
+def test_excerpt_returns_words_starting_inside_range(index):
+    index.add('lecture.mp4', LECTURE)
+    
+    assert [w['word'] for w in index.excerpt('lecture.mp4', 1600, 2300)] == ['и', 'дизайн']
+    assert index.excerpt('lecture.mp4', 60000, 61000) == [
+        {'word': 'опоздали', 'start_ms': 60000, 'end_ms': 60800},
+        {'word': 'из-за', 'start_ms': 60800, 'end_ms': 61200}
+    ]
+    assert index.excerpt('other.mp4', 0, 100000) == []
+
+
+def test_remove_deletes_recording(index):
+    index.add('lecture.mp4', LECTURE)
+    
+    assert index.remove('lecture.mp4') is True
+    assert index.remove('lecture.mp4') is False
+    assert index.stats() == {'recordings': 0, 'utterances': 0, 'words': 0}
+    assert index.search('дизайн') == []
+
+
+def test_add_result_without_utterance_index(index):
+    # Старый формат результата: только text и words
+    legacy = {'text': 'старый формат', 'words': [word('старый', 100, 500), word('формат', 500, 900)]}
+    index.add('old.mp3', legacy)
+    
+    [hit] = index.search('старый формат')
+    assert (hit['match_start_ms'], hit['match_end_ms']) == (100, 900)
+
+
+def test_normalize_tokens_and_parse_time():
+    assert normalize_tokens('Ёлка, из-за ЕЩЁ!') == ['елка', 'из', 'за', 'еще']
+    assert parse_time_ms('01:02:03.5') == 3723500
+    assert parse_time_ms('1:30') == 90000
+    assert parse_time_ms('2.25') == 2250
@@ -0,0 +1,370 @@
+"""Тесты разбора и склейки результатов распознавания yandex_speechkit"""
+
+import io
+import os
+import json
+
+import pytest
+import requests
+
+import yandex_object_storage
+from fake_object_storage import FakeObjectStorageServer
+from fake_speechkit_server import FakeSpeechKitServer
+from yandex_object_storage import YandexObjectStorage
+from yandex_speechkit import (
+    FixedIntervalPolling,
+    JobJournal,
+    RecognitionResultParser,
+    UploadError,
+    YandexSpeechKit,
+    build_cues,
+    format_timestamp,
+    merge_split_results,
+    speaker_view,
+    write_subtitles
+)
+
+
+def word(text, start_ms, end_ms):
+    return {'text': text, 'startTimeMs': str(start_ms), 'endTimeMs': str(end_ms)}
+
+
+def utterance(words, text=None, normalized_text=None, speaker=None):
+    """Фраза индекса, как у RecognitionResultParser (время — по словам)"""
+    return {
+        'channel': '0',
+        'start_ms': int(words[0]['startTimeMs']) if words else 0,
+        'end_ms': int(words[-1]['endTimeMs']) if words else 0,
+        'text': text if text is not None else ' '.join(w['text'] for w in words),
+        'normalized_text': normalized_text,
+        'words': words,
+        'speaker': speaker
+    }
+
+
+def test_merge_split_results_shifts_timestamps_to_absolute():
+    merged = merge_split_results([
+        (0, 0, 10000, {'utterances': [utterance([word('раз', 1000, 1500)])]}),
+        (8000, 10000, 20000, {'utterances': [utterance([word('два', 4000, 4600)])]})
+    ])
+    
+    assert merged['text'] == 'раз два'
+    assert [(u['start_ms'], u['end_ms']) for u in merged['utterances']] == [(1000, 1500), (12000, 12600)]
+    assert merged['words'][1] == word('два', 12000, 12600)
+
+
+def test_merge_split_results_keeps_overlapping_word_once():
+    # Слово 9500–10300 мс (середина 9900) распознано в обоих сегментах
+    first = utterance([word('начало', 9000, 9400), word('стык', 9500, 10300)])
+    second = utterance([word('стык', 1500, 2300), word('конец', 2400, 3000)])
+    merged = merge_split_results([
+        (0, 0, 10000, {'utterances': [first]}),
+        (8000, 10000, 20000, {'utterances': [second]})
+    ])
+    
+    assert [w['text'] for w in merged['words']] == ['начало', 'стык', 'конец']
+    assert merged['text'] == 'начало стык конец'
+
+
+def test_merge_split_results_rebuilds_partially_kept_utterance():
+    second = utterance(
+        [word('стык', 1500, 2300), word('конец', 2400, 3000)],
+        text='Стык, конец.',
+        normalized_text='Стык, конец.'
+    )
+    merged = merge_split_results([(8000, 10000, 20000, {'utterances': [second]})])
+    
+    [kept] = merged['utterances']
+    assert kept['text'] == 'конец'
+    assert kept['normalized_text'] is None
+    assert (kept['start_ms'], kept['end_ms']) == (10400, 11000)
+    assert merged['normalized_text'] == ''
+
+
+def test_merge_split_results_drops_utterance_outside_window():
+    merged = merge_split_results([
+        (8000, 10000, 20000, {'utterances': [utterance([word('чужое', 0, 900)])]})
+    ])
+    assert merged['utterances'] == []
+    assert merged['text'] == ''
+
+
+def test_merge_split_results_keeps_wordless_utterance_by_middle():
+    # Во втором сегменте та же фраза: 500–1500 мс, то есть 8500–9500 абсолютных
+    in_first = {**utterance([], text='без слов'), 'start_ms': 8500, 'end_ms': 9500}
+    in_second = {**in_first, 'start_ms': 500, 'end_ms': 1500}
+    merged = merge_split_results([
+        (0, 0, 10000, {'utterances': [in_first]}),
+        (8000, 10000, 20000, {'utterances': [in_second]})
+    ])
+    
+    assert [(u['start_ms'], u['end_ms']) for u in merged['utterances']] == [(8500, 9500)]
+    assert merged['text'] == 'без слов'
+
+
+def timed(*texts, start_ms=0, step_ms=400):
+    """Слова подряд без пауз: каждое по step_ms"""
+    return [word(text, start_ms + i * step_ms, start_ms + (i + 1) * step_ms) for i, text in enumerate(texts)]
+
+
+def cue_lines(cues):
+    return [cue['lines'] for cue in cues]
+
+
+def test_build_cues_ends_cue_at_sentence_end():
+    cues = list(build_cues([utterance(timed('Привет.', 'Как', 'дела?'))]))
+    
+    assert cue_lines(cues) == [['Привет.'], ['Как дела?']]
+    assert [(c['start_ms'], c['end_ms']) for c in cues] == [(0, 400), (400, 1200)]
+
+
+def test_build_cues_ends_cue_on_long_pause():
+    words = [word('до', 0, 300), word('паузы', 300, 600), word('после', 1400, 1800)]
+    cues = list(build_cues([utterance(words)], max_pause_ms=700))
+    assert cue_lines(cues) == [['до паузы'], ['после']]
+
+
+def test_build_cues_ends_cue_at_utterance_boundary():
+    cues = list(build_cues([utterance(timed('первая', 'фраза')), utterance(timed('вторая', start_ms=800))]))
+    assert cue_lines(cues) == [['первая фраза'], ['вторая']]
+
+
+def test_build_cues_wraps_lines_and_starts_new_cue_when_full():
+    cues = list(build_cues(
+        [utterance(timed('один', 'два', 'три', 'четыре', 'пять'))],
+        max_chars_per_line=10,
+        max_lines=2
+    ))
+    
+    assert cue_lines(cues) == [['один два', 'три четыре'], ['пять']]
+    assert cues[1]['start_ms'] == 1600
+    for cue in cues:
+        assert len(cue['lines']) <= 2
+        assert all(len(line) <= 10 for line in cue['lines'])
+
+
+def test_build_cues_limits_cue_duration():
+    cues = list(build_cues([utterance(timed(*'абвгдежзий', step_ms=1000))], max_duration_ms=3000))
+    
+    assert cue_lines(cues)[0] == ['а б в']
+    assert all(c['end_ms'] - c['start_ms'] <= 3000 for c in cues)
+    assert ' '.join(' '.join(c['lines']) for c in cues) == ' '.join('абвгдежзий')
+
+
+def test_build_cues_breaks_line_at_clause_end_when_half_full():
+    words = timed('Сначала', 'так,', 'потом', 'иначе')
+    assert cue_lines(build_cues([utterance(words)], max_chars_per_line=20)) == [['Сначала так,', 'потом иначе']]
+    # Строка заполнена меньше чем наполовину — запятая не переносит
+    assert cue_lines(build_cues([utterance(timed('Да,', 'конечно'))], max_chars_per_line=20)) == [['Да, конечно']]
+
+
+def test_build_cues_uses_text_of_wordless_utterance():
+    wordless = {**utterance([], text='текст без слов'), 'start_ms': 1000, 'end_ms': 2500}
+    empty = {**utterance([], text=''), 'start_ms': 3000, 'end_ms': 3500}
+    
+    assert list(build_cues([wordless, empty])) == [{'start_ms': 1000, 'end_ms': 2500, 'lines': ['текст без слов']}]
+
+
+def test_build_cues_skips_empty_words():
+    words = [word('', 0, 100), word('слово', 100, 500)]
+    assert list(build_cues([utterance(words, text='слово')])) == [{'start_ms': 100, 'end_ms': 500, 'lines': ['слово']}]
+
+
+@pytest.mark.parametrize('ms, separator, expected', [
+    (0, ',', '00:00:00,000'),
+    (3723004, ',', '01:02:03,004'),
+    (3723004, '.', '01:02:03.004'),
+    (360000000, ',', '100:00:00,000')
+])
+def test_format_timestamp(ms, separator, expected):
+    assert format_timestamp(ms, separator) == expected
+
+
+def test_write_subtitles_srt_and_vtt():
+    cues = [
+        {'start_ms': 0, 'end_ms': 1500, 'lines': ['первая', 'строка']},
+        {'start_ms': 2000, 'end_ms': 2500, 'lines': ['']},
+        {'start_ms': 3000, 'end_ms': 4000, 'lines': ['вторая']}
+    ]
+    srt, vtt = io.StringIO(), io.StringIO()
+    
+    assert write_subtitles(cues, srt, 'srt') == 2
+    assert srt.getvalue() == (
+        "1\n00:00:00,000 --> 00:00:01,500\nпервая\nстрока\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\nвторая\n\n"
+    )
+    assert write_subtitles(cues, vtt, 'vtt') == 2
+    assert vtt.getvalue().startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.500\n")
+    
+    with pytest.raises(ValueError):
+        write_subtitles(cues, io.StringIO(), 'ass')
+
+
+def final_line(final_index, words, channel='0', speaker=None, with_times=True):
+    """Строка NDJSON getRecognition с финальным результатом (формат API v3)"""
+    alternative = {'words': words, 'text': ' '.join(w['text'] for w in words)}
+    if with_times:
+        alternative['startTimeMs'] = words[0]['startTimeMs']
+        alternative['endTimeMs'] = words[-1]['endTimeMs']
+    if speaker is not None:
+        alternative['speakerTag'] = speaker
+    return json.dumps({'result': {
+        'channelTag': channel,
+        'audioCursors': {'finalIndex': str(final_index)},
+        'final': {'alternatives': [alternative], 'channelTag': channel}
+    }}, ensure_ascii=False)
+
+
+def refinement_line(final_index, text, channel='0'):
+    refinement = {'normalizedText': {'alternatives': [{'text': text}]}}
+    if final_index is not None:
+        refinement['finalIndex'] = str(final_index)
+    return json.dumps({'result': {'channelTag': channel, 'finalRefinement': refinement}}, ensure_ascii=False)
+
+
+def partial_line(text):
+    return json.dumps({'result': {'channelTag': '0', 'partial': {'alternatives': [{'text': text}]}}}, ensure_ascii=False)
+
+
+def parse(lines, keep_raw=False):
+    parser = RecognitionResultParser(keep_raw=keep_raw)
+    for line in lines:
+        parser.feed(line)
+    return parser.result()
+
+
+def test_parser_keeps_every_final_as_separate_utterance():
+    result = parse([
+        final_line(0, timed('первая', 'фраза')),
+        partial_line('втор'),
+        final_line(1, timed('вторая', start_ms=2000)),
+        final_line(2, timed('третья', start_ms=3000))
+    ])
+    
+    assert [u['text'] for u in result['utterances']] == ['первая фраза', 'вторая', 'третья']
+    assert result['text'] == 'первая фраза вторая третья'
+    assert [w['text'] for w in result['words']] == ['первая', 'фраза', 'вторая', 'третья']
+    assert [(u['start_ms'], u['end_ms']) for u in result['utterances']] == [(0, 800), (2000, 2400), (3000, 3400)]
+
+
+def test_parser_attaches_refinement_by_channel_and_final_index():
+    result = parse([
+        final_line(0, timed('левый'), channel='0'),
+        final_line(0, timed('правый', start_ms=500), channel='1'),
+        final_line(1, timed('ещё', 'левый', start_ms=1000), channel='0'),
+        refinement_line(0, 'Правый.', channel='1'),
+        refinement_line(0, 'Левый.', channel='0')
+    ])
+    
+    assert [u['normalized_text'] for u in result['utterances']] == ['Левый.', 'Правый.', None]
+    # Фраза без уточнения входит в нормализованный текст исходным
+    assert result['normalized_text'] == 'Левый. Правый. ещё левый'
+
+
+def test_parser_refinement_without_final_index_goes_to_last_utterance():
+    result = parse([final_line(0, timed('раз')), final_line(1, timed('два', start_ms=500)), refinement_line(None, 'Два.')])
+    assert [u['normalized_text'] for u in result['utterances']] == [None, 'Два.']
+
+
+def test_parser_without_refinements_has_empty_normalized_text():
+    assert parse([final_line(0, timed('слово'))])['normalized_text'] == ''
+
+
+def test_parser_takes_times_from_words_when_alternative_has_none():
+    result = parse([final_line(0, timed('а', 'б', start_ms=1000), with_times=False)])
+    assert (result['utterances'][0]['start_ms'], result['utterances'][0]['end_ms']) == (1000, 1800)
+
+
+def test_parser_skips_empty_lines_and_accepts_bytes():
+    parser = RecognitionResultParser()
+    
+    assert parser.feed('') is None
+    assert parser.feed(b'  \n') is None
+    assert parser.feed(partial_line('про')) is None
+    assert parser.feed(json.dumps({'result': {'final': {'alternatives': []}}})) is None
+    utterance = parser.feed(final_line(0, timed('привет')).encode('utf-8'))
+    
+    assert utterance['text'] == 'привет'
+    assert parser.result()['utterances'] == [utterance]
+
+
+def test_parser_iter_utterances_yields_finals_only():
+    lines = [partial_line('при'), final_line(0, timed('привет')), refinement_line(0, 'Привет.'), final_line(1, timed('мир'))]
+    assert [u['text'] for u in RecognitionResultParser().iter_utterances(lines)] == ['привет', 'мир']
+
+
+def test_parser_collects_speakers():
+    result = parse([
+        final_line(0, timed('вопрос'), speaker='1'),
+        final_line(1, timed('ответ', start_ms=500), speaker='2'),
+        final_line(2, timed('и', 'ещё', start_ms=1000), speaker='2')
+    ])
+    
+    assert result['speakers'] == [
+        {'speaker_tag': '1', 'text': 'вопрос'},
+        {'speaker_tag': '2', 'text': 'ответ'},
+        {'speaker_tag': '2', 'text': 'и ещё'}
+    ]
+    assert [(t['speaker'], t['text']) for t in speaker_view(result['utterances'])] == [('1', 'вопрос'), ('2', 'ответ и ещё')]
+
+
+def test_parser_keeps_raw_lines_only_on_request():
+    lines = [json.dumps({'sessionUuid': {'uuid': 'x'}}), final_line(0, timed('слово'))]
+    
+    plain = parse(lines)
+    assert plain['raw'] == [] and plain['chunks'] == []
+    raw = parse(lines, keep_raw=True)
+    assert len(raw['raw']) == 2
+    assert len(raw['chunks']) == 1 and 'final' in raw['chunks'][0]
+
+
+def test_transcribe_keeps_failed_upload_for_next_call(monkeypatch, tmp_path, capsys):
+    part_size = 64 * 1024
+    monkeypatch.setattr(yandex_object_storage, 'MIN_PART_SIZE', part_size)
+    monkeypatch.setattr(yandex_object_storage, 'RETRY_BACKOFF_SEC', 0.0)
+    
+    # Третья часть не доходит ни с одной попытки (разрыв на середине части)
+    original_read = yandex_object_storage._FilePart.read
+    failures = [4]
+    
+    def flaky_read(self, n=-1):
+        if failures[0] and self._f.tell() >= part_size * 2 + part_size // 2:
+            failures[0] -= 1
+            raise requests.ConnectionError('connection reset by peer')
+        return original_read(self, n)
+    
+    monkeypatch.setattr(yandex_object_storage._FilePart, 'read', flaky_read)
+    
+    file_path = tmp_path / 'lecture.mp3'
+    file_path.write_bytes(os.urandom(part_size * 3 + part_size // 2))
+    journal = JobJournal(tmp_path / 'jobs.sqlite3')
+    
+    with FakeObjectStorageServer(credentials=('key', 'secret')) as storage_server, \
+            FakeSpeechKitServer(processing_ratio=0.0, min_processing_sec=0.1) as speechkit_server:
+        stt = YandexSpeechKit(
+            api_key='test',
+            api_base_url=speechkit_server.url,
+            job_journal=journal,
+            polling_policy=lambda duration: FixedIntervalPolling(0.05, 100)
+        )
+        stt._storage = YandexObjectStorage(
+            backend='s3', access_key='key', secret_key='secret', endpoint_url=storage_server.url,
+            multipart_threshold=part_size, part_size=part_size, upload_workers=1
+        )
+        
+        with pytest.raises(UploadError):
+            stt.transcribe(file_path, audio_duration_sec=1, cleanup_after=False)
+        [job] = journal.pending()
+        assert job['state'] == 'uploading'
+        assert job['owner'] is None
+        assert [u['key'] for u in storage_server.stats()['uploads'].values()] == [job['object_name']]
+        
+        parts_before = storage_server.stats()['requests']['upload_part']
+        result = stt.transcribe(file_path, audio_duration_sec=1, cleanup_after=False)
+        
+        assert result['text']
+        assert journal.pending() == []
+        # Та же загрузка продолжена: отправлена только недостающая часть
+        assert storage_server.stats()['requests']['upload_part'] - parts_before == 1
+        assert job['object_name'] in storage_server.stats()['objects']['dela-speechkit-temp']
+    assert 'Продолжена прерванная загрузка: 3 из 4' in capsys.readouterr().out
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+TRANSCRIPT INDEX - ПОИСК ПО ТРАНСКРИПТАМ С ТОЧНОСТЬЮ ДО СЛОВА
+
+Локальный индекс (SQLite FTS5) по результатам YandexSpeechKit: каждая
+фраза (results['utterances']) — строка полнотекстового индекса, каждое
+слово со startTimeMs/endTimeMs — строка таблицы words. Поиск фразы по
+всем записям возвращает запись и время начала/конца совпавших слов
+за миллисекунды, без чтения TRANSCRIPTS_ALL_VIDEOS.md и VOICE_LOG.md.
+
+Использование:
+    from transcript_index import TranscriptIndex
+    
+    index = TranscriptIndex()
+    index.add("voice_20260101_120000_note.ogg", result)   # после распознавания
+    
+    for hit in index.search("ремесло и дизайн"):
+        print(hit['recording'], hit['match_start_ms'], hit['text'])
+
+CLI:
+    python transcript_index.py search "ремесло и дизайн" --limit 10
+    python transcript_index.py range voice_note.ogg --from 00:01:30 --to 00:02:00
+    python transcript_index.py add transcript.json --name lecture.mp4
+    python transcript_index.py import-cache      # всё из TranscriptCache
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, List, Iterator
+from contextlib import contextmanager
+
+
+DEFAULT_TRANSCRIPT_INDEX = Path(__file__).parent.parent / "telegram-bot" / "data" / "transcript_index.sqlite3"
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Токены для индекса и запроса: нижний регистр, ё → е, без пунктуации"""
+    return _TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def format_ms(ms: int) -> str:
+    """Время в формате HH:MM:SS.mmm"""
+    hours, rest = divmod(int(ms), 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def parse_time_ms(value: str) -> int:
+    """'HH:MM:SS[.mmm]', 'MM:SS' или секунды → миллисекунды"""
+    seconds = 0.0
+    for part in value.split(':'):
+        seconds = seconds * 60 + float(part)
+    return round(seconds * 1000)
+
+
+class TranscriptIndex:
+    """
+    Индекс транскриптов по словам (SQLite FTS5)
+    
+    Записи добавляются по одной (add) по мере распознавания; повторное
+    добавление той же записи заменяет её строки, а неизменившийся
+    результат пропускается. Фраза ищется в пределах одной фразы
+    распознавания (utterance), время совпадения — по словам.
+    
+    База открывается на каждую операцию и работает в WAL-режиме, как
+    TranscriptCache.
+    """
+    
+    def __init__(self, db_path: Path | str = DEFAULT_TRANSCRIPT_INDEX):
+        """
+        Args:
+            db_path: Путь к файлу базы (default: telegram-bot/data/transcript_index.sqlite3)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS recordings (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL,
+                    path TEXT,
+                    digest TEXT NOT NULL,
+                    duration_ms INTEGER,
+                    indexed_at REAL NOT NULL
+                )
+                """
+            )
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS utterances (
+                    id INTEGER PRIMARY KEY,
+                    recording_id INTEGER NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    speaker TEXT,
+                    text TEXT NOT NULL
+                )
+                """
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS utterances_time ON utterances (recording_id, start_ms)"
+            )
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS words (
+                    recording_id INTEGER NOT NULL,
+                    utterance_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    word TEXT NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL
+                )
+                """
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS words_utterance ON words (utterance_id, position)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS words_time ON words (recording_id, start_ms)"
+            )
+            # Нормализованный текст фраз; rowid = utterances.id
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS utterances_fts USING fts5(tokens, tokenize='unicode61')"
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение на одну операцию: транзакция фиксируется и соединение закрывается"""
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+    
+    @staticmethod
+    def _utterances(result: Dict) -> List[Dict]:
+        """Фразы результата (старые результаты без индекса фраз — одна фраза из всех слов)"""
+        if 'utterances' in result:
+            return result['utterances']
+        words = result.get('words', [])
+        if not words:
+            return []
+        return [{
+            'start_ms': int(words[0].get('startTimeMs', 0)),
+            'end_ms': int(words[-1].get('endTimeMs', 0)),
+            'text': result.get('text', ''),
+            'speaker': None,
+            'words': words
+        }]
+    
+    def add(self, name: str | Path, result: Dict, path: Optional[Path | str] = None) -> bool:
+        """
+        Добавляет (или заменяет) транскрипт записи
+        
+        Args:
+            name: Имя записи (обычно имя файла; путь — берётся имя)
+            result: Результат YandexSpeechKit (utterances со словами)
+            path: Полный путь к записи (для вывода)
+        
+        Returns:
+            False, если запись с тем же результатом уже в индексе
+        """
+        if isinstance(name, Path):
+            path = path or name
+            name = name.name
+        utterances = self._utterances(result)
+        digest = hashlib.sha256(
+            json.dumps(
+                [(u['start_ms'], u['text'], len(u['words'])) for u in utterances],
+                ensure_ascii=False
+            ).encode('utf-8')
+        ).hexdigest()
+        
+        with self._connect() as db:
+            row = db.execute("SELECT id, digest FROM recordings WHERE name = ?", (name,)).fetchone()
+            if row and row[1] == digest:
+                return False
+            if row:
+                self._delete_recording(db, row[0])
+            
+            recording_id = db.execute(
+                "INSERT INTO recordings (name, path, digest, duration_ms, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    name,
+                    str(path) if path else None,
+                    digest,
+                    max((u['end_ms'] for u in utterances), default=0),
+                    time.time()
+                )
+            ).lastrowid
+            
+            for utterance in utterances:
+                words = utterance['words']
+                text = ' '.join(w.get('text', '') for w in words) if words else utterance['text']
+                utterance_id = db.execute(
+                    "INSERT INTO utterances (recording_id, start_ms, end_ms, speaker, text) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        recording_id,
+                        utterance['start_ms'],
+                        utterance['end_ms'],
+                        str(utterance['speaker']) if utterance.get('speaker') is not None else None,
+                        utterance.get('normalized_text') or utterance['text']
+                    )
+                ).lastrowid
+                db.execute(
+                    "INSERT INTO utterances_fts (rowid, tokens) VALUES (?, ?)",
+                    (utterance_id, ' '.join(normalize_tokens(text)))
+                )
+                db.executemany(
+                    "INSERT INTO words (recording_id, utterance_id, position, word, start_ms, end_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            recording_id,
+                            utterance_id,
+                            position,
+                            word.get('text', ''),
+                            int(word.get('startTimeMs', 0)),
+                            int(word.get('endTimeMs', 0))
+                        )
+                        for position, word in enumerate(words)
+                    )
+                )
+        return True
+    
+    @staticmethod
+    def _delete_recording(db: sqlite3.Connection, recording_id: int) -> None:
+        db.execute(
+            "DELETE FROM utterances_fts WHERE rowid IN (SELECT id FROM utterances WHERE recording_id = ?)",
+            (recording_id,)
+        )
+        db.execute("DELETE FROM words WHERE recording_id = ?", (recording_id,))
+        db.execute("DELETE FROM utterances WHERE recording_id = ?", (recording_id,))
+        db.execute("DELETE FROM recordings WHERE id = ?", (recording_id,))
+    
+    def remove(self, name: str) -> bool:
+        """Удаляет запись из индекса"""
+        with self._connect() as db:
+            row = db.execute("SELECT id FROM recordings WHERE name = ?", (name,)).fetchone()
+            if row:
+                self._delete_recording(db, row[0])
+        return row is not None
+    
+    def search(
+        self,
+        phrase: str,
+        recording: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Ищет фразу по всем записям
+        
+        Args:
+            phrase: Слова подряд (регистр, ё/е и пунктуация не важны)
+            recording: Только в этой записи
+            start_ms, end_ms: Только фразы, пересекающие этот интервал
+            limit: Максимум результатов
+        
+        Returns:
+            Список {'recording', 'path', 'start_ms', 'end_ms', 'text',
+            'match_start_ms', 'match_end_ms'} в порядке записей и времени
+        """
+        tokens = normalize_tokens(phrase)
+        if not tokens:
+            return []
+        
+        query = """
+            SELECT u.id, r.name, r.path, u.start_ms, u.end_ms, u.text
+            FROM utterances_fts
+            JOIN utterances u ON u.id = utterances_fts.rowid
+            JOIN recordings r ON r.id = u.recording_id
+            WHERE utterances_fts MATCH ?
+        """
+        params: list = ['"' + ' '.join(tokens) + '"']
+        if recording is not None:
+            query += " AND r.name = ?"
+            params.append(recording)
+        if start_ms is not None:
+            query += " AND u.end_ms >= ?"
+            params.append(start_ms)
+        if end_ms is not None:
+            query += " AND u.start_ms <= ?"
+            params.append(end_ms)
+        query += " ORDER BY r.name, u.start_ms LIMIT ?"
+        params.append(limit)
+        
+        hits = []
+        with self._connect() as db:
+            for utterance_id, name, path, u_start, u_end, text in db.execute(query, params).fetchall():
+                words = db.execute(
+                    "SELECT word, start_ms, end_ms FROM words WHERE utterance_id = ? ORDER BY position",
+                    (utterance_id,)
+                ).fetchall()
+                match_start, match_end = self._locate(tokens, words) or (u_start, u_end)
+                hits.append({
+                    'recording': name,
+                    'path': path,
+                    'start_ms': u_start,
+                    'end_ms': u_end,
+                    'text': text,
+                    'match_start_ms': match_start,
+                    'match_end_ms': match_end
+                })
+        return hits
+    
+    @staticmethod
+    def _locate(tokens: List[str], words: List[tuple]) -> Optional[tuple]:
+        """(начало, конец) первого вхождения токенов подряд в словах фразы"""
+        # Слово распознавания может дать несколько токенов ('из-за' → 'из', 'за')
+        flat = [(token, start, end) for word, start, end in words for token in normalize_tokens(word)]
+        for i in range(len(flat) - len(tokens) + 1):
+            if all(flat[i + j][0] == token for j, token in enumerate(tokens)):
+                return flat[i][1], flat[i + len(tokens) - 1][2]
+        return None
+    
+    def excerpt(self, recording: str, start_ms: int, end_ms: int) -> List[Dict]:
+        """
+        Слова записи в интервале времени
+        
+        Returns:
+            Список {'word', 'start_ms', 'end_ms'} по времени
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                """
+                SELECT w.word, w.start_ms, w.end_ms
+                FROM words w JOIN recordings r ON r.id = w.recording_id
+                WHERE r.name = ? AND w.start_ms >= ? AND w.start_ms < ?
+                ORDER BY w.start_ms
+                """,
+                (recording, start_ms, end_ms)
+            ).fetchall()
+        return [{'word': word, 'start_ms': start, 'end_ms': end} for word, start, end in rows]
+    
+    def stats(self) -> Dict[str, int]:
+        """Число записей, фраз и слов в индексе"""
+        with self._connect() as db:
+            return {
+                table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('recordings', 'utterances', 'words')
+            }
+
+
+# ============================================================================
+# CLI INTERFACE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Word-level transcript index (SQLite FTS5)')
+    parser.add_argument('--db', type=str, default=str(DEFAULT_TRANSCRIPT_INDEX), help='Index database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    parser_search = subparsers.add_parser('search', help='Find a phrase across all recordings')
+    parser_search.add_argument('phrase', help='Words in a row')
+    parser_search.add_argument('--recording', help='Only this recording (file name)')
+    parser_search.add_argument('--from', dest='start', help='From time (HH:MM:SS or seconds)')
+    parser_search.add_argument('--to', dest='end', help='To time (HH:MM:SS or seconds)')
+    parser_search.add_argument('--limit', type=int, default=20)
+    parser_search.add_argument('--json', action='store_true', help='Print JSON')
+    
+    parser_range = subparsers.add_parser('range', help='Words of a recording in a time range')
+    parser_range.add_argument('recording', help='Recording (file name)')
+    parser_range.add_argument('--from', dest='start', default='0', help='From time (HH:MM:SS or seconds)')
+    parser_range.add_argument('--to', dest='end', required=True, help='To time (HH:MM:SS or seconds)')
+    
+    parser_add = subparsers.add_parser('add', help='Index a transcript saved with --format json')
+    parser_add.add_argument('transcript', help='JSON transcript')
+    parser_add.add_argument('--name', help='Recording name (default: transcript file stem)')
+    
+    parser_import = subparsers.add_parser('import-cache', help='Index every transcript in TranscriptCache')
+    parser_import.add_argument('--cache', type=str, help='TranscriptCache database (default: shared store)')
+    
+    subparsers.add_parser('stats', help='Index size')
+    
+    args = parser.parse_args(argv)
+    index = TranscriptIndex(args.db)
+    
+    if args.command == 'search':
+        started = time.perf_counter()
+        hits = index.search(
+            args.phrase,
+            recording=args.recording,
+            start_ms=parse_time_ms(args.start) if args.start else None,
+            end_ms=parse_time_ms(args.end) if args.end else None,
+            limit=args.limit
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if args.json:
+            print(json.dumps(hits, ensure_ascii=False, indent=2))
+            return 0
+        for hit in hits:
+            print(f"{hit['recording']}  [{format_ms(hit['match_start_ms'])} - {format_ms(hit['match_end_ms'])}]")
+            print(f"   {hit['text']}")
+        print(f"\n🔎 Найдено: {len(hits)} ({elapsed_ms:.1f} мс)")
+    
+    elif args.command == 'range':
+        words = index.excerpt(args.recording, parse_time_ms(args.start), parse_time_ms(args.end))
+        if words:
+            print(f"[{format_ms(words[0]['start_ms'])} - {format_ms(words[-1]['end_ms'])}]")
+            print(' '.join(w['word'] for w in words))
+        else:
+            print("⚠️  Слов в этом интервале нет")
+    
+    elif args.command == 'add':
+        transcript = Path(args.transcript)
+        result = json.loads(transcript.read_text(encoding='utf-8'))
+        name = args.name or transcript.stem
+        added = index.add(name, result)
+        print(f"✅ Проиндексировано: {name}" if added else f"♻️  Без изменений: {name}")
+    
+    elif args.command == 'import-cache':
+        sys.path.append(str(Path(__file__).parent))
+        from yandex_speechkit import TranscriptCache
+        cache = TranscriptCache(args.cache) if args.cache else TranscriptCache()
+        added = skipped = 0
+        for file_name, result in cache.entries():
+            if not file_name:
+                skipped += 1
+            elif index.add(file_name, result):
+                added += 1
+        print(f"✅ Проиндексировано записей: {added} (без имени файла: {skipped})")
+    
+    elif args.command == 'stats':
+        for table, count in index.stats().items():
+            print(f"{table}: {count}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
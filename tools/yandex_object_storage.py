@@ -2,7 +2,9 @@
 """
 YANDEX OBJECT STORAGE - АВТОМАТИЧЕСКАЯ ЗАГРУЗКА
 
-Автоматизация загрузки файлов в Yandex Object Storage через Yandex Cloud CLI.
+Автоматизация загрузки файлов в Yandex Object Storage: встроенный
+S3-клиент (пул HTTP-соединений, подпись AWS Signature V4) или, если
+статических ключей нет, Yandex Cloud CLI.
 
 Использование:
     from yandex_object_storage import YandexObjectStorage
@@ -12,69 +14,719 @@ YANDEX OBJECT STORAGE - АВТОМАТИЧЕСКАЯ ЗАГРУЗКА
     # Автоматическая загрузка файла
     public_url = storage.upload_file("video.mp4")
     
+    # Одинаковое содержимое — один объект (ключ по SHA-256, повторная загрузка пропускается)
+    storage = YandexObjectStorage(content_addressed=True)
+    
     # Использование с транскрипцией
     from yandex_speechkit import YandexSpeechKit
     stt = YandexSpeechKit()
     result = stt.transcribe_from_uri(public_url)
 
 Требования:
-- Yandex Cloud CLI (yc) установлен и настроен
+- S3: статический ключ доступа сервисного аккаунта
+  (YANDEX_STORAGE_ACCESS_KEY / YANDEX_STORAGE_SECRET_KEY
+  или AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY) и pip install requests
+- иначе: Yandex Cloud CLI (yc) установлен и настроен, YANDEX_FOLDER_ID
 - Сервисный аккаунт с ролями: storage.uploader, ai.speechkit-stt.user
 """
 
 import os
+import math
+import hmac
+import time
+import random
+import threading
 import subprocess
 import json
 from pathlib import Path
-from typing import Optional, Dict
-from datetime import datetime
+from typing import Optional, Dict, Iterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import quote, urlparse
+import xml.etree.ElementTree as ET
 import hashlib
 
+# requests нужен только S3-бэкенду; без него остаётся yc CLI
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+S3_ENDPOINT = "https://storage.yandexcloud.net"
+S3_REGION = "ru-central1"
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+# Тело из файла не хешируется заранее: над HTTPS S3 принимает неподписанное тело
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+S3_XML_NS = {'s3': 'http://s3.amazonaws.com/doc/2006-03-01/'}
+
+# Чтение файлов блоками: память не зависит от размера файла
+FILE_CHUNK = 1024 * 1024
+# Ограничения S3 на составную загрузку: часть от 5 MB (кроме последней), до 10 000 частей
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+# Пауза перед повтором части: 1, 2, 4... сек (±50%, чтобы потоки не повторяли разом)
+RETRY_BACKOFF_SEC = 1.0
+# Объекты с ключом по содержимому: speechkit/sha256/{hex}{расширение}
+CONTENT_PREFIX = "speechkit/sha256/"
+
+
+def file_md5(file_path: Path | str, offset: int = 0, size: Optional[int] = None) -> str:
+    """
+    MD5 файла (или его части) чтением по FILE_CHUNK
+    
+    Args:
+        file_path: Путь к файлу
+        offset: Начало части
+        size: Длина части (default: до конца файла)
+        
+    Returns:
+        MD5 в hex
+    """
+    return _file_digest(hashlib.md5(), file_path, offset, size)
+
+
+def file_sha256(file_path: Path | str) -> str:
+    """SHA-256 всего файла чтением по FILE_CHUNK (ключ content-addressed объекта)"""
+    return _file_digest(hashlib.sha256(), file_path)
+
+
+def _file_digest(digest, file_path: Path | str, offset: int = 0, size: Optional[int] = None) -> str:
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        left = size if size is not None else math.inf
+        while left > 0:
+            data = f.read(int(min(FILE_CHUNK, left)))
+            if not data:
+                break
+            digest.update(data)
+            left -= len(data)
+    return digest.hexdigest()
+
+
+# ============================================================================
+# S3 API: ПОДПИСЬ AWS SIGNATURE V4
+# ============================================================================
+
+def _uri_encode(value: str, safe: str = '-_.~') -> str:
+    """URI-кодирование по правилам SigV4 (RFC 3986, пробел — %20)"""
+    return quote(value, safe=safe)
+
+
+def sign_v4(
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str = S3_REGION,
+    service: str = 's3',
+    now: Optional[datetime] = None,
+    signing_keys: Optional[Dict] = None
+) -> Dict[str, str]:
+    """
+    Подписывает запрос AWS Signature V4 (заголовок Authorization)
+    
+    Подписываются все переданные заголовки и host. Путь и параметры url
+    должны быть уже закодированы (_uri_encode).
+    
+    Args:
+        method: HTTP-метод
+        url: Полный адрес запроса
+        headers: Заголовки запроса (кроме host и x-amz-*, их добавит подпись)
+        payload_hash: SHA-256 тела в hex или UNSIGNED_PAYLOAD
+        access_key: ID статического ключа
+        secret_key: Секретный ключ
+        region: Регион (default: ru-central1)
+        service: Сервис (default: s3)
+        now: Время подписи (default: текущее, UTC)
+        signing_keys: Кэш ключей подписи {(дата, регион, сервис): ключ}
+        
+    Returns:
+        Заголовки для отправки: переданные + x-amz-date,
+        x-amz-content-sha256 и Authorization
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date = amz_date[:8]
+    parsed = urlparse(url)
+    
+    signed = {name.lower(): str(value).strip() for name, value in headers.items()}
+    signed['host'] = parsed.netloc
+    signed['x-amz-date'] = amz_date
+    signed['x-amz-content-sha256'] = payload_hash
+    signed_names = sorted(signed)
+    
+    query = []
+    for pair in parsed.query.split('&') if parsed.query else []:
+        name, _, value = pair.partition('=')
+        query.append((name, value))
+    canonical_request = '\n'.join([
+        method,
+        parsed.path or '/',
+        '&'.join(f"{name}={value}" for name, value in sorted(query)),
+        ''.join(f"{name}:{signed[name]}\n" for name in signed_names),
+        ';'.join(signed_names),
+        payload_hash
+    ])
+    
+    scope = f"{date}/{region}/{service}/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+    ])
+    
+    cache_key = (date, region, service)
+    key = signing_keys.get(cache_key) if signing_keys is not None else None
+    if key is None:
+        key = ('AWS4' + secret_key).encode('utf-8')
+        for part in (date, region, service, 'aws4_request'):
+            key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+        if signing_keys is not None:
+            signing_keys[cache_key] = key
+    signature = hmac.new(key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    result = dict(headers)
+    result['x-amz-date'] = amz_date
+    result['x-amz-content-sha256'] = payload_hash
+    result['Authorization'] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={';'.join(signed_names)}, Signature={signature}"
+    )
+    return result
+
+
+class S3Error(RuntimeError):
+    """Ошибка S3 API: HTTP-статус и код из XML-ответа"""
+    
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(f"S3 {status} {code}: {message}")
+        self.status = status
+        self.code = code
+
+
+class _FilePart:
+    """
+    Часть файла [offset, offset + size) как тело запроса
+    
+    requests читает её блоками (длина известна через len), MD5 считается
+    по ходу отправки — для сверки с ETag части без повторного чтения.
+    """
+    
+    def __init__(self, f, offset: int, size: int):
+        f.seek(offset)
+        self._f = f
+        self._left = size
+        self.size = size
+        self.md5 = hashlib.md5()
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def read(self, n: int = -1) -> bytes:
+        if self._left <= 0:
+            return b''
+        n = self._left if n is None or n < 0 else min(n, self._left)
+        data = self._f.read(n)
+        self._left -= len(data)
+        self.md5.update(data)
+        return data
+
+
+class S3Client:
+    """
+    Минимальный S3-клиент для Yandex Object Storage
+    
+    Один requests.Session с пулом keep-alive соединений на все запросы:
+    загрузка небольшого файла — один HTTPS-запрос без запуска процессов.
+    Адресация path-style: {endpoint}/{bucket}/{key}.
+    """
+    
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        endpoint_url: str = S3_ENDPOINT,
+        region: str = S3_REGION,
+        pool_size: int = 10,
+        timeout: float = 300.0
+    ):
+        """
+        Args:
+            access_key: ID статического ключа сервисного аккаунта
+            secret_key: Секретный ключ
+            endpoint_url: Адрес S3 API (default: https://storage.yandexcloud.net)
+            region: Регион подписи (default: ru-central1)
+            pool_size: Соединений в пуле (параллельные загрузки)
+            timeout: Таймаут запроса, сек
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("Для S3-бэкенда нужен requests: pip install requests")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.region = region
+        self.timeout = timeout
+        self._signing_keys: Dict = {}
+        
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def url(self, bucket: str, key: str = '') -> str:
+        """Адрес объекта (ключ кодируется, '/' сохраняется)"""
+        path = f"/{bucket}"
+        if key:
+            path += '/' + _uri_encode(key, safe='-_.~/')
+        return self.endpoint_url + path
+    
+    def request(
+        self,
+        method: str,
+        bucket: str,
+        key: str = '',
+        params: Optional[Dict[str, str]] = None,
+        data=None,
+        headers: Optional[Dict[str, str]] = None,
+        payload_hash: Optional[str] = None,
+        expected: tuple = (200,)
+    ):
+        """
+        Подписанный запрос к S3 API
+        
+        Args:
+            method: HTTP-метод
+            bucket: Bucket
+            key: Ключ объекта ('' — запрос к bucket)
+            params: Параметры запроса
+            data: Тело: bytes или открытый файл (передаётся потоком)
+            headers: Дополнительные заголовки (подписываются)
+            payload_hash: SHA-256 тела (default: считается для bytes,
+                UNSIGNED-PAYLOAD для файла)
+            expected: Успешные HTTP-статусы
+            
+        Returns:
+            requests.Response
+            
+        Raises:
+            S3Error: Статус не из expected
+        """
+        url = self.url(bucket, key)
+        if params:
+            url += '?' + '&'.join(
+                f"{_uri_encode(str(name))}={_uri_encode(str(value))}"
+                for name, value in sorted(params.items())
+            )
+        if payload_hash is None:
+            if data is None:
+                payload_hash = EMPTY_SHA256
+            elif isinstance(data, bytes):
+                payload_hash = hashlib.sha256(data).hexdigest()
+            else:
+                payload_hash = UNSIGNED_PAYLOAD
+        
+        signed_headers = sign_v4(
+            method, url, headers or {}, payload_hash,
+            self.access_key, self.secret_key, self.region,
+            signing_keys=self._signing_keys
+        )
+        response = self.session.request(method, url, data=data, headers=signed_headers, timeout=self.timeout)
+        if response.status_code not in expected:
+            code, message = str(response.status_code), response.reason
+            if response.content:
+                try:
+                    error = ET.fromstring(response.content)
+                    code = error.findtext('Code') or code
+                    message = error.findtext('Message') or message
+                except ET.ParseError:
+                    pass
+            raise S3Error(response.status_code, code, message)
+        return response
+    
+    def bucket_exists(self, bucket: str) -> bool:
+        """HEAD bucket: True — есть и доступен"""
+        try:
+            self.request('HEAD', bucket)
+            return True
+        except S3Error as e:
+            if e.status == 404:
+                return False
+            raise
+    
+    def create_bucket(self, bucket: str, public_read: bool = False) -> None:
+        """Создаёт bucket (с публичным чтением объектов, если public_read)"""
+        headers = {'x-amz-acl': 'public-read'} if public_read else {}
+        self.request('PUT', bucket, headers=headers)
+    
+    def put_object(self, bucket: str, key: str, file_path: Path, content_type: Optional[str] = None) -> str:
+        """
+        Загружает файл одним запросом (тело читается потоком)
+        
+        Returns:
+            ETag объекта
+        """
+        headers = {'Content-Length': str(file_path.stat().st_size)}
+        if content_type:
+            headers['Content-Type'] = content_type
+        with open(file_path, 'rb') as f:
+            response = self.request('PUT', bucket, key, data=f, headers=headers)
+        return response.headers.get('ETag', '').strip('"')
+    
+    def head_object(self, bucket: str, key: str) -> Optional[Dict]:
+        """
+        HEAD объекта
+        
+        Returns:
+            {'size', 'etag'} или None, если объекта нет
+        """
+        try:
+            response = self.request('HEAD', bucket, key)
+        except S3Error as e:
+            if e.status == 404:
+                return None
+            raise
+        return {
+            'size': int(response.headers.get('Content-Length', 0)),
+            'etag': response.headers.get('ETag', '').strip('"')
+        }
+    
+    def delete_object(self, bucket: str, key: str) -> None:
+        """Удаляет объект (отсутствующий объект — не ошибка)"""
+        self.request('DELETE', bucket, key, expected=(200, 204))
+    
+    def list_objects(self, bucket: str, prefix: str = '') -> Iterator[Dict]:
+        """
+        Объекты bucket (ListObjectsV2, по 1000 за страницу)
+        
+        Yields:
+            {'name', 'size', 'last_modified', 'etag'}
+        """
+        ns = S3_XML_NS
+        params = {'list-type': '2'}
+        if prefix:
+            params['prefix'] = prefix
+        while True:
+            root = ET.fromstring(self.request('GET', bucket, params=params).content)
+            for item in root.findall('s3:Contents', ns):
+                yield {
+                    'name': item.findtext('s3:Key', '', ns),
+                    'size': int(item.findtext('s3:Size', '0', ns)),
+                    'last_modified': item.findtext('s3:LastModified', '', ns),
+                    'etag': item.findtext('s3:ETag', '', ns).strip('"')
+                }
+            token = root.findtext('s3:NextContinuationToken', None, ns)
+            if root.findtext('s3:IsTruncated', 'false', ns) != 'true' or not token:
+                return
+            params['continuation-token'] = token
+    
+    # ------------------------------------------------------------------------
+    # Составная загрузка (multipart upload)
+    # ------------------------------------------------------------------------
+    
+    def create_multipart_upload(self, bucket: str, key: str) -> str:
+        """Начинает составную загрузку, возвращает UploadId"""
+        response = self.request('POST', bucket, key, params={'uploads': ''})
+        return ET.fromstring(response.content).findtext('s3:UploadId', '', S3_XML_NS)
+    
+    def upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        file_path: Path,
+        offset: int,
+        size: int
+    ) -> str:
+        """
+        Загружает часть файла потоком
+        
+        Returns:
+            ETag части (MD5 отправленных байт)
+            
+        Raises:
+            S3Error: Хранилище посчитало другой MD5 (часть повреждена в пути)
+        """
+        params = {'partNumber': str(part_number), 'uploadId': upload_id}
+        with open(file_path, 'rb') as f:
+            body = _FilePart(f, offset, size)
+            response = self.request(
+                'PUT', bucket, key, params=params, data=body,
+                headers={'Content-Length': str(size)}
+            )
+        etag = response.headers.get('ETag', '').strip('"')
+        if etag != body.md5.hexdigest():
+            raise S3Error(response.status_code, 'BadDigest', f"ETag части {part_number} не совпал с MD5")
+        return etag
+    
+    def list_parts(self, bucket: str, key: str, upload_id: str) -> Dict[int, Dict]:
+        """
+        Уже загруженные части составной загрузки
+        
+        Returns:
+            Номер части -> {'etag', 'size'}
+        """
+        parts: Dict[int, Dict] = {}
+        params = {'uploadId': upload_id}
+        while True:
+            root = ET.fromstring(self.request('GET', bucket, key, params=params).content)
+            for item in root.findall('s3:Part', S3_XML_NS):
+                parts[int(item.findtext('s3:PartNumber', '0', S3_XML_NS))] = {
+                    'etag': item.findtext('s3:ETag', '', S3_XML_NS).strip('"'),
+                    'size': int(item.findtext('s3:Size', '0', S3_XML_NS))
+                }
+            marker = root.findtext('s3:NextPartNumberMarker', None, S3_XML_NS)
+            if root.findtext('s3:IsTruncated', 'false', S3_XML_NS) != 'true' or not marker:
+                return parts
+            params['part-number-marker'] = marker
+    
+    def complete_multipart_upload(self, bucket: str, key: str, upload_id: str, etags: Dict[int, str]) -> str:
+        """Собирает объект из частей, возвращает его ETag"""
+        body = ''.join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>\"{etags[number]}\"</ETag></Part>"
+            for number in sorted(etags)
+        )
+        body = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode('utf-8')
+        response = self.request('POST', bucket, key, params={'uploadId': upload_id}, data=body)
+        root = ET.fromstring(response.content)
+        # Ошибка сборки может прийти с кодом 200
+        if root.tag == 'Error':
+            raise S3Error(response.status_code, root.findtext('Code', ''), root.findtext('Message', ''))
+        return root.findtext('s3:ETag', '', S3_XML_NS).strip('"')
+    
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        """Отменяет составную загрузку и удаляет её части"""
+        self.request('DELETE', bucket, key, params={'uploadId': upload_id}, expected=(200, 204, 404))
+    
+    def list_multipart_uploads(self, bucket: str, prefix: str = '') -> Iterator[Dict]:
+        """
+        Незавершённые составные загрузки bucket
+        
+        Yields:
+            {'key', 'upload_id', 'initiated'}
+        """
+        params = {'uploads': ''}
+        if prefix:
+            params['prefix'] = prefix
+        while True:
+            root = ET.fromstring(self.request('GET', bucket, params=params).content)
+            for item in root.findall('s3:Upload', S3_XML_NS):
+                yield {
+                    'key': item.findtext('s3:Key', '', S3_XML_NS),
+                    'upload_id': item.findtext('s3:UploadId', '', S3_XML_NS),
+                    'initiated': item.findtext('s3:Initiated', '', S3_XML_NS)
+                }
+            if root.findtext('s3:IsTruncated', 'false', S3_XML_NS) != 'true':
+                return
+            params['key-marker'] = root.findtext('s3:NextKeyMarker', '', S3_XML_NS)
+            params['upload-id-marker'] = root.findtext('s3:NextUploadIdMarker', '', S3_XML_NS)
+    
+    def upload_multipart(
+        self,
+        bucket: str,
+        key: str,
+        file_path: Path,
+        part_size: int = DEFAULT_PART_SIZE,
+        workers: int = 4,
+        retries: int = 3,
+        on_part: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Загружает файл частями в workers потоков с продолжением прерванной загрузки
+        
+        Если для key уже есть незавершённая составная загрузка, части,
+        совпадающие с файлом по размеру и MD5, не отправляются повторно —
+        загрузка продолжается с первой недостающей части. Незавершённая
+        загрузка при ошибке не отменяется, чтобы следующий вызов её
+        продолжил (отменить: abort_multipart_upload).
+        
+        Args:
+            bucket: Bucket
+            key: Ключ объекта
+            file_path: Файл (читается частями, память не зависит от размера)
+            part_size: Размер части (не меньше 5 MB; растёт, если частей больше 10 000)
+            workers: Частей, загружаемых одновременно
+            retries: Повторов части при сетевой ошибке или 5xx (0 — одна попытка)
+            on_part: Вызывается (готово частей, всего частей) после каждой части
+            
+        Returns:
+            {'etag', 'parts', 'resumed_parts', 'part_size'}
+        """
+        file_size = file_path.stat().st_size
+        part_size = max(part_size, MIN_PART_SIZE, math.ceil(file_size / MAX_PARTS))
+        
+        upload_id, uploaded = None, {}
+        existing = [u for u in self.list_multipart_uploads(bucket, prefix=key) if u['key'] == key]
+        if existing:
+            upload_id = max(existing, key=lambda u: u['initiated'])['upload_id']
+            uploaded = self.list_parts(bucket, key, upload_id)
+            # Продолжаем с тем же размером части, с которым загрузка начиналась
+            first = uploaded.get(1)
+            if first and first['size'] >= MIN_PART_SIZE and first['size'] < file_size:
+                part_size = first['size']
+        else:
+            upload_id = self.create_multipart_upload(bucket, key)
+        
+        plan = [
+            (number, offset, min(part_size, file_size - offset))
+            for number, offset in enumerate(range(0, max(file_size, 1), part_size), start=1)
+        ]
+        done = 0
+        resumed = 0
+        
+        def send(part: tuple) -> tuple:
+            number, offset, size = part
+            previous = uploaded.get(number)
+            if previous and previous['size'] == size and previous['etag'] == file_md5(file_path, offset, size):
+                return number, previous['etag'], True
+            for attempt in range(max(0, retries) + 1):
+                try:
+                    return number, self.upload_part(bucket, key, upload_id, number, file_path, offset, size), False
+                except (S3Error, requests.RequestException) as e:
+                    transient = not isinstance(e, S3Error) or e.status >= 500 or e.code == 'BadDigest'
+                    if not transient or attempt >= retries:
+                        raise
+                    delay = RETRY_BACKOFF_SEC * 2 ** attempt * random.uniform(0.5, 1.5)
+                    print(f"⚠️  Часть {number}: {e}; повтор через {delay:.1f}с")
+                    time.sleep(delay)
+        
+        etags: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for number, etag, skipped in executor.map(send, plan):
+                etags[number] = etag
+                done += 1
+                resumed += skipped
+                if on_part is not None:
+                    on_part(done, len(plan))
+        
+        return {
+            'etag': self.complete_multipart_upload(bucket, key, upload_id, etags),
+            'parts': len(plan),
+            'resumed_parts': resumed,
+            'part_size': part_size
+        }
+
+
+# ============================================================================
+# YANDEX OBJECT STORAGE
+# ============================================================================
 
 class YandexObjectStorage:
-    """Менеджер для работы с Yandex Object Storage через CLI"""
+    """
+    Менеджер для работы с Yandex Object Storage
+    
+    Бэкенды: 's3' — встроенный S3-клиент (S3Client), 'yc' — Yandex Cloud
+    CLI (процесс на каждую операцию), 'auto' — S3, если заданы
+    статические ключи и установлен requests, иначе yc.
+    
+    S3-бэкенд загружает файлы от multipart_threshold частями в
+    upload_workers потоков; прерванная загрузка того же object_name
+    продолжается с первой недостающей части.
+    
+    С content_addressed=True ключ объекта — SHA-256 содержимого
+    (content_key): перед загрузкой HEAD проверяет, нет ли объекта уже в
+    bucket, и одинаковый файл не отправляется второй раз. Каждый
+    upload_file такого объекта берёт ссылку, release_file её снимает;
+    объект удаляется, только когда ссылок не осталось.
+    """
+    
+    BACKENDS = ('auto', 's3', 'yc')
     
     def __init__(
         self,
         bucket_name: str = "dela-speechkit-temp",
         folder_id: Optional[str] = None,
         auto_create_bucket: bool = True,
-        public_access: bool = True
+        public_access: bool = True,
+        backend: str = "auto",
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        part_size: int = DEFAULT_PART_SIZE,
+        upload_workers: int = 4,
+        content_addressed: bool = False
     ):
         """
         Инициализация
         
         Args:
             bucket_name: Имя bucket (должно быть уникальным)
-            folder_id: ID каталога Yandex Cloud
+            folder_id: ID каталога Yandex Cloud (нужен бэкенду yc)
             auto_create_bucket: Автоматически создать bucket если не существует
             public_access: Разрешить публичный доступ к файлам
+            backend: 'auto', 's3' или 'yc'
+            access_key: ID статического ключа (default: YANDEX_STORAGE_ACCESS_KEY
+                или AWS_ACCESS_KEY_ID)
+            secret_key: Секретный ключ (default: YANDEX_STORAGE_SECRET_KEY
+                или AWS_SECRET_ACCESS_KEY)
+            endpoint_url: Адрес S3 API (default: YANDEX_STORAGE_ENDPOINT
+                или https://storage.yandexcloud.net)
+            multipart_threshold: Размер файла, с которого загрузка идёт частями (default: 64 MB)
+            part_size: Размер части (default: 16 MB)
+            upload_workers: Частей, загружаемых одновременно (default: 4)
+            content_addressed: Ключ по SHA-256 содержимого и пропуск загрузки
+                уже лежащих в bucket объектов
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд: {backend} (доступны: {', '.join(self.BACKENDS)})")
+        
         self.bucket_name = bucket_name
         self.folder_id = folder_id or os.getenv('YANDEX_FOLDER_ID')
         self.public_access = public_access
+        self.endpoint_url = (endpoint_url or os.getenv('YANDEX_STORAGE_ENDPOINT') or S3_ENDPOINT).rstrip('/')
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.upload_workers = upload_workers
+        self.content_addressed = content_addressed
+        # Ссылки на content-addressed объекты в этом процессе и блокировки по ключу
+        self._refs: Dict[str, int] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._refs_lock = threading.Lock()
         
-        if not self.folder_id:
-            raise ValueError(
-                "Требуется folder_id. Установите переменную окружения: "
-                "YANDEX_FOLDER_ID"
-            )
-        
-        # Проверяем yc CLI
-        if not self._check_yc_cli():
-            raise RuntimeError(
-                "Yandex Cloud CLI не установлен. "
-                "Установите: brew install yandex-cloud/tap/yc"
-            )
+        access_key = access_key or os.getenv('YANDEX_STORAGE_ACCESS_KEY') or os.getenv('AWS_ACCESS_KEY_ID')
+        secret_key = secret_key or os.getenv('YANDEX_STORAGE_SECRET_KEY') or os.getenv('AWS_SECRET_ACCESS_KEY')
+        if backend == 'auto':
+            backend = 's3' if access_key and secret_key and REQUESTS_AVAILABLE else 'yc'
+        self.backend = backend
+        self.s3: Optional[S3Client] = None
         
-        # Настраиваем yc CLI
-        self._configure_yc()
+        if backend == 's3':
+            if not access_key or not secret_key:
+                raise ValueError(
+                    "Для S3-бэкенда нужен статический ключ. Установите переменные окружения: "
+                    "YANDEX_STORAGE_ACCESS_KEY и YANDEX_STORAGE_SECRET_KEY"
+                )
+            self.s3 = S3Client(access_key, secret_key, self.endpoint_url, pool_size=max(10, upload_workers))
+        else:
+            if not self.folder_id:
+                raise ValueError(
+                    "Требуется folder_id. Установите переменную окружения: "
+                    "YANDEX_FOLDER_ID"
+                )
+            
+            # Проверяем yc CLI
+            if not self._check_yc_cli():
+                raise RuntimeError(
+                    "Yandex Cloud CLI не установлен. "
+                    "Установите: brew install yandex-cloud/tap/yc"
+                )
+            
+            # Настраиваем yc CLI
+            self._configure_yc()
         
         # Создаём или проверяем bucket
         if auto_create_bucket:
             self._ensure_bucket_exists()
         
-        print(f"✅ Yandex Object Storage готов")
+        print(f"✅ Yandex Object Storage готов ({self.backend})")
         print(f"   Bucket: {self.bucket_name}")
     
     def _check_yc_cli(self) -> bool:
@@ -110,6 +762,17 @@ class YandexObjectStorage:
         # Создаём
         print(f"📦 Создаю bucket '{self.bucket_name}'...")
         
+        if self.s3 is not None:
+            try:
+                self.s3.create_bucket(self.bucket_name, public_read=self.public_access)
+                print(f"✅ Bucket создан")
+            except S3Error as e:
+                # Если bucket уже существует - это OK
+                if e.code not in ('BucketAlreadyOwnedByYou', 'BucketAlreadyExists'):
+                    raise RuntimeError(f"Не удалось создать bucket: {e}")
+                print(f"✅ Bucket '{self.bucket_name}' уже существует")
+            return
+        
         try:
             cmd = [
                 'yc', 'storage', 'bucket', 'create',
@@ -139,6 +802,9 @@ class YandexObjectStorage:
     
     def _bucket_exists(self) -> bool:
         """Проверяет существование bucket"""
+        if self.s3 is not None:
+            return self.s3.bucket_exists(self.bucket_name)
+        
         try:
             result = subprocess.run(
                 ['yc', 'storage', 'bucket', 'list', '--format', 'json'],
@@ -164,7 +830,8 @@ class YandexObjectStorage:
         
         Args:
             file_path: Путь к локальному файлу
-            object_name: Имя объекта в bucket (по умолчанию: имя файла)
+            object_name: Имя объекта в bucket (по умолчанию: имя файла;
+                при content_addressed — content_key)
             ttl_days: Время жизни файла в днях (для временных файлов)
             
         Returns:
@@ -176,19 +843,214 @@ class YandexObjectStorage:
             raise FileNotFoundError(f"Файл не найден: {file_path}")
         
         # Определяем имя объекта
-        if object_name is None:
+        if object_name is None and self.content_addressed:
+            object_name = self.content_key(file_path)
+        elif object_name is None:
             # Добавляем timestamp для уникальности
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_hash = hashlib.md5(file_path.read_bytes()).hexdigest()[:8]
+            file_hash = file_md5(file_path)[:8]
             object_name = f"speechkit/{timestamp}_{file_hash}_{file_path.name}"
         
         print(f"📤 Загрузка в Object Storage...")
         print(f"   Файл: {file_path.name}")
         print(f"   Размер: {file_path.stat().st_size / 1024 / 1024:.2f} MB")
         
+        if self.is_content_key(object_name):
+            # Проверка и загрузка под блокировкой ключа: release_file того же
+            # объекта в другом потоке не удалит его между HEAD и ссылкой
+            with self._key_lock(object_name):
+                with self._refs_lock:
+                    self._refs[object_name] = self._refs.get(object_name, 0) + 1
+                try:
+                    if self.object_exists(object_name, file_path.stat().st_size):
+                        print(f"♻️  Уже в хранилище: {object_name}")
+                    else:
+                        self._put(file_path, object_name)
+                except Exception:
+                    with self._refs_lock:
+                        self._drop_ref(object_name)
+                    raise
+        else:
+            self._put(file_path, object_name)
+        
+        # Получаем публичную ссылку
+        public_url = self._get_public_url(object_name)
+        
+        print(f"🔗 Публичная ссылка:")
+        print(f"   {public_url}")
+        
+        return public_url
+    
+    def _put(self, file_path: Path, object_name: str) -> None:
+        """Одним запросом или, для больших файлов на S3, частями"""
+        if self.s3 is not None and file_path.stat().st_size >= self.multipart_threshold:
+            self._put_multipart(file_path, object_name)
+        else:
+            self._put_object(file_path, object_name)
+        print(f"✅ Файл загружен: {object_name}")
+    
+    def content_key(self, file_path: Path | str, content_hash: Optional[str] = None) -> str:
+        """
+        Ключ объекта по содержимому: speechkit/sha256/{sha256}{расширение}
+        
+        Args:
+            file_path: Файл
+            content_hash: Уже посчитанный SHA-256 содержимого (default: считается)
+        """
+        file_path = Path(file_path)
+        return f"{CONTENT_PREFIX}{content_hash or file_sha256(file_path)}{file_path.suffix.lower()}"
+    
+    @staticmethod
+    def is_content_key(object_name: str) -> bool:
+        """Объект с ключом по содержимому (может быть нужен нескольким заданиям)"""
+        return object_name.startswith(CONTENT_PREFIX)
+    
+    def object_exists(self, object_name: str, size: Optional[int] = None) -> bool:
+        """
+        Есть ли объект в bucket (HEAD)
+        
+        Args:
+            object_name: Имя объекта
+            size: Ожидаемый размер (другой размер — объекта нет, например оборванная загрузка)
+        """
+        if self.s3 is not None:
+            try:
+                head = self.s3.head_object(self.bucket_name, object_name)
+            except (S3Error, requests.RequestException) as e:
+                print(f"⚠️  Не удалось проверить объект: {e}")
+                return False
+            return head is not None and (size is None or head['size'] == size)
+        
+        result = subprocess.run(
+            [
+                'yc', 'storage', 's3api', 'head-object',
+                '--bucket', self.bucket_name,
+                '--key', object_name,
+                '--format', 'json'
+            ],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return False
+        try:
+            head = json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return size is None
+        return size is None or int(head.get('content_length', size)) == size
+    
+    def release_file(
+        self,
+        object_name: str,
+        other_users: Optional[Callable[[], int]] = None,
+        keep: bool = False
+    ) -> int:
+        """
+        Снимает ссылку на content-addressed объект и удаляет его, если он больше не нужен
+        
+        Args:
+            object_name: Имя объекта
+            other_users: Сколько пользователей у объекта вне этого процесса
+                (например, задания в общем журнале); вызывается под блокировкой ключа
+            keep: Только снять ссылку, не удаляя объект (его удалит cleanup_old_files)
+                
+        Returns:
+            Число оставшихся пользователей (0 — объект удалён)
+        """
+        with self._key_lock(object_name):
+            with self._refs_lock:
+                users = self._drop_ref(object_name)
+            if keep:
+                return users
+            if not users and other_users is not None:
+                users = other_users()
+            if users:
+                print(f"🔗 Объект нужен ещё {users} заданиям, не удаляю: {object_name}")
+                return users
+            self.delete_file(object_name)
+            return 0
+    
+    def _drop_ref(self, object_name: str) -> int:
+        """Уменьшает счётчик ссылок (под _refs_lock), возвращает остаток"""
+        users = max(0, self._refs.get(object_name, 0) - 1)
+        if users:
+            self._refs[object_name] = users
+        else:
+            self._refs.pop(object_name, None)
+        return users
+    
+    def _key_lock(self, object_name: str) -> threading.Lock:
+        with self._refs_lock:
+            return self._key_locks.setdefault(object_name, threading.Lock())
+    
+    def _put_multipart(self, file_path: Path, object_name: str) -> None:
+        """Загружает файл частями (S3-бэкенд), продолжая прерванную загрузку"""
+        print(f"🧩 Частями по {self.part_size / 1024 / 1024:g} MB, потоков: {self.upload_workers}")
+        reported = [0]
+        
+        def on_part(done: int, total: int) -> None:
+            # Прогресс шагами по 10%
+            step = done * 10 // total
+            if step > reported[0]:
+                reported[0] = step
+                print(f"   {done}/{total} частей ({step * 10}%)")
+        
+        try:
+            upload = self.s3.upload_multipart(
+                self.bucket_name, object_name, file_path,
+                part_size=self.part_size,
+                workers=self.upload_workers,
+                on_part=on_part
+            )
+        except (S3Error, requests.RequestException) as e:
+            raise RuntimeError(
+                f"Не удалось загрузить файл: {e}\n"
+                f"Повторная загрузка в {object_name} продолжится с недостающих частей"
+            )
+        if upload['resumed_parts']:
+            print(f"↩️  Продолжена прерванная загрузка: {upload['resumed_parts']} из {upload['parts']} частей уже были в хранилище")
+    
+    def abort_incomplete_uploads(self, object_name: Optional[str] = None, older_than_days: Optional[float] = None) -> int:
+        """
+        Отменяет незавершённые составные загрузки (их части тоже занимают место)
+        
+        Args:
+            object_name: Только загрузки этого объекта (default: все в speechkit/)
+            older_than_days: Только начатые раньше (default: любые)
+            
+        Returns:
+            Число отменённых загрузок (у yc-бэкенда составных загрузок нет — 0)
+        """
+        if self.s3 is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        aborted = 0
+        try:
+            for upload in list(self.s3.list_multipart_uploads(self.bucket_name, prefix=object_name or 'speechkit/')):
+                if object_name is not None and upload['key'] != object_name:
+                    continue
+                if older_than_days is not None:
+                    initiated = datetime.fromisoformat(upload['initiated'].replace('Z', '+00:00'))
+                    if (now - initiated).total_seconds() < older_than_days * 86400:
+                        continue
+                self.s3.abort_multipart_upload(self.bucket_name, upload['key'], upload['upload_id'])
+                aborted += 1
+        except (S3Error, requests.RequestException) as e:
+            print(f"⚠️  Не удалось отменить незавершённые загрузки: {e}")
+        return aborted
+    
+    def _put_object(self, file_path: Path, object_name: str) -> None:
+        """Загружает файл одним запросом выбранного бэкенда"""
+        if self.s3 is not None:
+            try:
+                self.s3.put_object(self.bucket_name, object_name, file_path)
+            except (S3Error, requests.RequestException) as e:
+                raise RuntimeError(f"Не удалось загрузить файл: {e}")
+            return
+        
         try:
             # Загружаем файл через S3 API
-            result = subprocess.run(
+            subprocess.run(
                 [
                     'yc', 'storage', 's3api', 'put-object',
                     '--bucket', self.bucket_name,
@@ -199,17 +1061,6 @@ class YandexObjectStorage:
                 capture_output=True,
                 text=True
             )
-            
-            print(f"✅ Файл загружен: {object_name}")
-            
-            # Получаем публичную ссылку
-            public_url = self._get_public_url(object_name)
-            
-            print(f"🔗 Публичная ссылка:")
-            print(f"   {public_url}")
-            
-            return public_url
-            
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr if e.stderr else str(e)
             raise RuntimeError(f"Не удалось загрузить файл: {error_msg}")
@@ -225,7 +1076,7 @@ class YandexObjectStorage:
             Публичная ссылка
         """
         # Формат: https://storage.yandexcloud.net/{bucket}/{object}
-        return f"https://storage.yandexcloud.net/{self.bucket_name}/{object_name}"
+        return f"{self.endpoint_url}/{self.bucket_name}/{object_name}"
     
     def delete_file(self, object_name: str):
         """
@@ -234,6 +1085,14 @@ class YandexObjectStorage:
         Args:
             object_name: Имя объекта в bucket
         """
+        if self.s3 is not None:
+            try:
+                self.s3.delete_object(self.bucket_name, object_name)
+                print(f"🗑️  Файл удалён: {object_name}")
+            except (S3Error, requests.RequestException) as e:
+                print(f"⚠️  Не удалось удалить файл: {e}")
+            return
+        
         try:
             subprocess.run(
                 [
@@ -257,6 +1116,13 @@ class YandexObjectStorage:
         Returns:
             Список объектов
         """
+        if self.s3 is not None:
+            try:
+                return list(self.s3.list_objects(self.bucket_name))
+            except (S3Error, requests.RequestException) as e:
+                print(f"⚠️  Не удалось получить список файлов: {e}")
+                return []
+        
         try:
             result = subprocess.run(
                 [
@@ -281,12 +1147,15 @@ class YandexObjectStorage:
             print(f"⚠️  Не удалось получить список файлов: {e}")
             return []
     
-    def cleanup_old_files(self, days: int = 7):
+    def cleanup_old_files(self, days: int = 7, other_users: Optional[Callable[[str], int]] = None):
         """
         Удаляет файлы старше указанного количества дней
         
         Args:
             days: Возраст файлов в днях
+            other_users: Сколько заданий других процессов используют объект
+                (например, JobJournal.references); content-addressed объект, который
+                кому-то нужен, не удаляется — повторное использование не обновляет LastModified
         """
         print(f"🧹 Очистка файлов старше {days} дней...")
         
@@ -295,6 +1164,26 @@ class YandexObjectStorage:
         deleted = 0
         
         for obj in files:
+            if self.is_content_key(obj.get('name', '')):
+                # В имени по содержимому даты нет — берём LastModified (есть у S3-бэкенда)
+                if not obj.get('last_modified'):
+                    continue
+                modified = datetime.fromisoformat(obj['last_modified'].replace('Z', '+00:00'))
+                if (datetime.now(timezone.utc) - modified).days <= days:
+                    continue
+                # Под блокировкой ключа: upload_file этого процесса не возьмёт объект до удаления
+                with self._key_lock(obj['name']):
+                    with self._refs_lock:
+                        in_use = obj['name'] in self._refs
+                    if not in_use and other_users is not None:
+                        in_use = other_users(obj['name']) > 0
+                    if in_use:
+                        print(f"🔗 Объект ещё используется, не удаляю: {obj['name']}")
+                        continue
+                    self.delete_file(obj['name'])
+                    deleted += 1
+                continue
+            
             # Парсим дату из имени файла (если есть)
             if 'speechkit/' in obj.get('name', ''):
                 try:
@@ -310,6 +1199,10 @@ class YandexObjectStorage:
                 except (ValueError, IndexError):
                     pass
         
+        aborted = self.abort_incomplete_uploads(older_than_days=days)
+        if aborted > 0:
+            print(f"✅ Отменено незавершённых загрузок: {aborted}")
+        
         if deleted > 0:
             print(f"✅ Удалено файлов: {deleted}")
         else:
@@ -325,12 +1218,18 @@ def main():
     )
     parser.add_argument("file", nargs='?', help="Файл для загрузки")
     parser.add_argument("--bucket", default="dela-speechkit-temp", help="Имя bucket")
+    parser.add_argument("--backend", choices=YandexObjectStorage.BACKENDS, default="auto", help="S3 API или yc CLI")
+    parser.add_argument("--content-addressed", action="store_true", help="Ключ по SHA-256, не загружать повторно")
     parser.add_argument("--list", action="store_true", help="Показать файлы в bucket")
     parser.add_argument("--cleanup", type=int, metavar="DAYS", help="Удалить файлы старше N дней")
     
     args = parser.parse_args()
     
-    storage = YandexObjectStorage(bucket_name=args.bucket)
+    storage = YandexObjectStorage(
+        bucket_name=args.bucket,
+        backend=args.backend,
+        content_addressed=args.content_addressed
+    )
     
     if args.list:
         files = storage.list_files()
@@ -339,7 +1238,13 @@ def main():
             print(f"   {f.get('name')}")
     
     elif args.cleanup is not None:
-        storage.cleanup_old_files(days=args.cleanup)
+        # Объекты по содержимому, нужные незавершённым заданиям listen.py и др., не удаляются
+        try:
+            from yandex_speechkit import JobJournal
+            other_users = JobJournal().references
+        except ImportError:
+            other_users = None
+        storage.cleanup_old_files(days=args.cleanup, other_users=other_users)
     
     elif args.file:
         url = storage.upload_file(args.file)
@@ -23,19 +23,1028 @@ YANDEX SPEECHKIT API V3 - УНИВЕРСАЛЬНЫЙ МОДУЛЬ
     stt = YandexSpeechKit(api_key="YOUR_API_KEY")
     result = stt.transcribe("video.mp4", language="ru-RU")
     print(result['text'])
+    
+    # Пакет: все операции отправляются сразу, опрос общий
+    results = stt.transcribe_many(["a.mp4", "b.mp4"], max_uploads=4)
+    
+    # asyncio: один пул соединений (keep-alive, HTTP/2) на все запросы
+    async with AsyncYandexSpeechKit(max_connections=20) as stt:
+        result = await stt.transcribe("voice.ogg")
+    
+    # Длинная запись: сегменты по паузам распознаются параллельно
+    result = stt.transcribe_split("lecture_3h.mp4", segment_sec=600)
+    
+    # Повторный запуск не загружает и не распознаёт неизменившиеся файлы
+    stt = YandexSpeechKit(transcript_cache=TranscriptCache())
+    
+    # После падения: дождаться уже созданных операций, а не отправлять заново
+    stt = YandexSpeechKit(transcript_cache=TranscriptCache(), job_journal=JobJournal())
+    stt.resume_jobs()
+    
+    # Одинаковые файлы — один объект в bucket (удаляется после последнего задания)
+    stt = YandexSpeechKit(job_journal=JobJournal(), content_addressed=True)
 """
 
 import os
 import time
 import json
+import socket
+import uuid
+import random
+import shutil
+import hashlib
+import tempfile
+import sqlite3
+import asyncio
+import importlib.util
 import requests
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Callable, Iterable, Iterator
 from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+# Опциональный импорт httpx (нужен только AsyncYandexSpeechKit)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
 
-class YandexSpeechKit:
-    """Клиент для работы с Yandex SpeechKit API v3"""
+# HTTP/2 в httpx требует пакет h2 (pip install httpx[http2])
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and importlib.util.find_spec('h2') is not None
+
+
+class PollingPolicy:
+    """
+    Расписание опроса операции распознавания
+    
+    delays() — паузы перед каждой проверкой статуса, timeout_sec — сколько
+    всего ждать. Клиент берёт политику через фабрику polling_policy(duration_sec),
+    так что расписание можно подменить, не трогая код опроса.
+    """
+    
+    timeout_sec: float = 600.0
+    
+    def delays(self) -> Iterator[float]:
+        """Паузы (сек) перед очередными проверками статуса"""
+        raise NotImplementedError
+
+
+class FixedIntervalPolling(PollingPolicy):
+    """Опрос с постоянным интервалом (прежнее поведение: 5 сек × 120 попыток)"""
+    
+    def __init__(self, interval_sec: float = 5.0, max_attempts: int = 120):
+        self.interval_sec = interval_sec
+        self.timeout_sec = interval_sec * max_attempts
+    
+    def delays(self) -> Iterator[float]:
+        while True:
+            yield self.interval_sec
+
+
+class AdaptivePolling(PollingPolicy):
+    """
+    Опрос по длительности аудио
+    
+    Ожидаемое время распознавания — overhead_sec + processing_ratio × длительность.
+    Первая проверка — чуть раньше ожидаемого готового момента (first_poll_fraction),
+    дальше интервал растёт в backoff раз от 10% ожидаемого времени до
+    max_interval_sec, со случайным разбросом ±jitter (пакет не опрашивает
+    API синхронно). Таймаут растёт с длительностью: min_timeout_sec + timeout_ratio ×
+    длительность, поэтому длинные записи не обрываются на фиксированных 10 минутах.
+    """
+    
+    def __init__(
+        self,
+        duration_sec: float,
+        processing_ratio: float = 0.1,
+        overhead_sec: float = 2.0,
+        first_poll_fraction: float = 0.8,
+        min_interval_sec: float = 1.0,
+        max_interval_sec: float = 30.0,
+        backoff: float = 1.5,
+        jitter: float = 0.2,
+        min_timeout_sec: float = 120.0,
+        timeout_ratio: float = 1.0,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            duration_sec: Длительность аудио (например, AudioMetrics.duration_sec)
+            processing_ratio: Доля длительности, за которую SpeechKit обычно распознаёт запись
+            overhead_sec: Постоянная часть времени распознавания (очередь, скачивание)
+            first_poll_fraction: Первая проверка — на этой доле ожидаемого времени
+            min_interval_sec: Минимальная пауза между проверками
+            max_interval_sec: Максимальная пауза между проверками
+            backoff: Множитель интервала после каждой неудачной проверки
+            jitter: Относительный случайный разброс пауз (0.2 = ±20%)
+            min_timeout_sec: Минимальный таймаут
+            timeout_ratio: Прибавка к таймауту на секунду аудио
+            rng: Генератор случайных чисел (для воспроизводимости)
+        """
+        self.duration_sec = max(0.0, duration_sec)
+        self.expected_sec = overhead_sec + processing_ratio * self.duration_sec
+        self.first_poll_fraction = first_poll_fraction
+        self.min_interval_sec = min_interval_sec
+        self.max_interval_sec = max_interval_sec
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout_sec = min_timeout_sec + timeout_ratio * self.duration_sec
+        self._rng = rng or random.Random()
+    
+    def _jittered(self, delay: float) -> float:
+        return delay * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+    
+    def delays(self) -> Iterator[float]:
+        yield self._jittered(max(self.min_interval_sec, self.expected_sec * self.first_poll_fraction))
+        interval = max(self.min_interval_sec, self.expected_sec * 0.1)
+        while True:
+            yield self._jittered(min(interval, self.max_interval_sec))
+            interval *= self.backoff
+
+
+def default_polling_policy(duration_sec: Optional[float]) -> PollingPolicy:
+    """Адаптивный опрос, если длительность известна, иначе прежний фиксированный"""
+    if duration_sec:
+        return AdaptivePolling(duration_sec)
+    return FixedIntervalPolling()
+
+
+def probe_audio_duration_sec(
+    file_path: Path,
+    audio_format: str = "AUTO",
+    sample_rate_hertz: int = 16000
+) -> Optional[float]:
+    """
+    Длительность локального файла для расписания опроса
+    
+    LINEAR16_PCM (сырой моно PCM) считается по размеру, остальное —
+    через ffprobe (AudioPreprocessor.get_audio_metrics).
+    
+    Returns:
+        Длительность в секундах или None, если определить не удалось
+    """
+    file_path = Path(file_path)
+    if audio_format == "LINEAR16_PCM":
+        return file_path.stat().st_size / (2 * sample_rate_hertz)
+    try:
+        from audio_preprocessor import AudioPreprocessor, FFMPEG_AVAILABLE
+        if not FFMPEG_AVAILABLE:
+            return None
+        return AudioPreprocessor().get_audio_metrics(file_path).duration_sec or None
+    except Exception:
+        return None
+
+
+# Общее хранилище транскриптов для listen.py и пакетных задач
+DEFAULT_TRANSCRIPT_CACHE = Path(__file__).parent.parent / "telegram-bot" / "data" / "transcripts.sqlite3"
+
+
+class TranscriptCache:
+    """
+    Локальное хранилище транскриптов (SQLite)
+    
+    Ключ — SHA-256 содержимого файла вместе с параметрами распознавания
+    (model, language, literature_text, speaker_labeling, profanity_filter,
+    audio_format) и профилем предобработки. Каждая запись помечена версией
+    модели: запись с другой версией считается промахом, а invalidate_model()
+    удаляет устаревшие записи. Хэши файлов запоминаются по (путь, размер,
+    mtime), чтобы не перечитывать большие видео при каждом запуске.
+    
+    База открывается на каждую операцию и работает в WAL-режиме, поэтому
+    её могут одновременно использовать несколько процессов и потоков.
+    """
+    
+    HASH_CHUNK_SIZE = 1024 * 1024
+    # Версия структуры результата: записи старых парсеров не переиспользуются
+    RESULT_FORMAT = 2
+    
+    def __init__(self, db_path: Path | str = DEFAULT_TRANSCRIPT_CACHE):
+        """
+        Args:
+            db_path: Путь к файлу базы (default: telegram-bot/data/transcripts.sqlite3)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    file_name TEXT,
+                    created_at REAL NOT NULL,
+                    result TEXT NOT NULL
+                )
+                """
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS transcripts_model ON transcripts (model, model_version)"
+            )
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+                """
+            )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение на одну операцию: транзакция фиксируется и соединение закрывается"""
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+    
+    def hash_file(self, file_path: Path) -> str:
+        """SHA-256 содержимого (запоминается, пока размер и mtime файла не изменились)"""
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (str(file_path), stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row[0]
+        
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (str(file_path), stat.st_size, stat.st_mtime_ns, content_hash)
+            )
+        return content_hash
+    
+    @staticmethod
+    def make_key(content_hash: str, params: Dict) -> str:
+        """Детерминированный ключ из хэша содержимого и параметров распознавания"""
+        payload = json.dumps({'content': content_hash, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def key_for(
+        self,
+        file_path: Path,
+        model: str,
+        language: str,
+        literature_text: bool,
+        speaker_labeling: bool,
+        profanity_filter: bool = False,
+        audio_format: str = "AUTO",
+        preprocessing_profile: Optional[str] = None
+    ) -> tuple:
+        """
+        Returns:
+            (key, content_hash, params) для get()/put()
+        """
+        content_hash = self.hash_file(file_path)
+        params = {
+            'model': model,
+            'language': language,
+            'literature_text': literature_text,
+            'speaker_labeling': speaker_labeling,
+            'profanity_filter': profanity_filter,
+            'audio_format': audio_format,
+            'preprocessing_profile': preprocessing_profile,
+            'result_format': self.RESULT_FORMAT
+        }
+        return self.make_key(content_hash, params), content_hash, params
+    
+    def get(self, key: str, model_version: str) -> Optional[Dict]:
+        """
+        Returns:
+            Сохранённый результат или None (нет записи или другая версия модели)
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT result FROM transcripts WHERE key = ? AND model_version = ?",
+                (key, model_version)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(
+        self,
+        key: str,
+        content_hash: str,
+        params: Dict,
+        model_version: str,
+        result: Dict,
+        file_name: Optional[str] = None
+    ) -> None:
+        """Сохраняет результат распознавания (заменяет запись с тем же ключом)"""
+        with self._connect() as db:
+            db.execute(
+                """
+                INSERT OR REPLACE INTO transcripts
+                    (key, content_hash, model, model_version, params, file_name, created_at, result)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    content_hash,
+                    params['model'],
+                    model_version,
+                    json.dumps(params, sort_keys=True),
+                    file_name,
+                    time.time(),
+                    json.dumps(result, ensure_ascii=False)
+                )
+            )
+    
+    def invalidate_model(self, model: str, keep_version: Optional[str] = None) -> int:
+        """
+        Удаляет транскрипты модели (например, после обновления модели в SpeechKit)
+        
+        Args:
+            model: Модель распознавания ('general', 'general:rc', ...)
+            keep_version: Оставить записи этой версии (None — удалить все)
+            
+        Returns:
+            Число удалённых записей
+        """
+        with self._connect() as db:
+            if keep_version is None:
+                cursor = db.execute("DELETE FROM transcripts WHERE model = ?", (model,))
+            else:
+                cursor = db.execute(
+                    "DELETE FROM transcripts WHERE model = ? AND model_version != ?",
+                    (model, keep_version)
+                )
+            return cursor.rowcount
+    
+    def entries(self) -> Iterator[tuple]:
+        """Все сохранённые транскрипты: (file_name, result), от старых к новым"""
+        with self._connect() as db:
+            rows = db.execute("SELECT file_name, result FROM transcripts ORDER BY created_at").fetchall()
+        for file_name, result in rows:
+            yield file_name, json.loads(result)
+    
+    def stats(self) -> Dict[str, int]:
+        """Число записей по версиям моделей"""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT model || '@' || model_version, COUNT(*) FROM transcripts GROUP BY model, model_version"
+            ).fetchall()
+        return dict(rows)
+
+
+# Журнал незавершённых заданий (resume_jobs после перезапуска)
+DEFAULT_JOB_JOURNAL = Path(__file__).parent.parent / "telegram-bot" / "data" / "speechkit_jobs.sqlite3"
+# Сколько прерванная загрузка ждёт продолжения, прежде чем resume_jobs её отменит
+RESUMABLE_UPLOAD_SEC = 7 * 24 * 3600
+# Результаты асинхронного распознавания хранятся на сервере 3 суток
+OPERATION_RETENTION_SEC = 3 * 24 * 3600
+
+
+class OperationError(Exception):
+    """Операция распознавания завершилась с ошибкой (или не найдена): повторный опрос не поможет"""
+
+
+class UploadError(RuntimeError):
+    """Файл не загрузился в Object Storage: задание остаётся в журнале, повторный вызов продолжит загрузку"""
+
+
+class JobJournal:
+    """
+    Журнал заданий распознавания (SQLite): файл → объект в bucket → операция → состояние
+    
+    Запись создаётся до загрузки (имя объекта выбирается заранее) и
+    обновляется на каждом шаге: uploading → uploaded → submitted. После
+    получения результата и удаления временного объекта запись удаляется;
+    если объект удалить не удалось — остаётся в состоянии orphaned.
+    
+    Журнал общий для всех инструментов (listen.py, retranscribe_videos.py),
+    поэтому у записи есть владелец — процесс, который её ведёт (хост:pid).
+    YandexSpeechKit.resume_jobs() забирает только задания завершившихся
+    процессов (claim_abandoned): дожидается их операций и удаляет
+    осиротевшие объекты вместо повторной загрузки и оплаты. Задание,
+    прерванное во время загрузки, забирает следующий запуск для того же
+    файла (claim_upload): загрузка идёт в тот же объект и продолжается
+    с первой недостающей части. Записи процессов другого хоста считаются
+    живыми: проверить их нельзя.
+    """
+    
+    STATES = ('uploading', 'uploaded', 'submitted', 'orphaned')
+    
+    def __init__(self, db_path: Path | str = DEFAULT_JOB_JOURNAL):
+        """
+        Args:
+            db_path: Путь к файлу базы (default: telegram-bot/data/speechkit_jobs.sqlite3)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT NOT NULL,
+                    object_name TEXT,
+                    uri TEXT,
+                    operation_id TEXT,
+                    state TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    cache_entry TEXT,
+                    duration_sec REAL,
+                    cleanup_after INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT
+                )
+                """
+            )
+            # Журнал из версии без владельцев: такие записи считаются брошенными
+            columns = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            if 'owner' not in columns:
+                db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Соединение на одну операцию: транзакция фиксируется и соединение закрывается"""
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+    
+    @property
+    def owner(self) -> str:
+        """Владелец записей этого процесса (после fork — уже другой)"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+    
+    @staticmethod
+    def owner_alive(owner: Optional[str]) -> bool:
+        """Жив ли процесс-владелец записи (процессы другого хоста считаются живыми)"""
+        if not owner:
+            return False
+        host, _, pid = owner.rpartition(':')
+        if host != socket.gethostname():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except (ProcessLookupError, ValueError):
+            return False
+        except PermissionError:
+            # Процесс есть, но принадлежит другому пользователю
+            return True
+        return True
+    
+    @staticmethod
+    def make_object_name(file_path: Path) -> str:
+        """Имя объекта в формате YandexObjectStorage.upload_file (читается cleanup_old_files)"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"speechkit/{timestamp}_{uuid.uuid4().hex[:8]}_{Path(file_path).name}"
+    
+    def begin(
+        self,
+        file_path: Path,
+        object_name: str,
+        recognition_options: Dict,
+        cache_entry: Optional[tuple] = None,
+        cleanup_after: bool = True
+    ) -> int:
+        """
+        Записывает задание перед загрузкой
+        
+        Returns:
+            ID записи для update() и remove()
+        """
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                """
+                INSERT INTO jobs
+                    (file_path, object_name, state, options, cache_entry, cleanup_after, created_at, updated_at, owner)
+                VALUES (?, ?, 'uploading', ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    str(Path(file_path).resolve()),
+                    object_name,
+                    json.dumps(recognition_options, sort_keys=True),
+                    json.dumps(cache_entry) if cache_entry is not None else None,
+                    int(cleanup_after),
+                    now,
+                    now,
+                    self.owner
+                )
+            )
+            return cursor.lastrowid
+    
+    def claim_upload(self, file_path: Path, recognition_options: Dict) -> Optional[tuple]:
+        """
+        Забирает задание завершившегося процесса, прерванное во время загрузки того же файла
+        
+        Args:
+            file_path: Файл
+            recognition_options: Параметры распознавания (должны совпасть)
+        
+        Returns:
+            (job_id, object_name) или None; забранная запись больше не возвращается
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                """
+                SELECT id, object_name, owner FROM jobs
+                WHERE file_path = ? AND options = ? AND state = 'uploading'
+                ORDER BY id DESC
+                """,
+                (str(Path(file_path).resolve()), json.dumps(recognition_options, sort_keys=True))
+            ).fetchall()
+        for job_id, object_name, owner in rows:
+            if not self.owner_alive(owner) and self._take(job_id, owner):
+                return job_id, object_name
+        return None
+    
+    def claim_abandoned(self) -> List[Dict]:
+        """
+        Забирает задания процессов, которые завершились, не доведя их до конца
+        
+        Returns:
+            Забранные задания в порядке создания (как pending()); теперь их владелец — этот процесс
+        """
+        return [
+            job for job in self.pending()
+            if not self.owner_alive(job['owner']) and self._take(job['id'], job['owner'])
+        ]
+    
+    def release(self, job_id: int) -> None:
+        """Отказывается от задания: его заберёт claim_upload или resume_jobs любого процесса"""
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET owner = NULL WHERE id = ?", (job_id,))
+    
+    def _take(self, job_id: int, owner: Optional[str]) -> bool:
+        """Переписывает задание на этот процесс, если его не забрал кто-то раньше"""
+        with self._connect() as db:
+            # Условие на прежнего владельца: другой процесс мог забрать запись между SELECT и UPDATE
+            return db.execute(
+                "UPDATE jobs SET owner = ? WHERE id = ? AND owner IS ?",
+                (self.owner, job_id, owner)
+            ).rowcount == 1
+    
+    def update(self, job_id: int, **fields) -> None:
+        """Обновляет state, uri, operation_id и/или duration_sec"""
+        unknown = set(fields) - {'state', 'uri', 'operation_id', 'duration_sec'}
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        if fields.get('state', self.STATES[0]) not in self.STATES:
+            raise ValueError(f"Unknown job state: {fields['state']}")
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(
+                f"UPDATE jobs SET {columns}, updated_at = ? WHERE id = ?",
+                (*fields.values(), time.time(), job_id)
+            )
+    
+    def references(self, object_name: str, exclude: Optional[int] = None) -> int:
+        """
+        Сколько незавершённых заданий (любых процессов) используют объект
+        
+        Args:
+            object_name: Имя объекта в bucket
+            exclude: ID задания, которое не считать (обычно текущее)
+        """
+        with self._connect() as db:
+            return db.execute(
+                """
+                SELECT COUNT(*) FROM jobs
+                WHERE object_name = ? AND state IN ('uploading', 'uploaded', 'submitted') AND id != ?
+                """,
+                (object_name, -1 if exclude is None else exclude)
+            ).fetchone()[0]
+    
+    def remove(self, job_id: int) -> None:
+        """Удаляет завершённое задание"""
+        with self._connect() as db:
+            db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    
+    def pending(self) -> List[Dict]:
+        """Незавершённые задания всех процессов в порядке создания"""
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            rows = db.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['file_path'] = Path(job['file_path'])
+            job['options'] = json.loads(job['options'])
+            job['cache_entry'] = tuple(json.loads(job['cache_entry'])) if job['cache_entry'] else None
+            job['cleanup_after'] = bool(job['cleanup_after'])
+            jobs.append(job)
+        return jobs
+
+
+class RecognitionResultParser:
+    """
+    Инкрементальный разбор NDJSON-ответа getRecognition
+    
+    Строки подаются по одной (feed) прямо из HTTP-потока, поэтому ответ
+    целиком в памяти не держится. Результат строится вокруг индекса фраз
+    (utterances): каждая строка 'final' — отдельная фраза с каналом,
+    началом/концом в мс, текстом, словами и спикером; 'finalRefinement'
+    дописывает нормализованный текст в свою фразу по (канал, finalIndex).
+    Полный текст, субтитры и разбивка по спикерам собираются из индекса
+    за один проход (result, build_cues / write_subtitles, speaker_view).
+    
+    Сырые объекты строк ('raw') и чанки результатов ('chunks')
+    сохраняются только при keep_raw=True.
+    """
+    
+    def __init__(self, keep_raw: bool = False):
+        """
+        Args:
+            keep_raw: Сохранять разобранные строки ответа в results['raw'] и results['chunks']
+        """
+        self.keep_raw = keep_raw
+        self.utterances: List[Dict] = []
+        self.raw: List[Dict] = []
+        self.chunks: List[Dict] = []
+        # (channel, finalIndex) -> позиция фразы в self.utterances
+        self._by_final_index: Dict[tuple, int] = {}
+    
+    def feed(self, line: str | bytes) -> Optional[Dict]:
+        """
+        Разбирает одну строку ответа
+        
+        Args:
+            line: Строка NDJSON (пустые пропускаются)
+            
+        Returns:
+            Новая фраза индекса, если строка содержит финальный результат
+        """
+        if not line or not line.strip():
+            return None
+        
+        chunk = json.loads(line)
+        if self.keep_raw:
+            self.raw.append(chunk)
+        
+        if 'result' not in chunk:
+            return None
+        
+        result = chunk['result']
+        if self.keep_raw:
+            self.chunks.append(result)
+        
+        channel = str(result.get('channelTag', '0'))
+        utterance = None
+        
+        # Финальный результат — новая фраза
+        if 'final' in result:
+            final = result['final']
+            if final.get('alternatives'):
+                alt = final['alternatives'][0]
+                channel = str(final.get('channelTag', channel))
+                words = alt.get('words', [])
+                utterance = {
+                    'channel': channel,
+                    'start_ms': int(alt.get('startTimeMs', words[0].get('startTimeMs', 0) if words else 0)),
+                    'end_ms': int(alt.get('endTimeMs', words[-1].get('endTimeMs', 0) if words else 0)),
+                    'text': alt.get('text', ''),
+                    'normalized_text': None,
+                    'words': words,
+                    'speaker': alt.get('speaker_tag', alt.get('speakerTag'))
+                }
+                final_index = result.get('audioCursors', {}).get('finalIndex')
+                if final_index is not None:
+                    self._by_final_index[(channel, str(final_index))] = len(self.utterances)
+                self.utterances.append(utterance)
+        
+        # Нормализованный текст — к фразе с тем же finalIndex
+        if 'finalRefinement' in result:
+            refinement = result['finalRefinement']
+            normalized = refinement.get('normalizedText')
+            if normalized is not None:
+                alternatives = normalized.get('alternatives')
+                text = alternatives[0].get('text', '') if alternatives else normalized.get('text', '')
+                position = self._by_final_index.get((channel, str(refinement.get('finalIndex'))))
+                if position is None and self.utterances:
+                    # Без finalIndex уточнение относится к последней фразе
+                    position = len(self.utterances) - 1
+                if position is not None:
+                    self.utterances[position]['normalized_text'] = text
+        
+        return utterance
+    
+    def iter_utterances(self, lines: Iterable[str | bytes]) -> Iterator[Dict]:
+        """Подаёт строки по очереди и выдаёт финальные фразы по мере появления"""
+        for line in lines:
+            utterance = self.feed(line)
+            if utterance is not None:
+                yield utterance
+    
+    def result(self) -> Dict:
+        """
+        Структурированные результаты по всем поданным строкам
+        
+        Returns:
+            Словарь: utterances (индекс фраз), text / normalized_text (все фразы
+            через пробел), words, speakers, chunks / raw (при keep_raw)
+        """
+        return assemble_recognition_result(self.utterances, self.chunks, self.raw)
+
+
+def assemble_recognition_result(
+    utterances: List[Dict],
+    chunks: Optional[List[Dict]] = None,
+    raw: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    Собирает словарь результатов из индекса фраз за один проход
+    
+    Args:
+        utterances: Индекс фраз (как у RecognitionResultParser)
+        chunks: Чанки результатов (при keep_raw)
+        raw: Разобранные строки ответа (при keep_raw)
+        
+    Returns:
+        Словарь: utterances, text / normalized_text (все фразы через пробел),
+        words, speakers, chunks, raw
+    """
+    texts = []
+    normalized = []
+    has_normalized = False
+    speakers = []
+    words = []
+    for utterance in utterances:
+        texts.append(utterance['text'])
+        if utterance['normalized_text'] is not None:
+            has_normalized = True
+            normalized.append(utterance['normalized_text'])
+        else:
+            normalized.append(utterance['text'])
+        if utterance['speaker'] is not None:
+            speakers.append({'speaker_tag': utterance['speaker'], 'text': utterance['text']})
+        words.extend(utterance['words'])
+    
+    return {
+        'text': ' '.join(t for t in texts if t),
+        'normalized_text': ' '.join(t for t in normalized if t) if has_normalized else '',
+        'utterances': utterances,
+        'words': words,
+        'chunks': chunks if chunks is not None else [],
+        'speakers': speakers,
+        'raw': raw if raw is not None else []
+    }
+
+
+def merge_split_results(segments: List[tuple[int, int, int, Dict]]) -> Dict:
+    """
+    Склеивает результаты сегментов одной записи (transcribe_split)
+    
+    Метки времени фраз и слов сдвигаются на начало сегмента и становятся
+    абсолютными. Соседние сегменты перекрываются, поэтому слово остаётся
+    только в том сегменте, чьему окну принадлежит его середина; фраза,
+    потерявшая часть слов, собирается из оставшихся (без нормализованного
+    текста), фраза без слов — отбрасывается.
+    
+    Args:
+        segments: Список (offset_ms, keep_from_ms, keep_to_ms, result) по порядку;
+            keep_from_ms / keep_to_ms — окно сегмента в абсолютном времени
+        
+    Returns:
+        Словарь результатов, как у RecognitionResultParser.result()
+    """
+    utterances: List[Dict] = []
+    for offset_ms, keep_from_ms, keep_to_ms, result in segments:
+        for utterance in result.get('utterances', []):
+            words = []
+            for word in utterance['words']:
+                start = int(word.get('startTimeMs', 0)) + offset_ms
+                end = int(word.get('endTimeMs', 0)) + offset_ms
+                if keep_from_ms <= (start + end) // 2 < keep_to_ms:
+                    words.append({**word, 'startTimeMs': str(start), 'endTimeMs': str(end)})
+            
+            if not utterance['words']:
+                middle = (utterance['start_ms'] + utterance['end_ms']) // 2 + offset_ms
+                if not keep_from_ms <= middle < keep_to_ms:
+                    continue
+                utterance = {
+                    **utterance,
+                    'start_ms': utterance['start_ms'] + offset_ms,
+                    'end_ms': utterance['end_ms'] + offset_ms
+                }
+            elif not words:
+                continue
+            elif len(words) == len(utterance['words']):
+                utterance = {
+                    **utterance,
+                    'start_ms': utterance['start_ms'] + offset_ms,
+                    'end_ms': utterance['end_ms'] + offset_ms,
+                    'words': words
+                }
+            else:
+                # Часть фразы — в перекрытии: текст собираем из оставшихся слов
+                utterance = {
+                    **utterance,
+                    'start_ms': int(words[0]['startTimeMs']),
+                    'end_ms': int(words[-1]['endTimeMs']),
+                    'text': ' '.join(word.get('text', '') for word in words),
+                    'normalized_text': None,
+                    'words': words
+                }
+            utterances.append(utterance)
+    
+    return assemble_recognition_result(utterances)
+
+
+def speaker_view(utterances: List[Dict]) -> List[Dict]:
+    """
+    Реплики по спикерам: подряд идущие фразы одного спикера склеиваются
+    
+    Без меток спикеров говорящим считается канал.
+    
+    Args:
+        utterances: Индекс фраз (results['utterances'])
+        
+    Returns:
+        Список {'speaker', 'start_ms', 'end_ms', 'text'}
+    """
+    turns: List[Dict] = []
+    for utterance in utterances:
+        speaker = utterance['speaker'] if utterance['speaker'] is not None else f"channel {utterance['channel']}"
+        text = utterance['normalized_text'] or utterance['text']
+        if turns and turns[-1]['speaker'] == speaker:
+            turns[-1]['end_ms'] = utterance['end_ms']
+            turns[-1]['parts'].append(text)
+        else:
+            turns.append({
+                'speaker': speaker,
+                'start_ms': utterance['start_ms'],
+                'end_ms': utterance['end_ms'],
+                'parts': [text]
+            })
+    for turn in turns:
+        turn['text'] = ' '.join(p for p in turn.pop('parts') if p)
+    return turns
+
+
+# Конец предложения — конец субтитра; внутри предложения — перенос строки
+SENTENCE_END = ('.', '!', '?', '…')
+CLAUSE_END = (',', ';', ':', '—', '–')
+
+
+def build_cues(
+    utterances: Iterable[Dict],
+    max_chars_per_line: int = 42,
+    max_lines: int = 2,
+    max_pause_ms: int = 700,
+    max_duration_ms: int = 7000
+) -> Iterator[Dict]:
+    """
+    Субтитры из индекса фраз за один линейный проход по словам
+    
+    Субтитр заканчивается на конце предложения, на паузе длиннее
+    max_pause_ms, на границе фразы распознавания, при превышении
+    max_duration_ms или когда слово не помещается в max_lines строк по
+    max_chars_per_line символов. Запятая и другие знаки внутри предложения
+    переносят строку, если она заполнена хотя бы наполовину. Строки
+    собираются списками слов и склеиваются один раз на субтитр.
+    
+    Args:
+        utterances: Индекс фраз (results['utterances'])
+        max_chars_per_line: Максимум символов в строке (default: 42)
+        max_lines: Строк в субтитре (default: 2)
+        max_pause_ms: Пауза между словами, разрывающая субтитр (default: 700)
+        max_duration_ms: Максимальная длительность субтитра (default: 7000)
+        
+    Yields:
+        {'start_ms', 'end_ms', 'lines'} по порядку
+    """
+    lines: List[List[str]] = []
+    line_chars = 0
+    start_ms = end_ms = 0
+    
+    def cue() -> Dict:
+        return {'start_ms': start_ms, 'end_ms': end_ms, 'lines': [' '.join(line) for line in lines if line]}
+    
+    for utterance in utterances:
+        if lines:
+            yield cue()
+            lines = []
+        
+        words = utterance['words']
+        if not words:
+            # Фраза без слов — один субтитр на всю фразу
+            if utterance['text']:
+                yield {'start_ms': utterance['start_ms'], 'end_ms': utterance['end_ms'], 'lines': [utterance['text']]}
+            continue
+        
+        for word in words:
+            text = word.get('text', '')
+            if not text:
+                continue
+            word_start = int(word.get('startTimeMs', 0))
+            word_end = int(word.get('endTimeMs', 0))
+            
+            if lines and (word_start - end_ms > max_pause_ms or word_end - start_ms > max_duration_ms):
+                yield cue()
+                lines = []
+            
+            if not lines:
+                lines = [[text]]
+                line_chars = len(text)
+                start_ms = word_start
+            elif not lines[-1]:
+                lines[-1].append(text)
+                line_chars = len(text)
+            elif line_chars + 1 + len(text) <= max_chars_per_line:
+                lines[-1].append(text)
+                line_chars += 1 + len(text)
+            elif len(lines) < max_lines:
+                lines.append([text])
+                line_chars = len(text)
+            else:
+                yield cue()
+                lines = [[text]]
+                line_chars = len(text)
+                start_ms = word_start
+            end_ms = word_end
+            
+            if text.endswith(SENTENCE_END):
+                yield cue()
+                lines = []
+            elif text.endswith(CLAUSE_END) and line_chars * 2 >= max_chars_per_line:
+                if len(lines) < max_lines:
+                    lines.append([])
+                    line_chars = 0
+                else:
+                    yield cue()
+                    lines = []
+    
+    if lines:
+        yield cue()
+
+
+def format_timestamp(ms: int, separator: str = ',') -> str:
+    """HH:MM:SS,mmm (SRT) или HH:MM:SS.mmm (WebVTT, separator='.')"""
+    hours, rest = divmod(int(ms), 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def write_subtitles(cues: Iterable[Dict], output, format: str = 'srt') -> int:
+    """
+    Пишет субтитры в открытый текстовый файл по одному
+    
+    Args:
+        cues: Субтитры build_cues (итератор — весь файл в памяти не строится)
+        output: Файловый объект для записи
+        format: 'srt' или 'vtt' (WebVTT)
+        
+    Returns:
+        Число записанных субтитров
+    """
+    if format not in ('srt', 'vtt'):
+        raise ValueError(f"Неподдерживаемый формат субтитров: {format}")
+    separator = ',' if format == 'srt' else '.'
+    if format == 'vtt':
+        output.write("WEBVTT\n\n")
+    
+    count = 0
+    for cue in cues:
+        lines = [line for line in cue['lines'] if line]
+        if not lines:
+            continue
+        count += 1
+        if format == 'srt':
+            output.write(f"{count}\n")
+        output.write(
+            f"{format_timestamp(cue['start_ms'], separator)} --> {format_timestamp(cue['end_ms'], separator)}\n"
+        )
+        output.write('\n'.join(lines))
+        output.write('\n\n')
+    return count
+
+
+class SpeechKitBase:
+    """
+    Общая часть YandexSpeechKit и AsyncYandexSpeechKit (без HTTP-транспорта)
+    
+    Настройки и авторизация, кэш транскриптов, журнал заданий, загрузка
+    в Object Storage и очистка, тело запроса recognizeFileAsync, склейка
+    сегментов и сохранение транскрипта. Запросы к API SpeechKit
+    (start_recognition, get_operation, get_recognition) и ожидание
+    операций у каждого клиента свои: синхронные или корутины.
+    """
     
     # API endpoints
     STT_ASYNC_URL = "https://stt.api.cloud.yandex.net:443/stt/v3/recognizeFileAsync"
@@ -46,7 +1055,14 @@ class YandexSpeechKit:
         self,
         api_key: Optional[str] = None,
         iam_token: Optional[str] = None,
-        folder_id: Optional[str] = None
+        folder_id: Optional[str] = None,
+        polling_policy: Optional[Callable[[Optional[float]], PollingPolicy]] = None,
+        transcript_cache: Optional[TranscriptCache] = None,
+        model_version: Optional[str] = None,
+        keep_raw: bool = False,
+        api_base_url: Optional[str] = None,
+        job_journal: Optional[JobJournal] = None,
+        content_addressed: bool = False
     ):
         """
         Инициализация клиента
@@ -55,6 +1071,20 @@ class YandexSpeechKit:
             api_key: API ключ сервисного аккаунта (приоритет)
             iam_token: IAM токен (альтернатива API ключу)
             folder_id: ID каталога Yandex Cloud (опционально)
+            polling_policy: Фабрика расписания опроса по длительности аудио
+                (default: default_polling_policy)
+            transcript_cache: Хранилище транскриптов (None — без кэша)
+            model_version: Метка версии модели для записей кэша
+                (default: YANDEX_SPEECHKIT_MODEL_VERSION или 'default')
+            keep_raw: Сохранять сырые строки ответа в results['raw'] и ['chunks']
+                (для отладки; на многочасовых записях это десятки мегабайт)
+            api_base_url: Один адрес для stt и operation API вместо облачных
+                (default: YANDEX_SPEECHKIT_API_BASE_URL; например, локальный
+                стенд fake_speechkit_server.py)
+            job_journal: Журнал заданий для resume_jobs() после перезапуска (None — без журнала)
+            content_addressed: Загружать под ключом по SHA-256 содержимого: повторное
+                распознавание того же файла не загружает его заново, а cleanup_after
+                не удаляет объект, пока его используют другие задания
         """
         self.api_key = api_key or os.getenv('YANDEX_SPEECHKIT_API_KEY')
         self.iam_token = iam_token or os.getenv('YANDEX_IAM_TOKEN')
@@ -66,6 +1096,21 @@ class YandexSpeechKit:
                 "Установите переменные окружения: "
                 "YANDEX_SPEECHKIT_API_KEY или YANDEX_IAM_TOKEN"
             )
+        
+        self.polling_policy = polling_policy or default_polling_policy
+        self.transcript_cache = transcript_cache
+        self.job_journal = job_journal
+        self.content_addressed = content_addressed
+        self.keep_raw = keep_raw
+        self.model_version = model_version or os.getenv('YANDEX_SPEECHKIT_MODEL_VERSION', 'default')
+        self._storage = None
+        
+        api_base_url = api_base_url or os.getenv('YANDEX_SPEECHKIT_API_BASE_URL')
+        if api_base_url:
+            api_base_url = api_base_url.rstrip('/')
+            self.STT_ASYNC_URL = f"{api_base_url}/stt/v3/recognizeFileAsync"
+            self.OPERATION_URL = f"{api_base_url}/operations"
+            self.RECOGNITION_URL = f"{api_base_url}/stt/v3/getRecognition"
     
     def _get_auth_header(self) -> Dict[str, str]:
         """Формирует заголовок авторизации"""
@@ -73,21 +1118,19 @@ class YandexSpeechKit:
             return {"Authorization": f"Api-Key {self.api_key}"}
         return {"Authorization": f"Bearer {self.iam_token}"}
     
-    def _upload_to_object_storage(self, file_path: Path) -> str:
+    def _upload_to_object_storage(self, file_path: Path, object_name: Optional[str] = None) -> str:
         """
-        Загружает файл в Yandex Object Storage через yc CLI
+        Загружает файл в Yandex Object Storage (S3 API или yc CLI)
         
         Args:
             file_path: Путь к локальному файлу
+            object_name: Имя объекта (default: выбирает YandexObjectStorage)
             
         Returns:
             Публичная ссылка на файл в Object Storage
         """
         try:
-            from yandex_object_storage import YandexObjectStorage
-            
-            storage = YandexObjectStorage()
-            public_url = storage.upload_file(file_path)
+            public_url = self._get_storage().upload_file(file_path, object_name)
             
             return public_url
             
@@ -97,12 +1140,360 @@ class YandexSpeechKit:
                 "Убедитесь, что tools/yandex_object_storage.py существует"
             )
         except Exception as e:
-            raise RuntimeError(
+            raise UploadError(
                 f"Не удалось загрузить файл в Object Storage: {e}\n\n"
                 f"Альтернатива: загрузите файл вручную и используйте "
                 f"transcribe_from_uri(uri)"
             )
     
+    def _get_storage(self):
+        """Один клиент Object Storage на экземпляр (пул S3-соединений, проверка bucket — один раз)"""
+        if self._storage is None:
+            from yandex_object_storage import YandexObjectStorage
+            self._storage = YandexObjectStorage(content_addressed=self.content_addressed)
+        return self._storage
+    
+    def _cache_lookup(
+        self,
+        file_path: Path,
+        recognition_options: Dict,
+        preprocessing_profile: Optional[str]
+    ) -> tuple:
+        """
+        Ищет транскрипт в кэше (без сетевых запросов)
+        
+        Returns:
+            (cache_entry, cached_result): cache_entry передаётся в _cache_store
+            после распознавания; оба None, если кэш выключен
+        """
+        if self.transcript_cache is None:
+            return None, None
+        entry = self.transcript_cache.key_for(
+            file_path,
+            preprocessing_profile=preprocessing_profile,
+            **recognition_options
+        )
+        return entry, self.transcript_cache.get(entry[0], self.model_version)
+    
+    def _cache_store(self, cache_entry: Optional[tuple], result: Dict, file_path: Path) -> None:
+        """Сохраняет успешный результат в кэш"""
+        if cache_entry is None or 'error' in result:
+            return
+        key, content_hash, params = cache_entry
+        try:
+            self.transcript_cache.put(key, content_hash, params, self.model_version, result, file_path.name)
+        except sqlite3.Error as e:
+            print(f"⚠️  Не удалось сохранить транскрипт в кэш: {e}")
+    
+    def _delete_uploaded(self, uri: str, job_id: Optional[int] = None) -> None:
+        """Удаляет временный объект, загруженный _upload_to_object_storage"""
+        storage = self._get_storage()
+        # Извлекаем имя объекта из URI
+        object_name = uri.split(storage.bucket_name + '/')[-1]
+        self._release_object(object_name, job_id)
+    
+    def _release_object(self, object_name: str, job_id: Optional[int] = None) -> None:
+        """
+        Удаляет объект задания; объект по содержимому — только если он больше никому не нужен
+        
+        Кроме ссылок этого процесса (YandexObjectStorage.release_file)
+        учитываются незавершённые задания других процессов из job_journal.
+        """
+        storage = self._get_storage()
+        if not storage.is_content_key(object_name):
+            storage.delete_file(object_name)
+            return
+        journal = self.job_journal
+        storage.release_file(
+            object_name,
+            other_users=lambda: journal.references(object_name, exclude=job_id) if journal is not None else 0
+        )
+    
+    def _journal_begin(
+        self,
+        file_path: Path,
+        recognition_options: Dict,
+        cache_entry: Optional[tuple],
+        cleanup_after: bool
+    ) -> tuple:
+        """
+        Записывает задание в журнал перед загрузкой
+        
+        Returns:
+            (job_id, object_name): оба None, если журнал выключен
+        """
+        if self.job_journal is None:
+            return None, None
+        claimed = self.job_journal.claim_upload(file_path, recognition_options)
+        if claimed is not None:
+            print(f"↩️  {file_path.name}: продолжаю прерванную загрузку")
+            return claimed
+        if self.content_addressed:
+            object_name = self._get_storage().content_key(file_path, cache_entry[1] if cache_entry else None)
+        else:
+            object_name = self.job_journal.make_object_name(file_path)
+        job_id = self.job_journal.begin(file_path, object_name, recognition_options, cache_entry, cleanup_after)
+        return job_id, object_name
+    
+    def _journal_update(self, job_id: Optional[int], **fields) -> None:
+        if job_id is not None:
+            self.job_journal.update(job_id, **fields)
+    
+    def _finish_upload(self, job_id: Optional[int], uri: Optional[str], cleanup_after: bool) -> None:
+        """Удаляет временный объект и закрывает запись журнала"""
+        if cleanup_after and uri:
+            # Сначала orphaned: задание больше не держит объект (references его не считает),
+            # а при сбое удаления объект удалит resume_jobs() при следующем запуске
+            self._journal_update(job_id, state='orphaned')
+            try:
+                self._delete_uploaded(uri, job_id)
+            except Exception as e:
+                print(f"⚠️  Не удалось удалить временный файл: {e}")
+                return
+        elif uri and self.content_addressed:
+            # Объект оставлен, но ссылка этого задания больше не нужна
+            storage = self._get_storage()
+            object_name = uri.split(storage.bucket_name + '/')[-1]
+            if storage.is_content_key(object_name):
+                storage.release_file(object_name, keep=True)
+        if job_id is not None:
+            self.job_journal.remove(job_id)
+    
+    def _keep_upload(self, job_id: Optional[int]) -> None:
+        """
+        Оставляет задание с неудавшейся загрузкой в журнале
+        
+        Запись остаётся 'uploading' с тем же object_name, но без владельца:
+        следующий вызов с тем же файлом заберёт её через claim_upload и
+        продолжит составную загрузку с недостающих частей. Заброшенную
+        запись (и незавершённую загрузку) очистит resume_jobs().
+        """
+        if job_id is None:
+            return
+        self.job_journal.release(job_id)
+        print("⏸  Загрузка продолжится при следующем распознавании этого файла")
+    
+    def _keep_for_resume(self, job_id: Optional[int], submitted: bool, error: BaseException) -> bool:
+        """
+        Оставить ли задание в журнале вместо очистки после ошибки
+        
+        Созданная операция продолжается на сервере: при прерывании (Ctrl+C,
+        отмена задачи), сетевой ошибке или таймауте ожидания запись остаётся
+        'submitted', а объект — в bucket, и результат заберёт resume_jobs().
+        Очищается задание без журнала, без операции или с OperationError.
+        """
+        if job_id is None or not submitted or isinstance(error, OperationError):
+            return False
+        print("⏸  Операция сохранена в журнале, результат заберёт resume_jobs()")
+        return True
+    
+    @staticmethod
+    def _resume_settled(job: Dict, error: Exception) -> bool:
+        """Окончательна ли ошибка возобновлённого задания (иначе запись остаётся до следующего запуска)"""
+        return isinstance(error, OperationError) or time.time() - job['created_at'] > OPERATION_RETENTION_SEC
+    
+    def _finish_resumed(self, job: Dict, result: Dict, settled: bool = True) -> None:
+        if not settled:
+            print(f"⏸  {job['file_path'].name}: {result['error']} (задание останется в журнале)")
+            return
+        self._cache_store(job['cache_entry'], result, job['file_path'])
+        self._finish_upload(job['id'], job['uri'], job['cleanup_after'])
+        if 'error' in result:
+            print(f"❌ {job['file_path'].name}: {result['error']}")
+        else:
+            print(f"✅ {job['file_path'].name} (возобновлено): {len(result['text'])} символов")
+    
+    def _discard_job(self, job: Dict) -> None:
+        """Удаляет осиротевший объект задания без операции (или с неудавшейся очисткой)"""
+        interrupted_upload = job['state'] == 'uploading' and job['object_name']
+        if interrupted_upload and job['file_path'].exists() and time.time() - job['updated_at'] < RESUMABLE_UPLOAD_SEC:
+            print(f"⏸  {job['file_path'].name}: загрузка продолжится при следующем распознавании")
+            # Без владельца: claim_upload любого процесса (и этого тоже) продолжит загрузку
+            self.job_journal.release(job['id'])
+            return
+        shared = (
+            job['object_name'] and self._get_storage().is_content_key(job['object_name'])
+            and self.job_journal.references(job['object_name'], exclude=job['id']) > 0
+        )
+        if interrupted_upload and not shared:
+            # Ключ по содержимому может прямо сейчас загружать другое задание
+            self._get_storage().abort_incomplete_uploads(job['object_name'])
+        if job['cleanup_after'] and job['object_name']:
+            print(f"🧹 Осиротевший объект: {job['object_name']}")
+            try:
+                self._release_object(job['object_name'], job['id'])
+            except Exception as e:
+                print(f"⚠️  Не удалось удалить временный файл: {e}")
+                return
+        self.job_journal.remove(job['id'])
+    
+    @staticmethod
+    def _split_preprocessor(preprocessor):
+        if preprocessor is not None:
+            return preprocessor
+        from audio_preprocessor import AudioPreprocessor, FFMPEG_AVAILABLE
+        if not FFMPEG_AVAILABLE:
+            raise ImportError("Для нарезки нужен ffmpeg-python: pip install ffmpeg-python")
+        return AudioPreprocessor()
+    
+    @staticmethod
+    def _merge_split(chunks: List, results: Dict[Path, Dict]) -> Dict:
+        """Склеивает результаты сегментов split_at_silence (ошибка любого сегмента — исключение)"""
+        failed = [(chunk, results[chunk.output_file]) for chunk in chunks if 'error' in results[chunk.output_file]]
+        if failed:
+            chunk, result = failed[0]
+            raise RuntimeError(
+                f"Не удалось распознать {len(failed)} из {len(chunks)} сегментов "
+                f"(сегмент {chunk.index}: {result['error']})"
+            )
+        
+        segments = []
+        for chunk in chunks:
+            offset_ms = round(chunk.start_sec * 1000)
+            segments.append((
+                offset_ms,
+                # Первый и последний сегменты открыты наружу
+                offset_ms + round(chunk.overlap_sec * 1000) if chunk.index > 0 else 0,
+                round((chunk.start_sec + chunk.duration_sec - chunk.overlap_end_sec) * 1000)
+                if chunk.index < len(chunks) - 1 else 2 ** 63,
+                results[chunk.output_file]
+            ))
+        return merge_split_results(segments)
+    
+    def _build_recognition_request(
+        self,
+        uri: str,
+        language: str,
+        model: str,
+        audio_format: str,
+        profanity_filter: bool,
+        literature_text: bool,
+        speaker_labeling: bool,
+        sample_rate_hertz: int
+    ) -> Dict:
+        """Тело запроса recognizeFileAsync (общее для синхронного и async клиента)"""
+        if audio_format == "LINEAR16_PCM":
+            # Сырой PCM без контейнера: параметры передаются явно
+            audio_format_spec = {
+                "raw_audio": {
+                    "audio_encoding": "LINEAR16_PCM",
+                    "sample_rate_hertz": sample_rate_hertz,
+                    "audio_channel_count": 1
+                }
+            }
+        else:
+            audio_format_spec = {
+                "container_audio": {
+                    "container_audio_type": audio_format
+                }
+            }
+        
+        request_body = {
+            "uri": uri,
+            "recognition_model": {
+                "model": model,
+                "audio_format": audio_format_spec,
+                "text_normalization": {
+                    "text_normalization": "TEXT_NORMALIZATION_ENABLED",
+                    "profanity_filter": profanity_filter,
+                    "literature_text": literature_text
+                },
+                "language_restriction": {
+                    "restriction_type": "WHITELIST",
+                    "language_code": [language]
+                },
+                "audio_processing_type": "FULL_DATA"
+            }
+        }
+        
+        # Опциональные параметры
+        if speaker_labeling:
+            request_body["recognition_model"]["speaker_labeling"] = {
+                "speaker_labeling": "SPEAKER_LABELING_ENABLED"
+            }
+        
+        return request_body
+    
+    def _parse_recognition_results(self, raw_results: str, keep_raw: Optional[bool] = None) -> Dict:
+        """
+        Парсит результаты распознавания (NDJSON формат) из строки целиком
+        
+        Args:
+            raw_results: Сырой ответ API (несколько JSON объектов через \n)
+            keep_raw: Сохранять строки в 'raw' (default: как у клиента)
+            
+        Returns:
+            Структурированные результаты
+        """
+        parser = RecognitionResultParser(keep_raw=self.keep_raw if keep_raw is None else keep_raw)
+        for _ in parser.iter_utterances(raw_results.splitlines()):
+            pass
+        return parser.result()
+    
+    def save_transcript(
+        self,
+        results: Dict,
+        output_path: Path,
+        format: str = "txt"
+    ):
+        """
+        Сохраняет транскрипт в файл
+        
+        Args:
+            results: Результаты распознавания
+            output_path: Путь для сохранения
+            format: Формат (txt, json, srt, vtt, speakers)
+        """
+        output_path = Path(output_path)
+        
+        if format == "txt":
+            # Простой текстовый формат
+            text = results.get('normalized_text') or results.get('text')
+            output_path.write_text(text, encoding='utf-8')
+            
+        elif format == "json":
+            # Полный JSON
+            output_path.write_text(
+                json.dumps(results, ensure_ascii=False, indent=2),
+                encoding='utf-8'
+            )
+            
+        elif format in ("srt", "vtt"):
+            # Субтитры SRT / WebVTT: по предложениям, паузам и длине строки
+            utterances = results.get('utterances')
+            if utterances is None:
+                # Старые результаты без индекса фраз — все слова одной фразой
+                utterances = [{'start_ms': 0, 'end_ms': 0, 'text': '', 'words': results.get('words', [])}]
+            with open(output_path, 'w', encoding='utf-8') as f:
+                write_subtitles(build_cues(utterances), f, format=format)
+        
+        elif format == "speakers":
+            # Реплики по спикерам с временем начала
+            lines = [
+                f"[{self._ms_to_srt_time(turn['start_ms'])}] {turn['speaker']}: {turn['text']}"
+                for turn in speaker_view(results.get('utterances', []))
+            ]
+            output_path.write_text('\n\n'.join(lines), encoding='utf-8')
+        
+        else:
+            raise ValueError(f"Неподдерживаемый формат: {format}")
+        
+        print(f"💾 Транскрипт сохранён: {output_path}")
+    
+    def _ms_to_srt_time(self, ms: int) -> str:
+        """Конвертирует миллисекунды в SRT формат времени"""
+        return format_timestamp(ms)
+
+
+class YandexSpeechKit(SpeechKitBase):
+    """Клиент для работы с Yandex SpeechKit API v3"""
+    
+    def __init__(self, *args, **kwargs):
+        """Параметры — как у SpeechKitBase"""
+        super().__init__(*args, **kwargs)
+        # Keep-alive между запросами (опрос статуса не открывает новое TLS-соединение)
+        self.session = requests.Session()
+    
     def transcribe(
         self,
         file_path: Path | str,
@@ -113,21 +1504,36 @@ class YandexSpeechKit:
         literature_text: bool = True,
         speaker_labeling: bool = False,
         word_timestamps: bool = True,
-        cleanup_after: bool = True
+        cleanup_after: bool = True,
+        audio_duration_sec: Optional[float] = None,
+        preprocessing_profile: Optional[str] = None
     ) -> Dict:
         """
         Транскрибирует локальный файл (автоматически загружает в Object Storage)
         
+        При включённом transcript_cache неизменившийся файл с теми же
+        параметрами возвращается из кэша без загрузки и сетевых запросов.
+        С job_journal прерывание (Ctrl+C), сетевая ошибка или таймаут после
+        создания операции не удаляют объект: запись остаётся в журнале,
+        результат заберёт resume_jobs(). Неудавшаяся загрузка тоже остаётся
+        в журнале: повторный вызов с тем же файлом продолжит её.
+        
         Args:
             file_path: Путь к локальному аудио/видео файлу
             language: Язык распознавания (ru-RU, en-US, etc.)
             model: Модель распознавания
-            audio_format: Формат аудио (AUTO автоопределит)
+            audio_format: Формат аудио (AUTO автоопределит; LINEAR16_PCM — сырой
+                16 kHz моно PCM из AudioPreprocessor(output_format='linear16'))
             profanity_filter: Фильтр мата
             literature_text: Литературный текст (пунктуация, заглавные)
             speaker_labeling: Метки спикеров
             word_timestamps: Временные метки слов
             cleanup_after: Удалить файл из Object Storage после транскрипции
+            audio_duration_sec: Длительность аудио для расписания опроса
+                (например, PreprocessingResult.processed_metrics.duration_sec;
+                по умолчанию определяется через ffprobe)
+            preprocessing_profile: Профиль AudioPreprocessor, которым подготовлен файл
+                (входит в ключ кэша)
             
         Returns:
             Словарь с результатами распознавания
@@ -139,10 +1545,38 @@ class YandexSpeechKit:
         
         print(f"🎬 Транскрипция локального файла: {file_path.name}")
         
+        recognition_options = dict(
+            model=model,
+            language=language,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            profanity_filter=profanity_filter,
+            audio_format=audio_format
+        )
+        cache_entry, cached = self._cache_lookup(file_path, recognition_options, preprocessing_profile)
+        if cached is not None:
+            print(f"♻️  Транскрипт из кэша: {file_path.name}")
+            return cached
+        
+        if audio_duration_sec is None:
+            audio_duration_sec = probe_audio_duration_sec(file_path, audio_format)
+        
         # 1. Загружаем в Object Storage
-        uri = self._upload_to_object_storage(file_path)
+        job_id, object_name = self._journal_begin(file_path, recognition_options, cache_entry, cleanup_after)
+        try:
+            uri = self._upload_to_object_storage(file_path, object_name)
+        except BaseException:
+            self._keep_upload(job_id)
+            raise
+        self._journal_update(job_id, state='uploaded', uri=uri, duration_sec=audio_duration_sec)
         
         # 2. Транскрибируем
+        operation_ids = []
+        
+        def on_submitted(operation_id: str) -> None:
+            operation_ids.append(operation_id)
+            self._journal_update(job_id, state='submitted', operation_id=operation_id)
+        
         try:
             result = self.transcribe_from_uri(
                 uri=uri,
@@ -152,35 +1586,401 @@ class YandexSpeechKit:
                 profanity_filter=profanity_filter,
                 literature_text=literature_text,
                 speaker_labeling=speaker_labeling,
-                word_timestamps=word_timestamps
+                word_timestamps=word_timestamps,
+                audio_duration_sec=audio_duration_sec,
+                on_submitted=on_submitted
             )
+        except BaseException as e:
+            # 3. Очищаем, если операции нет или она завершилась ошибкой
+            if not self._keep_for_resume(job_id, bool(operation_ids), e):
+                self._finish_upload(job_id, uri, cleanup_after)
+            raise
+        self._cache_store(cache_entry, result, file_path)
+        # 3. Очищаем
+        self._finish_upload(job_id, uri, cleanup_after)
+        return result
+    
+    def transcribe_many(
+        self,
+        file_paths: Iterable[Path | str],
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        cleanup_after: bool = True,
+        max_uploads: int = 4,
+        durations: Optional[Dict[Path | str, float]] = None,
+        preprocessing_profile: Optional[str] = None,
+        on_result: Optional[Callable[[Path, Dict], None]] = None
+    ) -> Dict[Path, Dict]:
+        """
+        Транскрибирует несколько локальных файлов параллельно
+        
+        Загрузки идут не более чем в max_uploads потоков, операция распознавания
+        создаётся сразу после загрузки своего файла. Незавершённые операции
+        опрашиваются одним циклом, каждая — по своему расписанию polling_policy
+        (по длительности файла), результаты забираются по мере готовности —
+        пакет длится примерно как самый долгий файл, а не сумма.
+        
+        Args:
+            file_paths: Локальные аудио/видео файлы
+            language, model, audio_format, profanity_filter, literature_text,
+            speaker_labeling, word_timestamps: Как в transcribe()
+            cleanup_after: Удалять файлы из Object Storage после распознавания
+            max_uploads: Максимум одновременных загрузок
+            durations: Известные длительности файлов (остальные определяются через ffprobe)
+            preprocessing_profile: Как в transcribe() (файлы из кэша не загружаются)
+            on_result: Вызывается (file_path, result) по готовности каждого файла
             
-            # 3. Очищаем (опционально)
-            if cleanup_after:
-                try:
-                    from yandex_object_storage import YandexObjectStorage
-                    storage = YandexObjectStorage()
-                    
-                    # Извлекаем имя объекта из URI
-                    object_name = uri.split(storage.bucket_name + '/')[-1]
-                    storage.delete_file(object_name)
-                    
-                except Exception as e:
-                    print(f"⚠️  Не удалось удалить временный файл: {e}")
+        Returns:
+            Словарь file_path -> результат (как у transcribe()) в порядке входа;
+            для неудавшихся файлов — {'error': 'описание'}
+        """
+        file_paths = [Path(p) for p in file_paths]
+        for file_path in file_paths:
+            if not file_path.exists():
+                raise FileNotFoundError(f"Файл не найден: {file_path}")
+        durations = {Path(p): d for p, d in (durations or {}).items()}
+        
+        recognition_options = dict(
+            language=language,
+            model=model,
+            audio_format=audio_format,
+            profanity_filter=profanity_filter,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling
+        )
+        
+        print(f"🎬 Пакетная транскрипция: {len(file_paths)} файлов (загрузок параллельно: {max_uploads})")
+        
+        results: Dict[Path, Dict] = {}
+        # operation_id -> file_path, uri, policy, delays, deadline, next_poll
+        pending: Dict[str, Dict] = {}
+        
+        cache_entries: Dict[Path, tuple] = {}
+        # file_path -> ID записи в job_journal
+        jobs: Dict[Path, int] = {}
+        
+        def retry_or_expire(operation_id: str) -> None:
+            """Следующая проверка по расписанию или, после таймаута, задание остаётся в журнале"""
+            op = pending[operation_id]
+            if time.monotonic() < op['deadline']:
+                op['next_poll'] = min(time.monotonic() + next(op['delays']), op['deadline'])
+                return
+            del pending[operation_id]
+            error = Exception(f"Timeout: распознавание не завершилось за {op['policy'].timeout_sec:.0f}с")
+            finish(op['file_path'], {'error': str(error)}, op['uri'], error)
+        
+        def finish(file_path: Path, result: Dict, uri: Optional[str], error: Optional[Exception] = None) -> None:
+            # error — ошибка созданной операции: не окончательная оставляет задание в журнале
+            self._cache_store(cache_entries.get(file_path), result, file_path)
+            if error is None or not self._keep_for_resume(jobs.get(file_path), True, error):
+                self._finish_upload(jobs.get(file_path), uri, cleanup_after)
+            results[file_path] = result
+            if 'error' in result:
+                print(f"❌ {file_path.name}: {result['error']}")
+            else:
+                print(f"✅ {file_path.name}: {len(result['text'])} символов")
+            if on_result is not None:
+                on_result(file_path, result)
+        
+        # Сначала кэш: совпавшие файлы не загружаются и не распознаются
+        to_recognize = []
+        for file_path in file_paths:
+            cache_entry, cached = self._cache_lookup(
+                file_path,
+                recognition_options,
+                preprocessing_profile
+            )
+            if cached is not None:
+                print(f"♻️  Транскрипт из кэша: {file_path.name}")
+                finish(file_path, cached, None)
+                continue
+            if cache_entry is not None:
+                cache_entries[file_path] = cache_entry
+            to_recognize.append(file_path)
+        
+        if not to_recognize:
+            return {file_path: results[file_path] for file_path in file_paths}
+        
+        # Хранилище создаём до запуска потоков: конструктор проверяет bucket (и настраивает yc)
+        self._get_storage()
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_uploads)) as upload_pool, \
+                ThreadPoolExecutor(max_workers=8) as poll_pool:
+            uploads = {}
+            for file_path in to_recognize:
+                job_id, object_name = self._journal_begin(
+                    file_path, recognition_options, cache_entries.get(file_path), cleanup_after
+                )
+                if job_id is not None:
+                    jobs[file_path] = job_id
+                future = upload_pool.submit(
+                    self._upload_and_submit, file_path, recognition_options, job_id, object_name
+                )
+                uploads[future] = file_path
             
-            return result
+            while uploads or pending:
+                # Ждём загрузок не дольше, чем до ближайшей запланированной проверки
+                next_poll = min((op['next_poll'] for op in pending.values()), default=None)
+                wait_sec = None if next_poll is None else max(0.0, next_poll - time.monotonic())
+                if uploads:
+                    done, _ = wait(uploads, timeout=wait_sec, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file_path = uploads.pop(future)
+                        try:
+                            uri, operation_id = future.result()
+                        except UploadError as e:
+                            self._keep_upload(jobs.pop(file_path, None))
+                            finish(file_path, {'error': str(e)}, None)
+                            continue
+                        except Exception as e:
+                            finish(file_path, {'error': str(e)}, None)
+                            continue
+                        duration = durations.get(file_path)
+                        if duration is None:
+                            duration = probe_audio_duration_sec(file_path, audio_format)
+                        self._journal_update(jobs.get(file_path), duration_sec=duration)
+                        policy = self.polling_policy(duration)
+                        delays = policy.delays()
+                        now = time.monotonic()
+                        pending[operation_id] = {
+                            'file_path': file_path,
+                            'uri': uri,
+                            'policy': policy,
+                            'delays': delays,
+                            'deadline': now + policy.timeout_sec,
+                            'next_poll': now + next(delays)
+                        }
+                else:
+                    time.sleep(wait_sec)
+                
+                now = time.monotonic()
+                due = [operation_id for operation_id, op in pending.items() if op['next_poll'] <= now]
+                if not due:
+                    continue
+                
+                # Общий опрос операций, для которых подошло время проверки
+                statuses = poll_pool.map(self._poll_operation, due)
+                ready = []
+                for operation_id, status in zip(due, statuses):
+                    op = pending[operation_id]
+                    if isinstance(status, OperationError):
+                        del pending[operation_id]
+                        finish(op['file_path'], {'error': str(status)}, op['uri'], status)
+                    elif isinstance(status, Exception):
+                        # Сеть или 5xx: операция идёт дальше, проверим по расписанию
+                        print(f"⚠️  {op['file_path'].name}: ошибка опроса, повтор по расписанию: {status}")
+                        retry_or_expire(operation_id)
+                    elif status.get('done'):
+                        ready.append(operation_id)
+                    else:
+                        retry_or_expire(operation_id)
+                
+                # Забираем готовые результаты параллельно
+                fetched = poll_pool.map(self._fetch_results_safe, ready)
+                for operation_id, result in zip(ready, fetched):
+                    if isinstance(result, Exception):
+                        # Результат не скачался: операция готова, попробуем ещё раз по расписанию
+                        print(f"⚠️  {pending[operation_id]['file_path'].name}: {result}")
+                        retry_or_expire(operation_id)
+                        continue
+                    op = pending.pop(operation_id)
+                    finish(op['file_path'], result, op['uri'])
+        
+        return {file_path: results[file_path] for file_path in file_paths}
+    
+    def _upload_and_submit(
+        self,
+        file_path: Path,
+        recognition_options: Dict,
+        job_id: Optional[int] = None,
+        object_name: Optional[str] = None
+    ) -> tuple:
+        """Загружает файл и сразу создаёт операцию распознавания (шаги пишутся в журнал)"""
+        uri = self._upload_to_object_storage(file_path, object_name)
+        self._journal_update(job_id, state='uploaded', uri=uri)
+        try:
+            operation_id = self.start_recognition(uri=uri, **recognition_options)
+        except Exception:
+            self._delete_uploaded(uri, job_id)
+            raise
+        self._journal_update(job_id, state='submitted', operation_id=operation_id)
+        return uri, operation_id
+    
+    def _poll_operation(self, operation_id: str) -> Dict | Exception:
+        """
+        get_operation(), но ошибка возвращается, а не выбрасывается (для map)
+        
+        OperationError — операция завершилась с ошибкой; другие исключения —
+        сетевые и серверные ошибки самого опроса.
+        """
+        try:
+            status = self.get_operation(operation_id)
+        except Exception as e:
+            return e
+        if status.get('done') and 'error' in status:
+            return OperationError(f"Операция завершилась с ошибкой: {status['error']}")
+        return status
+    
+    def _fetch_results_safe(self, operation_id: str) -> Dict | Exception:
+        try:
+            return self.get_recognition(operation_id)
+        except Exception as e:
+            return e
+    
+    def resume_jobs(self, on_result: Optional[Callable[[Path, Dict], None]] = None) -> Dict[Path, Dict]:
+        """
+        Доводит до конца задания прерванного процесса (по job_journal)
+        
+        Созданные до перезапуска операции не отправляются заново: готовые
+        забираются сразу, незавершённые дожидаются по polling_policy.
+        Результаты сохраняются в transcript_cache, так что повторный
+        transcribe/transcribe_many тех же файлов возьмёт их из кэша.
+        Объекты, для которых операция не была создана или которые не
+        удалось удалить, удаляются из bucket. Прерванная загрузка файла,
+        который ещё на месте, остаётся в журнале: следующий transcribe
+        этого файла её продолжит (после RESUMABLE_UPLOAD_SEC — отменяется).
+        
+        Args:
+            on_result: Вызывается (file_path, result) по готовности каждого задания
             
+        Returns:
+            Словарь file_path -> результат; для неудавшихся — {'error': 'описание'}
+        """
+        jobs = self.job_journal.claim_abandoned() if self.job_journal is not None else []
+        if not jobs:
+            return {}
+        
+        in_flight = [job for job in jobs if job['state'] == 'submitted' and job['operation_id']]
+        print(f"🔁 Незавершённых заданий в журнале: {len(jobs)} (операций в работе: {len(in_flight)})")
+        for job in jobs:
+            if job not in in_flight:
+                self._discard_job(job)
+        
+        results: Dict[Path, Dict] = {}
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for job, (result, settled) in zip(in_flight, pool.map(self._resume_operation, in_flight)):
+                self._finish_resumed(job, result, settled)
+                results[job['file_path']] = result
+                if on_result is not None:
+                    on_result(job['file_path'], result)
+        return results
+    
+    def _resume_operation(self, job: Dict) -> tuple:
+        """
+        Результат операции из журнала: сразу, если готова, иначе по расписанию опроса
+        
+        Returns:
+            (result, settled): settled=False — сетевая ошибка или таймаут,
+            задание остаётся в журнале до следующего resume_jobs()
+        """
+        operation_id = job['operation_id']
+        try:
+            status = self.get_operation(operation_id)
+            if not status.get('done'):
+                self._wait_operation(operation_id, self.polling_policy(job['duration_sec']))
+            elif 'error' in status:
+                raise OperationError(f"Операция завершилась с ошибкой: {status['error']}")
+            return self.get_recognition(operation_id), True
         except Exception as e:
-            # В случае ошибки всё равно пытаемся удалить временный файл
-            if cleanup_after:
-                try:
-                    from yandex_object_storage import YandexObjectStorage
-                    storage = YandexObjectStorage()
-                    object_name = uri.split(storage.bucket_name + '/')[-1]
-                    storage.delete_file(object_name)
-                except:
-                    pass
-            raise
+            return {'error': str(e)}, self._resume_settled(job, e)
+    
+    def transcribe_split(
+        self,
+        file_path: Path | str,
+        language: str = "ru-RU",
+        model: str = "general",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        cleanup_after: bool = True,
+        segment_sec: float = 600.0,
+        overlap_sec: float = 1.0,
+        max_uploads: int = 4,
+        preprocessor=None,
+        preprocessing_profile: Optional[str] = None,
+        work_dir: Optional[Path | str] = None
+    ) -> Dict:
+        """
+        Транскрибирует длинную запись по сегментам параллельно
+        
+        Запись режется по паузам на сегменты ~segment_sec
+        (AudioPreprocessor.split_at_silence), сегменты распознаются
+        одновременно через transcribe_many, результаты склеиваются
+        merge_split_results с абсолютными метками времени. Время
+        распознавания определяется самым долгим сегментом, а не всей
+        записью: 3 часа при segment_sec=600 — 18 операций по 10 минут.
+        
+        Args:
+            file_path: Путь к локальному аудио/видео файлу
+            language, model, profanity_filter, literature_text,
+            speaker_labeling, word_timestamps: Как в transcribe()
+            cleanup_after: Удалять сегменты из Object Storage после распознавания
+            segment_sec: Номинальная длина сегмента в секундах (default: 600)
+            overlap_sec: Перекрытие сегментов на границе в секундах (default: 1)
+            max_uploads: Максимум одновременных загрузок
+            preprocessor: AudioPreprocessor для нарезки (default: AudioPreprocessor())
+            preprocessing_profile: Профиль предобработки сегментов (входит в ключ кэша)
+            work_dir: Директория для сегментов (default: временная, удаляется после)
+            
+        Returns:
+            Словарь с результатами распознавания, как у transcribe()
+            
+        Raises:
+            RuntimeError: Если не удалось распознать хотя бы один сегмент
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+        
+        print(f"🎬 Транскрипция по сегментам: {file_path.name}")
+        
+        preprocessor = self._split_preprocessor(preprocessor)
+        recognition_options = dict(
+            model=model,
+            language=language,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            profanity_filter=profanity_filter,
+            audio_format=preprocessor.speechkit_audio_format
+        )
+        cache_entry, cached = self._cache_lookup(file_path, recognition_options, preprocessing_profile)
+        if cached is not None:
+            print(f"♻️  Транскрипт из кэша: {file_path.name}")
+            return cached
+        
+        segments_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix=f"{file_path.stem}_split_"))
+        try:
+            chunks = preprocessor.split_at_silence(
+                file_path,
+                output_dir=segments_dir,
+                segment_sec=segment_sec,
+                overlap_sec=overlap_sec,
+                profile=preprocessing_profile
+            )
+            print(f"✂️  Сегментов: {len(chunks)} (~{segment_sec / 60:.0f} мин, разрезы по паузам)")
+            
+            results = self.transcribe_many(
+                [chunk.output_file for chunk in chunks],
+                word_timestamps=word_timestamps,
+                cleanup_after=cleanup_after,
+                max_uploads=max_uploads,
+                durations={chunk.output_file: chunk.duration_sec for chunk in chunks},
+                preprocessing_profile=preprocessing_profile,
+                **recognition_options
+            )
+            result = self._merge_split(chunks, results)
+        finally:
+            if not work_dir:
+                shutil.rmtree(segments_dir, ignore_errors=True)
+        
+        self._cache_store(cache_entry, result, file_path)
+        return result
     
     def transcribe_from_uri(
         self,
@@ -191,52 +1991,135 @@ class YandexSpeechKit:
         profanity_filter: bool = False,
         literature_text: bool = True,
         speaker_labeling: bool = False,
-        word_timestamps: bool = True
-    ) -> Dict:
+        word_timestamps: bool = True,
+        sample_rate_hertz: int = 16000,
+        audio_duration_sec: Optional[float] = None,
+        polling: Optional[PollingPolicy] = None,
+        on_submitted: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Распознает аудио/видео по ссылке в Object Storage
+        
+        Args:
+            uri: Ссылка на файл в Yandex Object Storage
+            language: Язык распознавания (ru-RU, en-US, etc.)
+            model: Модель распознавания (general, general:rc, etc.)
+            audio_format: Формат аудио (AUTO, WAV, MP3, OGG_OPUS, LINEAR16_PCM)
+            profanity_filter: Фильтр мата
+            literature_text: Литературный текст (пунктуация, заглавные буквы)
+            speaker_labeling: Метки спикеров
+            word_timestamps: Временные метки слов
+            sample_rate_hertz: Частота для LINEAR16_PCM (raw PCM, моно)
+            audio_duration_sec: Длительность аудио (первая проверка статуса и таймаут
+                рассчитываются по ней; без неё — опрос раз в 5 сек до 10 минут)
+            polling: Явное расписание опроса (перекрывает polling_policy клиента)
+            on_submitted: Вызывается с ID операции сразу после её создания
+            
+        Returns:
+            Словарь с результатами распознавания
+        """
+        # 1-2. Формируем и отправляем запрос на распознавание
+        operation_id = self.start_recognition(
+            uri=uri,
+            language=language,
+            model=model,
+            audio_format=audio_format,
+            profanity_filter=profanity_filter,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            sample_rate_hertz=sample_rate_hertz
+        )
+        if on_submitted is not None:
+            on_submitted(operation_id)
+        
+        # 3. Ожидаем завершения (polling)
+        print(f"⏳ Ожидание завершения распознавания...")
+        
+        self._wait_operation(operation_id, polling or self.polling_policy(audio_duration_sec))
+        print(f"✅ Распознавание завершено!")
+        
+        # 4. Получаем результаты
+        print(f"📥 Получение результатов...")
+        
+        # 5. Парсим результаты
+        results = self.get_recognition(operation_id)
+        
+        print(f"✅ Распознано: {len(results['text'])} символов")
+        
+        return results
+    
+    def _wait_operation(self, operation_id: str, policy: PollingPolicy) -> Dict:
+        """
+        Опрашивает операцию по расписанию policy до завершения
+        
+        Ошибки самого опроса (сеть, 5xx) не прерывают ожидание.
+        
+        Raises:
+            OperationError: Операция завершилась с ошибкой
+            Exception: Таймаут policy.timeout_sec
+        """
+        started = time.monotonic()
+        deadline = started + policy.timeout_sec
+        last_report = started
+        
+        for delay in policy.delays():
+            time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+            
+            # Проверяем статус операции
+            try:
+                status = self.get_operation(operation_id)
+            except OperationError:
+                raise
+            except Exception as e:
+                # Сеть или 5xx: операция идёт дальше, проверим по расписанию
+                print(f"⚠️  Ошибка опроса, повтор по расписанию: {e}")
+                status = {}
+            if status.get('done'):
+                if 'error' in status:
+                    raise OperationError(f"Операция завершилась с ошибкой: {status['error']}")
+                return status
+            
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now - last_report >= 30:
+                print(f"   Ожидание... ({now - started:.0f}с)")
+                last_report = now
+        
+        raise Exception(f"Timeout: распознавание не завершилось за {policy.timeout_sec:.0f}с")
+    
+    def start_recognition(
+        self,
+        uri: str,
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        sample_rate_hertz: int = 16000
+    ) -> str:
         """
-        Распознает аудио/видео по ссылке в Object Storage
+        Создаёт асинхронную операцию распознавания (без ожидания результата)
         
         Args:
-            uri: Ссылка на файл в Yandex Object Storage
-            language: Язык распознавания (ru-RU, en-US, etc.)
-            model: Модель распознавания (general, general:rc, etc.)
-            audio_format: Формат аудио (AUTO, WAV, MP3, OGG_OPUS, etc.)
-            profanity_filter: Фильтр мата
-            literature_text: Литературный текст (пунктуация, заглавные буквы)
-            speaker_labeling: Метки спикеров
-            word_timestamps: Временные метки слов
+            uri, language, model, audio_format, profanity_filter,
+            literature_text, speaker_labeling, sample_rate_hertz: Как в transcribe_from_uri()
             
         Returns:
-            Словарь с результатами распознавания
+            ID операции
         """
         # 1. Формируем запрос на распознавание
-        request_body = {
-            "uri": uri,
-            "recognition_model": {
-                "model": model,
-                "audio_format": {
-                    "container_audio": {
-                        "container_audio_type": audio_format
-                    }
-                },
-                "text_normalization": {
-                    "text_normalization": "TEXT_NORMALIZATION_ENABLED",
-                    "profanity_filter": profanity_filter,
-                    "literature_text": literature_text
-                },
-                "language_restriction": {
-                    "restriction_type": "WHITELIST",
-                    "language_code": [language]
-                },
-                "audio_processing_type": "FULL_DATA"
-            }
-        }
-        
-        # Опциональные параметры
-        if speaker_labeling:
-            request_body["recognition_model"]["speaker_labeling"] = {
-                "speaker_labeling": "SPEAKER_LABELING_ENABLED"
-            }
+        request_body = self._build_recognition_request(
+            uri=uri,
+            language=language,
+            model=model,
+            audio_format=audio_format,
+            profanity_filter=profanity_filter,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            sample_rate_hertz=sample_rate_hertz
+        )
         
         print(f"📤 Отправка запроса на распознавание...")
         print(f"   Язык: {language}")
@@ -244,7 +2127,7 @@ class YandexSpeechKit:
         print(f"   Формат: {audio_format}")
         
         # 2. Отправляем запрос
-        response = requests.post(
+        response = self.session.post(
             self.STT_ASYNC_URL,
             headers={
                 **self._get_auth_header(),
@@ -264,203 +2147,569 @@ class YandexSpeechKit:
         operation_id = operation['id']
         print(f"✅ Операция создана: {operation_id}")
         
-        # 3. Ожидаем завершения (polling)
-        print(f"⏳ Ожидание завершения распознавания...")
+        return operation_id
+    
+    def get_operation(self, operation_id: str) -> Dict:
+        """
+        Возвращает статус операции (поле 'done' — готовность)
         
-        max_attempts = 120  # 10 минут (5 сек * 120)
-        attempt = 0
+        Args:
+            operation_id: ID операции из start_recognition()
+        """
+        status_response = self.session.get(
+            f"{self.OPERATION_URL}/{operation_id}",
+            headers=self._get_auth_header(),
+            verify=True
+        )
         
-        while attempt < max_attempts:
-            time.sleep(5)
-            attempt += 1
-            
-            # Проверяем статус операции
-            status_response = requests.get(
-                f"{self.OPERATION_URL}/{operation_id}",
-                headers=self._get_auth_header(),
-                verify=True
+        if status_response.status_code == 404:
+            raise OperationError(f"Операция не найдена: {operation_id}")
+        if status_response.status_code != 200:
+            raise Exception(
+                f"Ошибка проверки статуса: {status_response.status_code}\n"
+                f"{status_response.text}"
             )
-            
-            if status_response.status_code != 200:
-                raise Exception(
-                    f"Ошибка проверки статуса: {status_response.status_code}\n"
-                    f"{status_response.text}"
-                )
-            
-            status = status_response.json()
-            
-            if status.get('done'):
-                print(f"✅ Распознавание завершено!")
-                break
-            
-            if attempt % 6 == 0:  # Каждые 30 секунд
-                print(f"   Ожидание... ({attempt * 5}с)")
         
-        if not status.get('done'):
-            raise Exception("Timeout: распознавание не завершилось за 10 минут")
+        return status_response.json()
+    
+    def get_recognition(
+        self,
+        operation_id: str,
+        on_utterance: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Забирает и парсит результаты завершённой операции
         
-        # 4. Получаем результаты
-        print(f"📥 Получение результатов...")
+        Ответ читается потоком построчно: в памяти только разобранный результат.
         
-        result_response = requests.get(
+        Args:
+            operation_id: ID операции из start_recognition()
+            on_utterance: Вызывается для каждой финальной фразы по мере чтения
+            
+        Returns:
+            Словарь с результатами распознавания
+        """
+        with self.session.get(
             self.RECOGNITION_URL,
             headers=self._get_auth_header(),
             params={"operation_id": operation_id},
-            verify=True
+            verify=True,
+            stream=True
+        ) as result_response:
+            if result_response.status_code != 200:
+                raise Exception(
+                    f"Ошибка получения результатов: {result_response.status_code}\n"
+                    f"{result_response.text}"
+                )
+            
+            parser = RecognitionResultParser(keep_raw=self.keep_raw)
+            for utterance in parser.iter_utterances(result_response.iter_lines()):
+                if on_utterance is not None:
+                    on_utterance(utterance)
+        
+        return parser.result()
+
+
+class AsyncYandexSpeechKit(SpeechKitBase):
+    """
+    asyncio-клиент SpeechKit поверх одного пула HTTP-соединений
+    
+    Все запросы (создание операции, опрос статуса, получение результата)
+    идут через один httpx.AsyncClient: соединения с stt/operation API
+    переиспользуются (keep-alive, HTTP/2 при наличии h2), поэтому опросы
+    не платят за TCP+TLS handshake. Формирование запроса, разбор NDJSON,
+    загрузка в Object Storage и сохранение транскрипта — общие с
+    YandexSpeechKit (SpeechKitBase); синхронных методов запроса у клиента нет.
+    
+    Клиент нужно закрывать: `async with AsyncYandexSpeechKit() as stt` или aclose().
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        iam_token: Optional[str] = None,
+        folder_id: Optional[str] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_sec: float = 60.0,
+        http2: bool = True,
+        timeout_sec: float = 30.0,
+        polling_policy: Optional[Callable[[Optional[float]], PollingPolicy]] = None,
+        transcript_cache: Optional[TranscriptCache] = None,
+        model_version: Optional[str] = None,
+        keep_raw: bool = False,
+        api_base_url: Optional[str] = None,
+        job_journal: Optional[JobJournal] = None,
+        content_addressed: bool = False
+    ):
+        """
+        Args:
+            api_key, iam_token, folder_id, polling_policy, transcript_cache,
+            model_version, keep_raw, api_base_url, job_journal,
+            content_addressed: Как у YandexSpeechKit
+            max_connections: Максимум одновременных соединений в пуле
+            max_keepalive_connections: Сколько простаивающих соединений держать открытыми
+            keepalive_expiry_sec: Через сколько секунд простоя закрывать соединение
+            http2: Использовать HTTP/2, если сервер и пакет h2 его поддерживают
+            timeout_sec: Таймаут одного HTTP-запроса
+        """
+        super().__init__(
+            api_key=api_key,
+            iam_token=iam_token,
+            folder_id=folder_id,
+            polling_policy=polling_policy,
+            transcript_cache=transcript_cache,
+            model_version=model_version,
+            keep_raw=keep_raw,
+            api_base_url=api_base_url,
+            job_journal=job_journal,
+            content_addressed=content_addressed
         )
         
-        if result_response.status_code != 200:
-            raise Exception(
-                f"Ошибка получения результатов: {result_response.status_code}\n"
-                f"{result_response.text}"
+        if not HTTPX_AVAILABLE:
+            raise ImportError(
+                "Для AsyncYandexSpeechKit нужен httpx. "
+                "Установите: pip install 'httpx[http2]'"
             )
         
-        # 5. Парсим результаты
-        raw_results = result_response.text
-        results = self._parse_recognition_results(raw_results)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry_sec
+            ),
+            timeout=timeout_sec,
+            headers=self._get_auth_header()
+        )
+    
+    async def __aenter__(self) -> 'AsyncYandexSpeechKit':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Закрывает пул соединений"""
+        await self._client.aclose()
+    
+    async def transcribe(
+        self,
+        file_path: Path | str,
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        cleanup_after: bool = True,
+        audio_duration_sec: Optional[float] = None,
+        preprocessing_profile: Optional[str] = None
+    ) -> Dict:
+        """Как YandexSpeechKit.transcribe(); загрузка идёт в отдельном потоке"""
+        file_path = Path(file_path)
         
-        print(f"✅ Распознано: {len(results['text'])} символов")
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
         
-        return results
+        print(f"🎬 Транскрипция локального файла: {file_path.name}")
+        
+        recognition_options = dict(
+            model=model,
+            language=language,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            profanity_filter=profanity_filter,
+            audio_format=audio_format
+        )
+        cache_entry, cached = await asyncio.to_thread(
+            self._cache_lookup, file_path, recognition_options, preprocessing_profile
+        )
+        if cached is not None:
+            print(f"♻️  Транскрипт из кэша: {file_path.name}")
+            return cached
+        
+        if audio_duration_sec is None:
+            audio_duration_sec = await asyncio.to_thread(probe_audio_duration_sec, file_path, audio_format)
+        
+        job_id, object_name = await asyncio.to_thread(
+            self._journal_begin, file_path, recognition_options, cache_entry, cleanup_after
+        )
+        try:
+            uri = await asyncio.to_thread(self._upload_to_object_storage, file_path, object_name)
+        except BaseException:
+            await asyncio.to_thread(self._keep_upload, job_id)
+            raise
+        await asyncio.to_thread(
+            self._journal_update, job_id, state='uploaded', uri=uri, duration_sec=audio_duration_sec
+        )
+        
+        operation_ids = []
+        
+        def on_submitted(operation_id: str) -> None:
+            operation_ids.append(operation_id)
+            self._journal_update(job_id, state='submitted', operation_id=operation_id)
+        
+        try:
+            result = await self.transcribe_from_uri(
+                uri=uri,
+                language=language,
+                model=model,
+                audio_format=audio_format,
+                profanity_filter=profanity_filter,
+                literature_text=literature_text,
+                speaker_labeling=speaker_labeling,
+                word_timestamps=word_timestamps,
+                audio_duration_sec=audio_duration_sec,
+                on_submitted=on_submitted
+            )
+        except BaseException as e:
+            # CancelledError (Ctrl+C в asyncio.run) оставляет созданную операцию в журнале
+            if not self._keep_for_resume(job_id, bool(operation_ids), e):
+                await asyncio.to_thread(self._finish_upload, job_id, uri, cleanup_after)
+            raise
+        await asyncio.to_thread(self._cache_store, cache_entry, result, file_path)
+        await asyncio.to_thread(self._finish_upload, job_id, uri, cleanup_after)
+        return result
     
-    def _parse_recognition_results(self, raw_results: str) -> Dict:
+    async def transcribe_many(
+        self,
+        file_paths: Iterable[Path | str],
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        cleanup_after: bool = True,
+        max_uploads: int = 4,
+        durations: Optional[Dict[Path | str, float]] = None,
+        preprocessing_profile: Optional[str] = None,
+        on_result: Optional[Callable[[Path, Dict], None]] = None
+    ) -> Dict[Path, Dict]:
         """
-        Парсит результаты распознавания (NDJSON формат)
-        
-        Args:
-            raw_results: Сырой ответ API (несколько JSON объектов через \n)
-            
-        Returns:
-            Структурированные результаты
+        Как YandexSpeechKit.transcribe_many(): загрузки ограничены max_uploads,
+        опросы всех операций идут конкурентно через общий пул соединений
         """
-        results = {
-            'text': '',
-            'normalized_text': '',
-            'words': [],
-            'chunks': [],
-            'speakers': [],
-            'raw': []
-        }
+        file_paths = [Path(p) for p in file_paths]
+        for file_path in file_paths:
+            if not file_path.exists():
+                raise FileNotFoundError(f"Файл не найден: {file_path}")
+        durations = {Path(p): d for p, d in (durations or {}).items()}
         
-        for line in raw_results.strip().split('\n'):
-            if not line:
-                continue
-            
-            chunk = json.loads(line)
-            results['raw'].append(chunk)
-            
-            if 'result' not in chunk:
-                continue
-            
-            result = chunk['result']
+        recognition_options = dict(
+            model=model,
+            language=language,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            profanity_filter=profanity_filter,
+            audio_format=audio_format
+        )
+        upload_slots = asyncio.Semaphore(max(1, max_uploads))
+        storage_ready = asyncio.Lock()
+        
+        async def run(file_path: Path) -> Dict:
+            uri = None
+            operation_id = None
+            cache_entry, cached = await asyncio.to_thread(
+                self._cache_lookup, file_path, recognition_options, preprocessing_profile
+            )
+            if cached is not None:
+                print(f"♻️  Транскрипт из кэша: {file_path.name}")
+                if on_result is not None:
+                    on_result(file_path, cached)
+                return cached
             
-            # Финальный результат
-            if 'final' in result:
-                final = result['final']
-                if final.get('alternatives'):
-                    alt = final['alternatives'][0]
-                    results['text'] = alt.get('text', '')
-                    results['words'].extend(alt.get('words', []))
-                    
-                    # Спикеры
-                    if 'speaker_tag' in alt:
-                        results['speakers'].append({
-                            'speaker_tag': alt['speaker_tag'],
-                            'text': alt['text']
-                        })
+            # Хранилище создаём один раз: конструктор проверяет bucket (и настраивает yc)
+            async with storage_ready:
+                await asyncio.to_thread(self._get_storage)
             
-            # Нормализованный текст
-            if 'finalRefinement' in result:
-                refinement = result['finalRefinement']
-                if 'normalizedText' in refinement:
-                    normalized = refinement['normalizedText']
-                    results['normalized_text'] = normalized.get('text', '')
+            job_id, object_name = await asyncio.to_thread(
+                self._journal_begin, file_path, recognition_options, cache_entry, cleanup_after
+            )
+            try:
+                async with upload_slots:
+                    uri = await asyncio.to_thread(self._upload_to_object_storage, file_path, object_name)
+                duration = durations.get(file_path)
+                if duration is None:
+                    duration = await asyncio.to_thread(probe_audio_duration_sec, file_path, audio_format)
+                await asyncio.to_thread(self._journal_update, job_id, state='uploaded', uri=uri, duration_sec=duration)
+                operation_id = await self.start_recognition(
+                    uri=uri,
+                    language=language,
+                    model=model,
+                    audio_format=audio_format,
+                    profanity_filter=profanity_filter,
+                    literature_text=literature_text,
+                    speaker_labeling=speaker_labeling
+                )
+                await asyncio.to_thread(self._journal_update, job_id, state='submitted', operation_id=operation_id)
+                await self._wait_operation(operation_id, self.polling_policy(duration))
+                result = await self.get_recognition(operation_id)
+                await asyncio.to_thread(self._cache_store, cache_entry, result, file_path)
+                print(f"✅ {file_path.name}: {len(result['text'])} символов")
+            except Exception as e:
+                result = {'error': str(e)}
+                print(f"❌ {file_path.name}: {e}")
+                if uri is None:
+                    await asyncio.to_thread(self._keep_upload, job_id)
+                elif not self._keep_for_resume(job_id, operation_id is not None, e):
+                    await asyncio.to_thread(self._finish_upload, job_id, uri, cleanup_after)
+            else:
+                await asyncio.to_thread(self._finish_upload, job_id, uri, cleanup_after)
             
-            # Сохраняем чанки для детального анализа
-            results['chunks'].append(result)
+            if on_result is not None:
+                on_result(file_path, result)
+            return result
         
-        return results
+        print(f"🎬 Пакетная транскрипция: {len(file_paths)} файлов (загрузок параллельно: {max_uploads})")
+        results = await asyncio.gather(*(run(file_path) for file_path in file_paths))
+        return dict(zip(file_paths, results))
     
-    def save_transcript(
+    async def resume_jobs(self, on_result: Optional[Callable[[Path, Dict], None]] = None) -> Dict[Path, Dict]:
+        """Как YandexSpeechKit.resume_jobs(): операции из журнала опрашиваются конкурентно"""
+        if self.job_journal is None:
+            return {}
+        jobs = await asyncio.to_thread(self.job_journal.claim_abandoned)
+        if not jobs:
+            return {}
+        
+        in_flight = [job for job in jobs if job['state'] == 'submitted' and job['operation_id']]
+        print(f"🔁 Незавершённых заданий в журнале: {len(jobs)} (операций в работе: {len(in_flight)})")
+        for job in jobs:
+            if job not in in_flight:
+                await asyncio.to_thread(self._discard_job, job)
+        
+        async def run(job: Dict) -> Dict:
+            operation_id = job['operation_id']
+            try:
+                status = await self.get_operation(operation_id)
+                if not status.get('done'):
+                    await self._wait_operation(operation_id, self.polling_policy(job['duration_sec']))
+                elif 'error' in status:
+                    raise OperationError(f"Операция завершилась с ошибкой: {status['error']}")
+                result = await self.get_recognition(operation_id)
+                settled = True
+            except Exception as e:
+                result = {'error': str(e)}
+                settled = self._resume_settled(job, e)
+            await asyncio.to_thread(self._finish_resumed, job, result, settled)
+            if on_result is not None:
+                on_result(job['file_path'], result)
+            return result
+        
+        results = await asyncio.gather(*(run(job) for job in in_flight))
+        return {job['file_path']: result for job, result in zip(in_flight, results)}
+    
+    async def transcribe_split(
         self,
-        results: Dict,
-        output_path: Path,
-        format: str = "txt"
-    ):
-        """
-        Сохраняет транскрипт в файл
+        file_path: Path | str,
+        language: str = "ru-RU",
+        model: str = "general",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        cleanup_after: bool = True,
+        segment_sec: float = 600.0,
+        overlap_sec: float = 1.0,
+        max_uploads: int = 4,
+        preprocessor=None,
+        preprocessing_profile: Optional[str] = None,
+        work_dir: Optional[Path | str] = None
+    ) -> Dict:
+        """Как YandexSpeechKit.transcribe_split(): нарезка в потоке, сегменты — через transcribe_many"""
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
         
-        Args:
-            results: Результаты распознавания
-            output_path: Путь для сохранения
-            format: Формат (txt, json, srt)
-        """
-        output_path = Path(output_path)
+        print(f"🎬 Транскрипция по сегментам: {file_path.name}")
         
-        if format == "txt":
-            # Простой текстовый формат
-            text = results.get('normalized_text') or results.get('text')
-            output_path.write_text(text, encoding='utf-8')
-            
-        elif format == "json":
-            # Полный JSON
-            output_path.write_text(
-                json.dumps(results, ensure_ascii=False, indent=2),
-                encoding='utf-8'
+        preprocessor = self._split_preprocessor(preprocessor)
+        recognition_options = dict(
+            model=model,
+            language=language,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            profanity_filter=profanity_filter,
+            audio_format=preprocessor.speechkit_audio_format
+        )
+        cache_entry, cached = await asyncio.to_thread(
+            self._cache_lookup, file_path, recognition_options, preprocessing_profile
+        )
+        if cached is not None:
+            print(f"♻️  Транскрипт из кэша: {file_path.name}")
+            return cached
+        
+        segments_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix=f"{file_path.stem}_split_"))
+        try:
+            chunks = await asyncio.to_thread(
+                preprocessor.split_at_silence,
+                file_path,
+                output_dir=segments_dir,
+                segment_sec=segment_sec,
+                overlap_sec=overlap_sec,
+                profile=preprocessing_profile
             )
+            print(f"✂️  Сегментов: {len(chunks)} (~{segment_sec / 60:.0f} мин, разрезы по паузам)")
             
-        elif format == "srt":
-            # SRT субтитры
-            srt_content = self._convert_to_srt(results['words'])
-            output_path.write_text(srt_content, encoding='utf-8')
+            results = await self.transcribe_many(
+                [chunk.output_file for chunk in chunks],
+                word_timestamps=word_timestamps,
+                cleanup_after=cleanup_after,
+                max_uploads=max_uploads,
+                durations={chunk.output_file: chunk.duration_sec for chunk in chunks},
+                preprocessing_profile=preprocessing_profile,
+                **recognition_options
+            )
+            result = self._merge_split(chunks, results)
+        finally:
+            if not work_dir:
+                shutil.rmtree(segments_dir, ignore_errors=True)
         
-        else:
-            raise ValueError(f"Неподдерживаемый формат: {format}")
+        await asyncio.to_thread(self._cache_store, cache_entry, result, file_path)
+        return result
+    
+    async def transcribe_from_uri(
+        self,
+        uri: str,
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        word_timestamps: bool = True,
+        sample_rate_hertz: int = 16000,
+        audio_duration_sec: Optional[float] = None,
+        polling: Optional[PollingPolicy] = None,
+        on_submitted: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """Как YandexSpeechKit.transcribe_from_uri(), но без блокировки event loop"""
+        operation_id = await self.start_recognition(
+            uri=uri,
+            language=language,
+            model=model,
+            audio_format=audio_format,
+            profanity_filter=profanity_filter,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            sample_rate_hertz=sample_rate_hertz
+        )
+        if on_submitted is not None:
+            await asyncio.to_thread(on_submitted, operation_id)
         
-        print(f"💾 Транскрипт сохранён: {output_path}")
+        print("⏳ Ожидание завершения распознавания...")
+        await self._wait_operation(operation_id, polling or self.polling_policy(audio_duration_sec))
+        print("✅ Распознавание завершено!")
+        
+        print("📥 Получение результатов...")
+        results = await self.get_recognition(operation_id)
+        
+        print(f"✅ Распознано: {len(results['text'])} символов")
+        
+        return results
     
-    def _convert_to_srt(self, words: List[Dict]) -> str:
-        """Конвертирует слова с временными метками в SRT формат"""
-        if not words:
-            return ""
+    async def _wait_operation(self, operation_id: str, policy: PollingPolicy) -> Dict:
+        """Как YandexSpeechKit._wait_operation()"""
+        deadline = time.monotonic() + policy.timeout_sec
+        for delay in policy.delays():
+            await asyncio.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+            try:
+                status = await self.get_operation(operation_id)
+            except OperationError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Ошибка опроса, повтор по расписанию: {e}")
+                status = {}
+            if status.get('done'):
+                if 'error' in status:
+                    raise OperationError(f"Операция завершилась с ошибкой: {status['error']}")
+                return status
+            if time.monotonic() >= deadline:
+                break
+        raise Exception(f"Timeout: распознавание не завершилось за {policy.timeout_sec:.0f}с")
+    
+    async def start_recognition(
+        self,
+        uri: str,
+        language: str = "ru-RU",
+        model: str = "general",
+        audio_format: str = "AUTO",
+        profanity_filter: bool = False,
+        literature_text: bool = True,
+        speaker_labeling: bool = False,
+        sample_rate_hertz: int = 16000
+    ) -> str:
+        """Как YandexSpeechKit.start_recognition()"""
+        request_body = self._build_recognition_request(
+            uri=uri,
+            language=language,
+            model=model,
+            audio_format=audio_format,
+            profanity_filter=profanity_filter,
+            literature_text=literature_text,
+            speaker_labeling=speaker_labeling,
+            sample_rate_hertz=sample_rate_hertz
+        )
         
-        srt_lines = []
-        index = 1
+        print(f"📤 Отправка запроса на распознавание... ({model}, {language}, {audio_format})")
         
-        # Группируем слова в чанки по 5-7 слов
-        chunk_size = 6
+        response = await self._client.post(self.STT_ASYNC_URL, json=request_body)
         
-        for i in range(0, len(words), chunk_size):
-            chunk = words[i:i + chunk_size]
-            
-            start_ms = int(chunk[0].get('startTimeMs', 0))
-            end_ms = int(chunk[-1].get('endTimeMs', 0))
-            
-            text = ' '.join(w.get('text', '') for w in chunk)
-            
-            # Форматируем временные метки
-            start_time = self._ms_to_srt_time(start_ms)
-            end_time = self._ms_to_srt_time(end_ms)
-            
-            srt_lines.append(f"{index}")
-            srt_lines.append(f"{start_time} --> {end_time}")
-            srt_lines.append(text)
-            srt_lines.append("")
-            
-            index += 1
+        if response.status_code != 200:
+            raise Exception(
+                f"Ошибка запроса распознавания: {response.status_code}\n"
+                f"{response.text}"
+            )
+        
+        operation_id = response.json()['id']
+        print(f"✅ Операция создана: {operation_id}")
         
-        return '\n'.join(srt_lines)
+        return operation_id
     
-    def _ms_to_srt_time(self, ms: int) -> str:
-        """Конвертирует миллисекунды в SRT формат времени"""
-        seconds = ms // 1000
-        milliseconds = ms % 1000
+    async def get_operation(self, operation_id: str) -> Dict:
+        """Как YandexSpeechKit.get_operation()"""
+        status_response = await self._client.get(f"{self.OPERATION_URL}/{operation_id}")
+        
+        if status_response.status_code == 404:
+            raise OperationError(f"Операция не найдена: {operation_id}")
+        if status_response.status_code != 200:
+            raise Exception(
+                f"Ошибка проверки статуса: {status_response.status_code}\n"
+                f"{status_response.text}"
+            )
         
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
+        return status_response.json()
+    
+    async def get_recognition(
+        self,
+        operation_id: str,
+        on_utterance: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """Как YandexSpeechKit.get_recognition(): ответ читается потоком построчно"""
+        async with self._client.stream(
+            "GET",
+            self.RECOGNITION_URL,
+            params={"operation_id": operation_id}
+        ) as result_response:
+            if result_response.status_code != 200:
+                await result_response.aread()
+                raise Exception(
+                    f"Ошибка получения результатов: {result_response.status_code}\n"
+                    f"{result_response.text}"
+                )
+            
+            parser = RecognitionResultParser(keep_raw=self.keep_raw)
+            async for line in result_response.aiter_lines():
+                utterance = parser.feed(line)
+                if utterance is not None and on_utterance is not None:
+                    on_utterance(utterance)
         
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+        return parser.result()
 
 
 def main():
@@ -472,7 +2721,7 @@ def main():
     )
     parser.add_argument("uri", help="Ссылка на файл в Yandex Object Storage")
     parser.add_argument("--output", "-o", help="Путь для сохранения транскрипта")
-    parser.add_argument("--format", choices=["txt", "json", "srt"], default="txt")
+    parser.add_argument("--format", choices=["txt", "json", "srt", "vtt", "speakers"], default="txt")
     parser.add_argument("--language", default="ru-RU")
     parser.add_argument("--model", default="general")
     parser.add_argument("--speakers", action="store_true", help="Метки спикеров")